@@ -1,17 +1,56 @@
+from importlib import import_module
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
-from flask_bcrypt import Bcrypt
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import Config
+from app.utils.passwords import PasswordHasher
+from app.utils.throttle import LoginThrottle
+from app.utils.events import EventBus
+from app.utils.compression import Compressor
+from app.utils.unit_of_work import UnitOfWork
+from app.utils.recent import RecentActivity
+from app.utils.static_assets import StaticAssets
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 cors = CORS()
 jwt = JWTManager()
-bcrypt = Bcrypt()
+password_hasher = PasswordHasher()
+login_throttle = LoginThrottle()
+event_bus = EventBus()
+compressor = Compressor()
+unit_of_work = UnitOfWork()
+recent_activity = RecentActivity()
+static_assets = StaticAssets()
+
+# (module, blueprint, url_prefix), imported when the app is created
+BLUEPRINTS = (
+    ('app.routes.auth', 'auth_bp', '/api/auth'),
+    ('app.routes.users', 'users_bp', '/api/users'),
+    ('app.routes.content', 'content_bp', '/api/content'),
+    ('app.routes.categories', 'categories_bp', '/api/categories'),
+    ('app.routes.enrollments', 'enrollments_bp', '/api/enrollments'),
+    ('app.routes.reviews', 'reviews_bp', '/api/reviews'),
+    ('app.routes.search', 'search_bp', '/api/search'),
+    ('app.routes.progress', 'progress_bp', '/api/progress'),
+    ('app.routes.analytics', 'analytics_bp', '/api/analytics'),
+    ('app.routes.instructors', 'instructors_bp', '/api/instructors'),
+    ('app.routes.exports', 'exports_bp', '/api/exports'),
+    ('app.routes.events', 'events_bp', '/api/events'),
+    ('app.routes.paths', 'paths_bp', '/api/paths'),
+    ('app.routes.quizzes', 'quizzes_bp', '/api/quizzes'),
+    ('app.routes.media', 'media_bp', '/api/media'),
+)
+
+
+def init_migrate(app):
+    """Set up Flask-Migrate; alembic is slow to import and only the CLI needs it"""
+    from flask_migrate import Migrate
+    from app import models  # noqa: F401 - register every table with the metadata
+    Migrate(app, db)
 
 
 def create_app(config_class=Config):
@@ -19,50 +58,60 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Behind N trusted proxies, take the client address from X-Forwarded-For;
+    # the login throttle keys on it, so leave this at 0 when not proxied
+    proxies = app.config.get('PROXY_FIX_X_FOR', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)
+    unit_of_work.init_app(app, db)
     cors.init_app(app)
     jwt.init_app(app)
-    bcrypt.init_app(app)
-
-    # Import models for Flask-Migrate
-    from app.models import User, Content, Category, Enrollment, Review, Progress, Tag
-
-    # Register blueprints
-    from app.routes.auth import auth_bp
-    from app.routes.users import users_bp
-    from app.routes.content import content_bp
-    from app.routes.categories import categories_bp
-    from app.routes.enrollments import enrollments_bp
-    from app.routes.reviews import reviews_bp
-    from app.routes.search import search_bp
-    from app.routes.progress import progress_bp
-
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(users_bp, url_prefix='/api/users')
-    app.register_blueprint(content_bp, url_prefix='/api/content')
-    app.register_blueprint(categories_bp, url_prefix='/api/categories')
-    app.register_blueprint(enrollments_bp, url_prefix='/api/enrollments')
-    app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
-    app.register_blueprint(search_bp, url_prefix='/api/search')
-    app.register_blueprint(progress_bp, url_prefix='/api/progress')
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    event_bus.init_app(app)
+    compressor.init_app(app)
+    recent_activity.init_app(app)
+    static_assets.init_app(app)
+
+    # Migrations run as a separate one-shot ``flask db upgrade`` job
+    running_cli = click.get_current_context(silent=True) is not None
+    if running_cli:
+        init_migrate(app)
+
+    # Register blueprints; ENABLED_BLUEPRINTS trims the set, e.g. for workers
+    enabled = app.config.get('ENABLED_BLUEPRINTS')
+    for module_name, blueprint_name, url_prefix in BLUEPRINTS:
+        if enabled is None or blueprint_name in enabled:
+            app.register_blueprint(getattr(import_module(module_name), blueprint_name), url_prefix=url_prefix)
+
+    if app.config.get('WARM_UP_ON_START', False) and not running_cli:
+        from app.utils.warmup import start_warm_up
+        start_warm_up(app)
 
     @app.route('/api/health')
     def health_check():
         return {'status': 'healthy', 'message': 'Education Platform API is running'}, 200
 
+    @app.route('/api/ready')
+    def readiness_check():
+        """Readiness probe; fails until warm-up has finished"""
+        state = app.extensions.get('warm_up')
+        if state is not None and not state['ready']:
+            return {'status': 'warming_up'}, 503
+        return {'status': 'ready', 'warm_up': state['timings'] if state else None}, 200
+
     @app.route('/')
     def index():
         """Serve the frontend login page"""
-        from flask import send_from_directory
-        return send_from_directory('frontend', 'index.html')
+        return static_assets.serve_page('index.html')
 
     @app.route('/dashboard')
     def dashboard():
         """Serve the frontend dashboard"""
-        from flask import send_from_directory
-        return send_from_directory('frontend', 'dashboard.html')
+        return static_assets.serve_page('dashboard.html')
 
     return app
 
@@ -0,0 +1,233 @@
+"""Lightweight background task queue backed by the ``jobs`` table.
+
+Routes enqueue work with ``some_task.delay(...)``. The job row is added to
+the current session, so it is committed together with the request's own
+changes and never runs for a rolled-back request. Workers started with
+``flask run-worker`` claim due jobs and execute them in a thread pool;
+``python main.py`` also runs one in the web process unless
+``JOBS_EMBEDDED_WORKER`` is turned off for deployments with dedicated workers.
+
+A worker refreshes ``locked_at`` of its running jobs every
+``JOBS_HEARTBEAT_INTERVAL`` seconds. Only jobs whose heartbeat has been
+silent for ``JOBS_LOCK_TIMEOUT`` seconds, because their worker died or the
+job overran its timeout, are handed back to the queue, so a long purge is
+never run twice at once.
+"""
+
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.job import Job, JobStatus
+
+_registry = {}
+
+
+class Task:
+    """A function registered for background execution"""
+
+    def __init__(self, func, name, max_attempts, timeout=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Enqueue the task with the given arguments"""
+        return self.apply_async(args, kwargs)
+
+    def apply_async(self, args=(), kwargs=None, idempotency_key=None, run_at=None):
+        """Enqueue the task with explicit queueing options.
+
+        A job whose ``idempotency_key`` was already enqueued is not enqueued
+        again. ``run_at`` defers execution until the given UTC datetime.
+        """
+        if current_app.config.get('JOBS_EAGER', False):
+            self.func(*args, **(kwargs or {}))
+            return None
+
+        if idempotency_key:
+            existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+            if existing:
+                return existing
+
+        job = Job(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs or {},
+            idempotency_key=idempotency_key,
+            max_attempts=self.max_attempts,
+            run_at=run_at or datetime.utcnow()
+        )
+        if not idempotency_key:
+            db.session.add(job)
+            return job
+        try:
+            with db.session.begin_nested():
+                db.session.add(job)
+        except IntegrityError:
+            # A concurrent enqueue with the same key got there first
+            return Job.query.filter_by(idempotency_key=idempotency_key).first()
+        return job
+
+
+def background_task(func=None, name=None, max_attempts=5, timeout=None):
+    """Register a function as a background task.
+
+    Task functions run inside an application context and should not commit;
+    the worker commits once the function returns and rolls back if it raises.
+    ``timeout`` (seconds, ``JOBS_TIMEOUT`` by default) is how long the worker
+    keeps a running job's heartbeat going; past it the job counts as hung.
+    """
+    def decorator(f):
+        task = Task(f, name or f'{f.__module__}.{f.__name__}', max_attempts, timeout)
+        _registry[task.name] = task
+        return task
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+class Worker:
+    """Claims due jobs from the database and runs them in a thread pool"""
+
+    def __init__(self, app, concurrency=4, poll_interval=1.0):
+        self.app = app
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.lock_timeout = app.config.get('JOBS_LOCK_TIMEOUT', 120)
+        self.heartbeat_interval = app.config.get('JOBS_HEARTBEAT_INTERVAL', 15)
+        # Longer than the slowest batched task, a full user purge
+        self.default_timeout = app.config.get('JOBS_TIMEOUT', 6 * 3600)
+        self.retry_backoff = app.config.get('JOBS_RETRY_BACKOFF', 5)
+        self._running = {}  # Job id -> monotonic deadline
+        self._last_requeue = 0
+        self._last_heartbeat = 0
+
+    def heartbeat(self):
+        """Refresh ``locked_at`` of this worker's running jobs that are within their timeout"""
+        now = time.monotonic()
+        if now - self._last_heartbeat < self.heartbeat_interval:
+            return
+        self._last_heartbeat = now
+        alive = [job_id for job_id, deadline in list(self._running.items()) if deadline > now]
+        if not alive:
+            return
+        try:
+            Job.query.filter(
+                Job.id.in_(alive),
+                Job.status == JobStatus.RUNNING,
+                Job.locked_by == self.worker_id
+            ).update({'locked_at': datetime.utcnow()}, synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            # A missed beat is retried on the next one, well within the lock timeout
+            db.session.rollback()
+            current_app.logger.exception('Job heartbeat failed')
+
+    def requeue_stale(self):
+        """Return jobs whose heartbeat stopped (dead worker or hung job) to the queue"""
+        if time.monotonic() - self._last_requeue < self.heartbeat_interval:
+            return
+        self._last_requeue = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lock_timeout)
+        Job.query.filter(
+            Job.status == JobStatus.RUNNING,
+            Job.locked_at < cutoff
+        ).update({'status': JobStatus.PENDING, 'locked_by': None}, synchronize_session=False)
+        db.session.commit()
+
+    def claim(self, limit):
+        """Atomically mark up to ``limit`` due jobs as running for this worker"""
+        now = datetime.utcnow()
+        candidates = db.session.query(Job.id).filter(
+            Job.status == JobStatus.PENDING,
+            Job.run_at <= now
+        ).order_by(Job.run_at).limit(limit).all()
+
+        claimed = []
+        for (job_id,) in candidates:
+            # Conditional update so concurrent workers never run the same job
+            updated = Job.query.filter_by(id=job_id, status=JobStatus.PENDING).update({
+                'status': JobStatus.RUNNING,
+                'locked_at': now,
+                'locked_by': self.worker_id,
+                'attempts': Job.attempts + 1
+            }, synchronize_session=False)
+            if updated:
+                claimed.append(job_id)
+        db.session.commit()
+        return claimed
+
+    def execute(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            task = _registry.get(job.name)
+            timeout = task.timeout if task is not None and task.timeout else self.default_timeout
+            self._running[job_id] = time.monotonic() + timeout
+            try:
+                if task is None:
+                    raise LookupError(f'Unknown task: {job.name}')
+                task.func(*(job.args or []), **(job.kwargs or {}))
+                job.status = JobStatus.SUCCEEDED
+                job.last_error = None
+                db.session.commit()
+            except Exception:
+                error = traceback.format_exc()
+                db.session.rollback()
+                job = db.session.get(Job, job_id)
+                if job.attempts >= job.max_attempts:
+                    job.status = JobStatus.FAILED
+                else:
+                    job.status = JobStatus.PENDING
+                    job.run_at = datetime.utcnow() + timedelta(
+                        seconds=self.retry_backoff * 2 ** (job.attempts - 1)
+                    )
+                job.locked_by = None
+                job.last_error = error
+                db.session.commit()
+                current_app.logger.warning('Job %s (%s) failed: %s', job_id, job.name, error)
+            finally:
+                self._running.pop(job_id, None)
+
+    def start(self):
+        """Run the worker in a daemon thread of the current process"""
+        thread = threading.Thread(target=self.run, name='job-worker', daemon=True)
+        thread.start()
+        return thread
+
+    def run(self, once=False):
+        """Process jobs until interrupted, or until the queue is drained if ``once``"""
+        # Import task modules so their functions are registered
+        from app.jobs import tasks  # noqa: F401
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = set()
+            while True:
+                in_flight = {future for future in in_flight if not future.done()}
+                free = self.concurrency - len(in_flight)
+
+                claimed = []
+                with self.app.app_context():
+                    self.heartbeat()
+                    if free > 0:
+                        self.requeue_stale()
+                        claimed = self.claim(free)
+                for job_id in claimed:
+                    in_flight.add(executor.submit(self.execute, job_id))
+
+                if once and not claimed and not in_flight:
+                    break
+                if not claimed:
+                    time.sleep(self.poll_interval)
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from flask import current_app, has_request_context
+from app import db
+from app.jobs import background_task
+from app.models.content import Content
+from app.models.media import MediaAsset, MediaStatus
+
+
+@background_task
+def refresh_content_rating(content_id):
+    """Recompute a content item's rating aggregates from its reviews"""
+    content = db.session.get(Content, content_id)
+    if content:
+        # Detail reads lay the live rating over the snapshot, so it stays as published
+        content.update_rating()
+
+
+@background_task
+def rollup_analytics(reschedule=False):
+    """Roll new activity into the per-content daily metrics"""
+    from app.utils.analytics import rollup_content_metrics
+    rollup_content_metrics()
+    
+    if reschedule:
+        interval = current_app.config.get('ANALYTICS_ROLLUP_INTERVAL', 300)
+        run_at = datetime.utcnow() + timedelta(seconds=interval)
+        # One scheduled run per interval, however many workers reschedule
+        slot = int(run_at.timestamp()) // interval
+        rollup_analytics.apply_async(
+            kwargs={'reschedule': True},
+            idempotency_key=f'rollup-analytics:{slot}',
+            run_at=run_at
+        )
+
+
+@background_task
+def archive_stale_records(reschedule=False):
+    """Move finished enrollments and stale progress into the archive"""
+    from app.utils.archival import archive_stale_records as archive
+    archive()
+    
+    if reschedule:
+        interval = current_app.config.get('ARCHIVAL_INTERVAL', 86400)
+        run_at = datetime.utcnow() + timedelta(seconds=interval)
+        slot = int(run_at.timestamp()) // interval
+        archive_stale_records.apply_async(
+            kwargs={'reschedule': True},
+            idempotency_key=f'archive-stale-records:{slot}',
+            run_at=run_at
+        )
+
+
+@background_task
+def reconcile_instructor_stats():
+    """Repair drift in the per-instructor counters"""
+    from app.utils.instructor_stats import reconcile_instructor_stats as reconcile
+    reconcile()
+
+
+@background_task
+def process_media(asset_id):
+    """Hash, probe and thumbnail a completed upload in the media process pool"""
+    from app.utils.media import DECODE_ERRORS, analyze, apply_analysis
+    asset = db.session.get(MediaAsset, asset_id)
+    if asset is None or asset.status != MediaStatus.PROCESSING:
+        return
+    upload = (asset.id, asset.storage_path, asset.mime_type, asset.size_bytes)
+    if not has_request_context():
+        # A worker holds no transaction while the pool works; an eager run
+        # inside a request must leave the request's transaction alone
+        db.session.rollback()
+
+    try:
+        analysis = analyze(*upload)
+    except DECODE_ERRORS as e:
+        # A file that cannot be decoded fails the same way on every retry;
+        # anything else (database, pool, disk) goes back to the queue
+        current_app.logger.warning('Media asset %s failed processing: %s', asset_id, e)
+        analysis = e
+
+    # The results are written in a fresh transaction
+    asset = db.session.get(MediaAsset, asset_id)
+    if asset is None or asset.status != MediaStatus.PROCESSING:
+        return  # Deleted while it was being processed
+    if isinstance(analysis, Exception):
+        asset.status = MediaStatus.FAILED
+        asset.error = str(analysis) or analysis.__class__.__name__
+        return
+    apply_analysis(asset, analysis)
+
+
+@background_task
+def purge_content(content_id):
+    """Hard-delete a soft-deleted content item in committed batches"""
+    from app.utils.deletion import purge_content as purge
+    purge(content_id, batch_size=current_app.config.get('PURGE_BATCH_SIZE', 1000))
+
+
+@background_task
+def purge_user(user_id):
+    """Hard-delete a soft-deleted user and their data in committed batches"""
+    from app.utils.deletion import purge_user as purge
+    purge(user_id, batch_size=current_app.config.get('PURGE_BATCH_SIZE', 1000))
@@ -2,9 +2,17 @@ from app.models.user import User
 from app.models.content import Content, ContentType
 from app.models.category import Category
 from app.models.enrollment import Enrollment
-from app.models.review import Review
+from app.models.review import Review, ReviewVote
 from app.models.progress import Progress
 from app.models.tag import Tag, content_tags
+from app.models.job import Job, JobStatus
+from app.models.analytics import ContentDailyMetrics, ProgressRollupState, AnalyticsWatermark
+from app.models.instructor_stats import InstructorStats
+from app.models.revision import ContentRevision, ContentSnapshot
+from app.models.archive import ArchivedRecord
+from app.models.learning_path import ContentPrerequisite, ContentPrerequisiteClosure
+from app.models.quiz import QuizQuestion, QuizAttempt, QuestionType
+from app.models.media import MediaAsset, MediaStatus
 
 __all__ = [
     'User',
@@ -13,8 +21,25 @@ __all__ = [
     'Category',
     'Enrollment',
     'Review',
+    'ReviewVote',
     'Progress',
     'Tag',
-    'content_tags'
+    'content_tags',
+    'Job',
+    'JobStatus',
+    'ContentDailyMetrics',
+    'ProgressRollupState',
+    'AnalyticsWatermark',
+    'InstructorStats',
+    'ContentRevision',
+    'ContentSnapshot',
+    'ArchivedRecord',
+    'ContentPrerequisite',
+    'ContentPrerequisiteClosure',
+    'QuizQuestion',
+    'QuizAttempt',
+    'QuestionType',
+    'MediaAsset',
+    'MediaStatus'
 ]
 
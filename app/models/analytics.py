@@ -0,0 +1,95 @@
+from datetime import datetime
+from app import db
+from sqlalchemy import func
+
+
+class ContentDailyMetrics(db.Model):
+    """Per-content daily rollup of learning activity"""
+    __tablename__ = 'content_daily_metrics'
+
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    instructor_id = db.Column(db.Integer, nullable=False, index=True)
+    new_enrollments = db.Column(db.Integer, default=0, nullable=False)
+    completions = db.Column(db.Integer, default=0, nullable=False)
+    # Progress rows whose latest update fell on this day
+    progress_updates = db.Column(db.Integer, default=0, nullable=False)
+    completion_sum = db.Column(db.Float, default=0.0, nullable=False)
+    # Drop-off buckets by completion percentage
+    bucket_0_25 = db.Column(db.Integer, default=0, nullable=False)
+    bucket_25_50 = db.Column(db.Integer, default=0, nullable=False)
+    bucket_50_75 = db.Column(db.Integer, default=0, nullable=False)
+    bucket_75_100 = db.Column(db.Integer, default=0, nullable=False)
+    bucket_complete = db.Column(db.Integer, default=0, nullable=False)
+    review_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (db.Index('ix_content_daily_metrics_instructor_day', 'instructor_id', 'day'),)
+
+    METRICS = (
+        'new_enrollments', 'completions', 'progress_updates', 'completion_sum',
+        'bucket_0_25', 'bucket_25_50', 'bucket_50_75', 'bucket_75_100', 'bucket_complete',
+        'review_count', 'rating_sum'
+    )
+
+    @classmethod
+    def summarize(cls, *criteria):
+        """Aggregate rollup rows matching ``criteria`` into totals and a daily series"""
+        sums = [func.coalesce(func.sum(getattr(cls, name)), 0).label(name) for name in cls.METRICS]
+        totals = db.session.query(*sums).filter(*criteria).one()
+        daily = db.session.query(cls.day, *sums).filter(*criteria).group_by(cls.day).order_by(cls.day).all()
+        return {
+            'totals': cls._metrics_dict(totals),
+            'daily': [dict(day=row.day.isoformat(), **cls._metrics_dict(row)) for row in daily],
+        }
+
+    @staticmethod
+    def _metrics_dict(row):
+        return {
+            'new_enrollments': int(row.new_enrollments),
+            'completions': int(row.completions),
+            'progress_updates': int(row.progress_updates),
+            'average_completion': round(float(row.completion_sum) / row.progress_updates, 2) if row.progress_updates else 0.0,
+            'dropoff': {
+                '0-25': int(row.bucket_0_25),
+                '25-50': int(row.bucket_25_50),
+                '50-75': int(row.bucket_50_75),
+                '75-100': int(row.bucket_75_100),
+                'completed': int(row.bucket_complete),
+            },
+            'review_count': int(row.review_count),
+            'average_rating': round(float(row.rating_sum) / row.review_count, 2) if row.review_count else 0.0,
+        }
+
+    def __repr__(self):
+        return f'<ContentDailyMetrics content_id={self.content_id} day={self.day}>'
+
+    def to_dict(self):
+        """Convert daily metrics to dictionary"""
+        return dict(content_id=self.content_id, day=self.day.isoformat(), **self._metrics_dict(self))
+
+
+class ProgressRollupState(db.Model):
+    """The day and bucket each (user, content) progress row was last rolled up into"""
+    __tablename__ = 'progress_rollup_state'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.Integer, primary_key=True, index=True)
+    day = db.Column(db.Date, nullable=False)
+    bucket = db.Column(db.SmallInteger, nullable=False)
+    completion = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f'<ProgressRollupState user_id={self.user_id} content_id={self.content_id} day={self.day}>'
+
+
+class AnalyticsWatermark(db.Model):
+    """Records how far each analytics rollup has processed source rows"""
+    __tablename__ = 'analytics_watermarks'
+
+    name = db.Column(db.String(100), primary_key=True)
+    processed_until = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AnalyticsWatermark {self.name} {self.processed_until}>'
@@ -0,0 +1,33 @@
+import json
+import zlib
+from datetime import datetime
+from app import db
+
+
+class ArchivedRecord(db.Model):
+    """ArchivedRecord model - cold storage for archived enrollment and progress rows"""
+    __tablename__ = 'archived_records'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # enrollment, progress
+    user_id = db.Column(db.Integer, nullable=False)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON of the row
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    content = db.relationship('Content', backref=db.backref(
+        'archived_records', lazy='dynamic', cascade='all, delete-orphan'
+    ))
+
+    # One archived row per user-content pair and kind; also serves per-user history reads
+    __table_args__ = (db.UniqueConstraint('user_id', 'kind', 'content_id', name='unique_archived_record'),)
+
+    def __repr__(self):
+        return f'<ArchivedRecord {self.kind} user_id={self.user_id} content_id={self.content_id}>'
+
+    @staticmethod
+    def pack(values):
+        return zlib.compress(json.dumps(values, separators=(',', ':')).encode(), 6)
+
+    def unpack(self):
+        return json.loads(zlib.decompress(self.payload))
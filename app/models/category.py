@@ -13,6 +13,7 @@ class Category(db.Model):
     icon_url = db.Column(db.String(500), nullable=True)
     parent_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Self-referential relationship for nested categories
     children = db.relationship('Category', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
@@ -30,5 +31,6 @@ class Category(db.Model):
             'icon_url': self.icon_url,
             'parent_id': self.parent_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
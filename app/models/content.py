@@ -4,6 +4,7 @@ from app.models.enrollment import Enrollment
 from app.models.review import Review
 from app.models.progress import Progress
 from app.models.tag import content_tags
+from app.models.soft_delete import SoftDeleteMixin
 from sqlalchemy import func
 
 
@@ -16,7 +17,14 @@ class ContentType:
     PODCAST = 'podcast'
 
 
-class Content(db.Model):
+def excerpt(text, length=200):
+    """Shorten text to at most ``length`` characters on a word boundary"""
+    if not text or len(text) <= length:
+        return text
+    return text[:length].rsplit(' ', 1)[0].rstrip(' ,.;:') + '…'
+
+
+class Content(SoftDeleteMixin, db.Model):
     """Content model - core learning material"""
     __tablename__ = 'content'
 
@@ -68,8 +76,6 @@ class Content(db.Model):
         else:
             self.rating_average = 0.00
             self.rating_count = 0
-        
-        db.session.commit()
 
     def to_dict(self, include_details=False):
         """Convert content to dictionary"""
@@ -108,3 +114,22 @@ class Content(db.Model):
         
         return data
 
+    @staticmethod
+    def compact_dict(data):
+        """Slim a to_dict() result down for listings"""
+        return {
+            'id': data['id'],
+            'title': data['title'],
+            'excerpt': excerpt(data['description']),
+            'content_type': data['content_type'],
+            'thumbnail_url': data['thumbnail_url'],
+            'duration_minutes': data['duration_minutes'],
+            'difficulty_level': data['difficulty_level'],
+            'price': data['price'],
+            'is_free': data['is_free'],
+            'rating_average': data['rating_average'],
+            'rating_count': data['rating_count'],
+            'instructor_name': data['instructor']['full_name'] if data['instructor'] else None,
+            'category_id': data['category']['id'] if data['category'] else None,
+        }
+
@@ -1,21 +1,24 @@
 from datetime import datetime
+from sqlalchemy import event
 from app import db
+from app.models.partitioning import USER_PARTITION_ARGS, UserPartitionedMixin, create_hash_partitions, generate_id
 
 
-class Enrollment(db.Model):
+class Enrollment(UserPartitionedMixin, db.Model):
     """Enrollment model - tracks student enrollments in content"""
     __tablename__ = 'enrollments'
 
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # Composite key: unique keys of a partitioned table must include user_id
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False, default=generate_id)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
-    enrolled_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    completed_at = db.Column(db.DateTime, nullable=True)
+    enrolled_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    completed_at = db.Column(db.DateTime, nullable=True, index=True)
     is_completed = db.Column(db.Boolean, default=False, nullable=False)
     last_accessed_at = db.Column(db.DateTime, nullable=True)
 
     # Unique constraint: one enrollment per user-content pair
-    __table_args__ = (db.UniqueConstraint('user_id', 'content_id', name='unique_user_content'),)
+    __table_args__ = (db.UniqueConstraint('user_id', 'content_id', name='unique_user_content'), USER_PARTITION_ARGS)
 
     def __repr__(self):
         return f'<Enrollment user_id={self.user_id} content_id={self.content_id}>'
@@ -32,3 +35,5 @@ class Enrollment(db.Model):
             'last_accessed_at': self.last_accessed_at.isoformat() if self.last_accessed_at else None,
         }
 
+
+event.listen(Enrollment.__table__, 'after_create', create_hash_partitions)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app import db
+
+
+class InstructorStats(db.Model):
+    """InstructorStats model - per-instructor counters maintained on writes"""
+    __tablename__ = 'instructor_stats'
+
+    instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    content_count = db.Column(db.Integer, default=0, nullable=False)
+    published_content_count = db.Column(db.Integer, default=0, nullable=False)
+    total_enrollments = db.Column(db.Integer, default=0, nullable=False, index=True)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    instructor = db.relationship('User', backref=db.backref('instructor_stats', uselist=False))
+
+    COUNTERS = ('content_count', 'published_content_count', 'total_enrollments', 'rating_sum', 'rating_count')
+
+    def __repr__(self):
+        return f'<InstructorStats instructor_id={self.instructor_id}>'
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else 0.0
+
+    def to_dict(self):
+        """Convert instructor stats to dictionary"""
+        return {
+            'content_count': self.content_count,
+            'published_content_count': self.published_content_count,
+            'total_enrollments': self.total_enrollments,
+            'average_rating': self.average_rating,
+            'rating_count': self.rating_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
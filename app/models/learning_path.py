@@ -0,0 +1,30 @@
+from datetime import datetime
+from app import db
+
+
+class ContentPrerequisite(db.Model):
+    """ContentPrerequisite model - edge of the learning path graph"""
+    __tablename__ = 'content_prerequisites'
+
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True)
+    prerequisite_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<ContentPrerequisite {self.prerequisite_id} -> {self.content_id}>'
+
+
+class ContentPrerequisiteClosure(db.Model):
+    """Transitive closure of the prerequisite graph.
+
+    One row per (ancestor, descendant) pair connected by a path, counting
+    the distinct paths so removing an edge can be applied incrementally.
+    """
+    __tablename__ = 'content_prerequisite_closure'
+
+    ancestor_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True)
+    descendant_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True, index=True)
+    path_count = db.Column(db.Integer, default=1, nullable=False)
+
+    def __repr__(self):
+        return f'<ContentPrerequisiteClosure {self.ancestor_id} -> {self.descendant_id} ({self.path_count})>'
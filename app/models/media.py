@@ -0,0 +1,57 @@
+from datetime import datetime
+from app import db
+
+
+class MediaStatus:
+    UPLOADING = 'uploading'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+
+class MediaAsset(db.Model):
+    """MediaAsset model - an uploaded media file and its derived thumbnails"""
+    __tablename__ = 'media_assets'
+
+    id = db.Column(db.Integer, primary_key=True)
+    uploader_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=True, index=True)
+    filename = db.Column(db.String(255), nullable=False)
+    mime_type = db.Column(db.String(100), nullable=True)
+    size_bytes = db.Column(db.BigInteger, nullable=False)  # Declared when the upload starts
+    bytes_received = db.Column(db.BigInteger, default=0, nullable=False)
+    status = db.Column(db.String(20), default=MediaStatus.UPLOADING, nullable=False)
+    storage_path = db.Column(db.String(500), nullable=False)  # Relative to MEDIA_ROOT
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    # Set when the bytes matched an earlier upload; both share its files
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('media_assets.id'), nullable=True)
+    thumbnails = db.Column(db.JSON, nullable=True)  # {"320": "media/1/thumb_320.jpg", ...}
+    metadata_json = db.Column(db.JSON, nullable=True)  # Duration, dimensions, codecs, ...
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    content = db.relationship('Content', backref=db.backref('media_assets', lazy='dynamic'))
+
+    def __repr__(self):
+        return f'<MediaAsset {self.id} {self.filename} {self.status}>'
+
+    def to_dict(self):
+        """Convert media asset to dictionary"""
+        return {
+            'id': self.id,
+            'uploader_id': self.uploader_id,
+            'content_id': self.content_id,
+            'filename': self.filename,
+            'mime_type': self.mime_type,
+            'size_bytes': self.size_bytes,
+            'bytes_received': self.bytes_received,
+            'status': self.status,
+            'sha256': self.sha256,
+            'duplicate_of_id': self.duplicate_of_id,
+            'thumbnail_sizes': sorted(int(size) for size in self.thumbnails) if self.thumbnails else [],
+            'metadata': self.metadata_json or {},
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
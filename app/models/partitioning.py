@@ -0,0 +1,88 @@
+"""Hash partitioning of per-user tables.
+
+``enrollments`` and ``progress`` grow with users x content, so on
+PostgreSQL they are declared ``PARTITION BY HASH (user_id)`` and split into
+``USER_PARTITION_COUNT`` partitions when the table is created. Every unique
+key has to include the partition key, so these tables use a composite
+``(id, user_id)`` primary key with application-generated ids. SQLite
+ignores the partitioning options and gets plain tables.
+
+Queries that filter on ``user_id`` are pruned to a single partition, so
+user-scoped reads and writes go through ``UserPartitionedMixin.for_user``
+rather than looking rows up by id alone.
+"""
+
+import os
+import socket
+import threading
+import time
+import zlib
+from flask import current_app, has_app_context
+from sqlalchemy import text
+
+# Keyword arguments for ``__table_args__`` of user-partitioned tables
+USER_PARTITION_ARGS = {'postgresql_partition_by': 'HASH (user_id)'}
+
+ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+WORKER_BITS = 6
+SEQUENCE_BITS = 6
+_lock = threading.Lock()
+_last = {'pid': None, 'worker': 0, 'ms': 0, 'sequence': 0}
+
+
+def _worker_id():
+    """``ID_WORKER_ID`` if configured, else a hash of this host and process"""
+    worker = current_app.config.get('ID_WORKER_ID') if has_app_context() else None
+    if worker is None:
+        worker = zlib.crc32(f'{socket.gethostname()}:{os.getpid()}'.encode('utf-8'))
+    return worker & ((1 << WORKER_BITS) - 1)
+
+
+def generate_id():
+    """Return a time-ordered 53-bit id: 41 bits of milliseconds, 6 of worker, 6 of sequence.
+
+    Ids stay within JavaScript's safe integer range and need no database
+    sequence, so they work the same on every dialect and partition. The
+    worker bits keep processes that write in the same millisecond apart;
+    give each process a distinct ``ID_WORKER_ID`` (0-63) to rule collisions
+    out entirely. A process that runs out of sequence numbers borrows the
+    next millisecond rather than waiting for it.
+    """
+    with _lock:
+        if _last['pid'] != os.getpid():
+            # First id in this process, or in a child forked from it
+            _last.update(pid=os.getpid(), worker=_worker_id(), ms=0, sequence=0)
+        now = int(time.time() * 1000) - ID_EPOCH_MS
+        if now > _last['ms']:
+            _last.update(ms=now, sequence=0)
+        else:
+            _last['sequence'] += 1
+            if _last['sequence'] >> SEQUENCE_BITS:
+                _last.update(ms=_last['ms'] + 1, sequence=0)
+        return (_last['ms'] << WORKER_BITS | _last['worker']) << SEQUENCE_BITS | _last['sequence']
+
+
+def create_hash_partitions(table, connection, **kw):
+    """``after_create`` hook adding the hash partitions on PostgreSQL"""
+    if connection.dialect.name != 'postgresql':
+        return
+    count = current_app.config.get('USER_PARTITION_COUNT', 16) if has_app_context() else 16
+    for remainder in range(count):
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {table.name}_p{remainder} PARTITION OF {table.name} '
+            f'FOR VALUES WITH (MODULUS {count}, REMAINDER {remainder})'
+        ))
+
+
+class UserPartitionedMixin:
+    """Routing helpers for tables partitioned by ``user_id``"""
+
+    @classmethod
+    def for_user(cls, user_id):
+        """Query rows of one user; prunes to that user's partition"""
+        return cls.query.filter(cls.user_id == user_id)
+
+    @classmethod
+    def get_for_user_or_404(cls, user_id, row_id):
+        """Fetch a user's row by id, or abort with 404"""
+        return cls.for_user(user_id).filter(cls.id == row_id).first_or_404()
@@ -1,22 +1,25 @@
 from datetime import datetime
+from sqlalchemy import event
 from app import db
+from app.models.partitioning import USER_PARTITION_ARGS, UserPartitionedMixin, create_hash_partitions, generate_id
 
 
-class Progress(db.Model):
+class Progress(UserPartitionedMixin, db.Model):
     """Progress model - tracks user progress through content"""
     __tablename__ = 'progress'
 
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # Composite key: unique keys of a partitioned table must include user_id
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=False, default=generate_id)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
     completion_percentage = db.Column(db.Numeric(5, 2), default=0.00, nullable=False)  # 0.00 to 100.00
     last_position = db.Column(db.Integer, nullable=True)  # Last video position in seconds, etc.
     notes = db.Column(db.Text, nullable=True)
     bookmarked = db.Column(db.Boolean, default=False, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Unique constraint: one progress record per user-content pair
-    __table_args__ = (db.UniqueConstraint('user_id', 'content_id', name='unique_user_progress'),)
+    __table_args__ = (db.UniqueConstraint('user_id', 'content_id', name='unique_user_progress'), USER_PARTITION_ARGS)
 
     def __repr__(self):
         return f'<Progress user_id={self.user_id} content_id={self.content_id} {self.completion_percentage}%>'
@@ -34,3 +37,5 @@ class Progress(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
+
+event.listen(Progress.__table__, 'after_create', create_hash_partitions)
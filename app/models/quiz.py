@@ -0,0 +1,96 @@
+from datetime import datetime
+from app import db
+
+
+class QuestionType:
+    SINGLE_CHOICE = 'single_choice'
+    MULTIPLE_CHOICE = 'multiple_choice'
+    TRUE_FALSE = 'true_false'
+
+
+class QuizQuestion(db.Model):
+    """QuizQuestion model - question bank entry of quiz content"""
+    __tablename__ = 'quiz_questions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, default=0, nullable=False)
+    question_type = db.Column(db.String(20), default=QuestionType.SINGLE_CHOICE, nullable=False)
+    prompt = db.Column(db.Text, nullable=False)
+    choices = db.Column(db.JSON, nullable=False)  # List of choice texts
+    correct_choices = db.Column(db.JSON, nullable=False)  # Indices into choices
+    points = db.Column(db.Integer, default=1, nullable=False)
+    explanation = db.Column(db.Text, nullable=True)
+    # Maintained incrementally as attempts are graded
+    attempt_count = db.Column(db.Integer, default=0, nullable=False)
+    correct_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    content = db.relationship('Content', backref=db.backref(
+        'quiz_questions', lazy='dynamic', cascade='all, delete-orphan'
+    ))
+
+    def __repr__(self):
+        return f'<QuizQuestion {self.id} content_id={self.content_id}>'
+
+    def to_dict(self, include_answers=False):
+        """Convert question to dictionary"""
+        data = {
+            'id': self.id,
+            'content_id': self.content_id,
+            'position': self.position,
+            'question_type': self.question_type,
+            'prompt': self.prompt,
+            'choices': self.choices,
+            'points': self.points,
+        }
+        
+        if include_answers:
+            data['correct_choices'] = self.correct_choices
+            data['explanation'] = self.explanation
+            data['attempt_count'] = self.attempt_count
+            data['correct_count'] = self.correct_count
+            data['correct_rate'] = round(self.correct_count / self.attempt_count, 4) if self.attempt_count else None
+        
+        return data
+
+
+class QuizAttempt(db.Model):
+    """QuizAttempt model - a graded quiz submission"""
+    __tablename__ = 'quiz_attempts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False, index=True)
+    answers = db.Column(db.JSON, nullable=False)  # {question_id: [choice indices]}
+    results = db.Column(db.JSON, nullable=False)  # {question_id: correct}
+    score = db.Column(db.Float, nullable=False)
+    max_score = db.Column(db.Float, nullable=False)
+    percentage = db.Column(db.Float, nullable=False)
+    passed = db.Column(db.Boolean, default=False, nullable=False)
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    content = db.relationship('Content', backref=db.backref(
+        'quiz_attempts', lazy='dynamic', cascade='all, delete-orphan'
+    ))
+
+    __table_args__ = (db.Index('ix_quiz_attempts_user_content', 'user_id', 'content_id', 'submitted_at'),)
+
+    def __repr__(self):
+        return f'<QuizAttempt {self.id} user_id={self.user_id} {self.percentage}%>'
+
+    def to_dict(self):
+        """Convert attempt to dictionary"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'content_id': self.content_id,
+            'answers': self.answers,
+            'results': self.results,
+            'score': self.score,
+            'max_score': self.max_score,
+            'percentage': self.percentage,
+            'passed': self.passed,
+            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
+        }
@@ -1,6 +1,6 @@
 from datetime import datetime
 from app import db
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, func, select, update
 
 
 class Review(db.Model):
@@ -15,18 +15,34 @@ class Review(db.Model):
     comment = db.Column(db.Text, nullable=True)
     is_verified_purchase = db.Column(db.Boolean, default=False, nullable=False)
     helpful_count = db.Column(db.Integer, default=0, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Unique constraint: one review per user-content pair
     __table_args__ = (
         db.UniqueConstraint('user_id', 'content_id', name='unique_user_review'),
+        # Serves sort_by=helpful for a content item's reviews
+        db.Index('ix_reviews_content_helpful', 'content_id', 'helpful_count', 'id'),
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range')
     )
 
     def __repr__(self):
         return f'<Review {self.id} rating={self.rating}>'
 
+    @classmethod
+    def reconcile_helpful_counts(cls):
+        """Rebuild helpful_count from review_votes wherever they disagree. The caller commits.
+
+        Increments still buffered in running web processes land on top of
+        the rebuilt value, so run this when vote traffic is quiet. Returns
+        the number of reviews corrected.
+        """
+        votes = select(func.count(ReviewVote.id)).where(ReviewVote.review_id == cls.id).scalar_subquery()
+        return db.session.execute(update(cls).where(cls.helpful_count != votes).values(
+            helpful_count=votes,
+            updated_at=cls.updated_at
+        ).execution_options(synchronize_session=False)).rowcount
+
     def to_dict(self, include_user=False):
         """Convert review to dictionary"""
         data = {
@@ -52,3 +68,19 @@ class Review(db.Model):
         
         return data
 
+
+class ReviewVote(db.Model):
+    """ReviewVote model - one helpful vote per user and review"""
+    __tablename__ = 'review_votes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    review_id = db.Column(db.Integer, db.ForeignKey('reviews.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    review = db.relationship('Review', backref=db.backref('votes', lazy='dynamic', cascade='all, delete-orphan'))
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'review_id', name='unique_user_review_vote'),)
+
+    def __repr__(self):
+        return f'<ReviewVote user_id={self.user_id} review_id={self.review_id}>'
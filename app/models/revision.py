@@ -0,0 +1,52 @@
+from datetime import datetime
+from app import db
+
+
+class ContentRevision(db.Model):
+    """ContentRevision model - immutable edit history stored as deltas"""
+    __tablename__ = 'content_revisions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), nullable=False)
+    revision_number = db.Column(db.Integer, nullable=False)
+    # Keyframes hold the full state; other revisions only the fields that changed
+    is_keyframe = db.Column(db.Boolean, default=False, nullable=False)
+    delta = db.Column(db.JSON, nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    content = db.relationship('Content', backref=db.backref(
+        'revisions', lazy='dynamic', cascade='all, delete-orphan', order_by='ContentRevision.revision_number'
+    ))
+
+    __table_args__ = (db.UniqueConstraint('content_id', 'revision_number', name='unique_content_revision'),)
+
+    def __repr__(self):
+        return f'<ContentRevision content_id={self.content_id} #{self.revision_number}>'
+
+    def to_dict(self):
+        """Convert revision to dictionary"""
+        return {
+            'revision_number': self.revision_number,
+            'is_keyframe': self.is_keyframe,
+            'changed_fields': sorted(self.delta.keys()),
+            'author_id': self.author_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class ContentSnapshot(db.Model):
+    """ContentSnapshot model - serialized published version of a content item"""
+    __tablename__ = 'content_snapshots'
+
+    content_id = db.Column(db.Integer, db.ForeignKey('content.id'), primary_key=True)
+    revision_number = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON served as-is
+    published_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    content = db.relationship('Content', backref=db.backref(
+        'published_snapshot', uselist=False, cascade='all, delete-orphan'
+    ))
+
+    def __repr__(self):
+        return f'<ContentSnapshot content_id={self.content_id} #{self.revision_number}>'
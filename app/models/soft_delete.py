@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+from app import db
+
+
+class SoftDeleteMixin:
+    """Rows are hidden as soon as ``deleted_at`` is set and purged later.
+
+    Every ORM query leaves soft-deleted rows out, relationship loads
+    included. Purge code opts back in with the ``include_deleted``
+    execution option, e.g. ``Content.query.execution_options(include_deleted=True)``.
+    """
+
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    @property
+    def is_deleted(self):
+        return self.deleted_at is not None
+
+    def soft_delete(self):
+        self.deleted_at = datetime.utcnow()
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_deleted(execute_state):
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.execution_options.get('include_deleted', False)
+    ):
+        execute_state.statement = execute_state.statement.options(with_loader_criteria(
+            SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+        ))
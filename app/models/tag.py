@@ -21,6 +21,18 @@ class Tag(db.Model):
     def __repr__(self):
         return f'<Tag {self.name}>'
 
+    @classmethod
+    def resolve(cls, names):
+        """Return Tag objects for the given names, creating missing ones"""
+        tags = []
+        for tag_name in names:
+            tag = cls.query.filter_by(name=tag_name.lower()).first()
+            if not tag:
+                tag = cls(name=tag_name.lower(), slug=tag_name.lower().replace(' ', '-'))
+                db.session.add(tag)
+            tags.append(tag)
+        return tags
+
     def to_dict(self):
         """Convert tag to dictionary"""
         return {
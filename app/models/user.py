@@ -2,6 +2,7 @@ from datetime import datetime
 from app import db
 from app.models.enrollment import Enrollment
 from app.models.review import Review
+from app.models.soft_delete import SoftDeleteMixin
 
 
 class UserRole:
@@ -10,7 +11,7 @@ class UserRole:
     ADMIN = 'admin'
 
 
-class User(db.Model):
+class User(SoftDeleteMixin, db.Model):
     """User model with role-based access"""
     __tablename__ = 'users'
 
@@ -32,6 +33,9 @@ class User(db.Model):
     reviews = db.relationship('Review', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     progress = db.relationship('Progress', backref='user', lazy='dynamic', cascade='all, delete-orphan')
 
+    # Admin directory filters by role/status and pages by id
+    __table_args__ = (db.Index('ix_users_role_is_active', 'role', 'is_active', 'id'),)
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from app.models.analytics import ContentDailyMetrics
+from app.models.user import User, UserRole
+from app.utils.auth import instructor_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime, timedelta
+
+analytics_bp = Blueprint('analytics', __name__)
+
+
+@analytics_bp.route('/instructor', methods=['GET'])
+@jwt_required()
+@instructor_required
+def get_instructor_analytics():
+    """Get learning analytics across all of an instructor's content"""
+    instructor_id = get_jwt_identity()
+    
+    # Admins may look at any instructor
+    requested_id = request.args.get('instructor_id', type=int)
+    if requested_id and requested_id != instructor_id:
+        current_user = User.query.get(instructor_id)
+        if current_user.role != UserRole.ADMIN:
+            return jsonify({'error': 'Unauthorized'}), 403
+        instructor_id = requested_id
+    
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    
+    summary = ContentDailyMetrics.summarize(
+        ContentDailyMetrics.instructor_id == instructor_id,
+        ContentDailyMetrics.day >= since
+    )
+    
+    return jsonify({'instructor_id': instructor_id, 'days': days, **summary}), 200
@@ -1,13 +1,23 @@
 from flask import Blueprint, request, jsonify
-from app import db, bcrypt, jwt
+from app import db, password_hasher, login_throttle, jwt
 from app.models.user import User, UserRole
 from app.utils.validators import validate_email, validate_password
+from app.utils.passwords import PasswordHasherBusy
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from datetime import datetime
+import math
 
 auth_bp = Blueprint('auth', __name__)
 
 
+@auth_bp.errorhandler(PasswordHasherBusy)
+def handle_hasher_busy(error):
+    """Shed load when the password hashing pool is saturated"""
+    response = jsonify({'error': 'Too many requests, please retry shortly'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 429
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user"""
@@ -33,10 +43,11 @@ def register():
         return jsonify({'error': message}), 400
     
     # Check if user exists
-    if User.query.filter_by(username=username).first():
+    # Deleted accounts keep their names until they are purged
+    if User.query.execution_options(include_deleted=True).filter_by(username=username).first():
         return jsonify({'error': 'Username already exists'}), 409
     
-    if User.query.filter_by(email=email).first():
+    if User.query.execution_options(include_deleted=True).filter_by(email=email).first():
         return jsonify({'error': 'Email already exists'}), 409
     
     # Validate role
@@ -44,7 +55,7 @@ def register():
         role = UserRole.STUDENT
     
     # Create user
-    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    password_hash = password_hasher.generate_password_hash(password)
     user = User(
         username=username,
         email=email,
@@ -54,7 +65,7 @@ def register():
     )
     
     db.session.add(user)
-    db.session.commit()
+    db.session.flush()
     
     # Generate tokens
     access_token = create_access_token(identity=user.id)
@@ -78,15 +89,34 @@ def login():
     
     username = data.get('username')
     password = data.get('password')
+    client_ip = request.remote_addr
+    
+    # Reject throttled attempts before any database or bcrypt work
+    retry_after = login_throttle.check(username, client_ip)
+    if retry_after:
+        response = jsonify({'error': 'Too many failed login attempts, please retry later'})
+        response.headers['Retry-After'] = str(math.ceil(retry_after))
+        return response, 429
     
     user = User.query.filter_by(username=username).first()
     
-    if not user or not bcrypt.check_password_hash(user.password_hash, password):
+    if not user or not password_hasher.check_password_hash(user.password_hash, password):
+        login_throttle.record_failure(username, client_ip)
         return jsonify({'error': 'Invalid credentials'}), 401
     
+    login_throttle.reset(username)
+    
     if not user.is_active:
         return jsonify({'error': 'Account is deactivated'}), 403
     
+    # Transparently upgrade hashes created with a different cost factor
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.generate_password_hash(password)
+            db.session.flush()
+        except PasswordHasherBusy:
+            pass  # Try again on a later login
+    
     # Generate tokens
     access_token = create_access_token(identity=user.id)
     refresh_token = create_refresh_token(identity=user.id)
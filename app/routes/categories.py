@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort
 from app import db
 from app.models.category import Category
 from app.utils.auth import admin_required
+from app.utils.http_cache import not_modified, weak_etag, with_cache_headers
 from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 import re
 
 categories_bp = Blueprint('categories', __name__)
@@ -11,17 +13,33 @@ categories_bp = Blueprint('categories', __name__)
 @categories_bp.route('', methods=['GET'])
 def get_categories():
     """Get all categories"""
+    count, last_modified = db.session.query(func.count(Category.id), func.max(Category.updated_at)).one()
+    etag = weak_etag('categories', count, last_modified)
+    cached = not_modified(etag, last_modified, policy='category_list')
+    if cached:
+        return cached
+    
     categories = Category.query.all()
-    return jsonify({
+    return with_cache_headers(jsonify({
         'categories': [cat.to_dict() for cat in categories]
-    }), 200
+    }), etag, last_modified, policy='category_list')
 
 
 @categories_bp.route('/<int:category_id>', methods=['GET'])
 def get_category(category_id):
     """Get category by ID"""
+    row = db.session.query(Category.updated_at).filter_by(id=category_id).first()
+    if row is None:
+        abort(404)
+    
+    updated_at = row.updated_at
+    etag = weak_etag('category', category_id, updated_at)
+    cached = not_modified(etag, updated_at, policy='category')
+    if cached:
+        return cached
+    
     category = Category.query.get_or_404(category_id)
-    return jsonify(category.to_dict()), 200
+    return with_cache_headers(jsonify(category.to_dict()), etag, updated_at, policy='category')
 
 
 @categories_bp.route('', methods=['POST'])
@@ -53,7 +71,7 @@ def create_category():
     )
     
     db.session.add(category)
-    db.session.commit()
+    db.session.flush()
     
     return jsonify({
         'message': 'Category created successfully',
@@ -83,7 +101,7 @@ def update_category(category_id):
     if 'parent_id' in data:
         category.parent_id = data['parent_id']
     
-    db.session.commit()
+    db.session.flush()
     
     return jsonify({
         'message': 'Category updated successfully',
@@ -98,7 +116,7 @@ def delete_category(category_id):
     """Delete category (admin only)"""
     category = Category.query.get_or_404(category_id)
     db.session.delete(category)
-    db.session.commit()
+    db.session.flush()
     
     return jsonify({'message': 'Category deleted successfully'}), 200
 
@@ -1,14 +1,38 @@
-from flask import Blueprint, request, jsonify
-from app import db
+import json
+from functools import partial
+from flask import Blueprint, request, jsonify, abort
+from app import db, recent_activity
+from app.models.category import Category
 from app.models.content import Content, ContentType
 from app.models.user import User
 from app.models.tag import Tag
-from app.utils.auth import instructor_required
+from app.models.analytics import ContentDailyMetrics
+from app.models.revision import ContentRevision, ContentSnapshot
+from app.jobs.tasks import purge_content
+from app.utils.auth import instructor_required, optional_identity
+from app.utils.counters import CounterBuffer
+from app.utils.catalog import CatalogEngine
+from app.utils.http_cache import not_modified, weak_etag, with_cache_headers
+from app.utils.fields import parse_fields, select_fields
+from app.utils.deletion import soft_delete_content
+from app.utils.instructor_stats import adjust_instructor_stats
+from app.utils.unit_of_work import on_commit
+from app.utils.versioning import (
+    content_state, normalize_changes, record_revision, reconstruct, latest_revision_number,
+    publish, refresh_snapshot, unpublish, snapshots
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, desc
+from sqlalchemy import or_, desc, func
+from datetime import datetime, timedelta
 
 content_bp = Blueprint('content', __name__)
 
+# View counts are buffered and written in batches off the request path
+view_counter = CounterBuffer(Content, 'view_count')
+
+# Optional in-memory snapshot serving anonymous catalog browsing
+catalog = CatalogEngine()
+
 
 @content_bp.route('', methods=['GET'])
 def get_content():
@@ -21,7 +45,54 @@ def get_content():
     is_free = request.args.get('is_free', type=str)
     difficulty = request.args.get('difficulty', type=str)
     language = request.args.get('language', type=str)
+    tag = request.args.get('tag', type=str)
     sort_by = request.args.get('sort_by', 'created_at', type=str)  # created_at, rating, views
+    view = request.args.get('view', 'full', type=str)  # full, compact
+    fields = parse_fields(request.args.get('fields', type=str))
+    
+    def serialize(data):
+        if view == 'compact':
+            data = Content.compact_dict(data)
+        return select_fields(data, fields)
+    
+    if catalog.enabled:
+        filters = {
+            'content_type': content_type,
+            'category_id': category_id,
+            'instructor_id': instructor_id,
+            'difficulty_level': difficulty,
+            'language': language,
+            'tags': tag.lower() if tag else None,
+        }
+        filters = {field: value for field, value in filters.items() if value}
+        if is_free is not None:
+            filters['is_free'] = is_free.lower() == 'true'
+        
+        snapshot = catalog.snapshot()
+        etag = weak_etag('content-list', snapshot.version, request.query_string.decode())
+        cached = not_modified(etag, policy='content_list')
+        if cached:
+            return cached
+        
+        items, total = snapshot.query(filters, sort_by, page, per_page)
+        return with_cache_headers(jsonify({
+            'content': [serialize(item) for item in items],
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'pages': -(-total // per_page) if per_page else 0
+            }
+        }), etag, policy='content_list')
+    
+    # Any publish, edit or unpublish changes the count or the latest updated_at
+    count, last_modified = db.session.query(func.count(Content.id), func.max(Content.updated_at)).filter(
+        Content.is_published == True
+    ).one()
+    etag = weak_etag('content-list', count, last_modified, request.query_string.decode())
+    cached = not_modified(etag, last_modified, policy='content_list')
+    if cached:
+        return cached
     
     query = Content.query.filter_by(is_published=True)
     
@@ -38,6 +109,8 @@ def get_content():
         query = query.filter_by(difficulty_level=difficulty)
     if language:
         query = query.filter_by(language=language)
+    if tag:
+        query = query.filter(Content.tags.any(Tag.name == tag.lower()))
     
     # Sorting
     if sort_by == 'rating':
@@ -50,27 +123,78 @@ def get_content():
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     content_items = pagination.items
     
-    return jsonify({
-        'content': [item.to_dict() for item in content_items],
+    return with_cache_headers(jsonify({
+        'content': [serialize(item.to_dict()) for item in content_items],
         'pagination': {
             'page': page,
             'per_page': per_page,
             'total': pagination.total,
             'pages': pagination.pages
         }
-    }), 200
+    }), etag, last_modified, policy='content_list')
+
+
+def _record_view(content_id):
+    """Count a view and add it to the signed-in user's recently viewed list"""
+    view_counter.incr(content_id)
+    user_id = optional_identity()
+    if user_id is not None:
+        recent_activity.record_view(user_id, content_id)
 
 
 @content_bp.route('/<int:content_id>', methods=['GET'])
 def get_content_by_id(content_id):
     """Get content by ID"""
-    content = Content.query.get_or_404(content_id)
+    # Published content is served from its snapshot, with the fields that move
+    # without a publish (counters, instructor and category names) read live
+    snapshot = db.session.query(
+        ContentSnapshot.revision_number, ContentSnapshot.published_at,
+        Content.view_count, Content.rating_average, Content.rating_count,
+        User.id, User.username, User.full_name, Category.id, Category.name
+    ).join(Content, Content.id == ContentSnapshot.content_id).outerjoin(
+        User, User.id == Content.instructor_id
+    ).outerjoin(
+        Category, Category.id == Content.category_id
+    ).filter(ContentSnapshot.content_id == content_id).first()
+    if snapshot is not None:
+        _record_view(content_id)
+        
+        revision_number, published_at, view_count, rating_average, rating_count, *related = snapshot
+        etag = weak_etag('content', content_id, 'r', revision_number, published_at, *snapshot[2:])
+        cached = not_modified(etag, published_at, policy='content')
+        if cached:
+            return cached
+        
+        payload = snapshots.get(content_id, published_at)
+        if payload is None:
+            payload = json.loads(db.session.query(ContentSnapshot.payload).filter_by(content_id=content_id).scalar())
+            snapshots.put(content_id, published_at, payload)
+        instructor_id, username, full_name, category_id, category_name = related
+        return with_cache_headers(jsonify(dict(
+            payload,
+            view_count=view_count,
+            rating_average=float(rating_average) if rating_average else 0.0,
+            rating_count=rating_count,
+            instructor={'id': instructor_id, 'username': username, 'full_name': full_name} if instructor_id else None,
+            category={'id': category_id, 'name': category_name} if category_id else None
+        )), etag, published_at, policy='content')
+    
+    # Validate freshness from two columns before loading the full row
+    validators = db.session.query(Content.updated_at, Content.is_published).filter_by(id=content_id).first()
+    if validators is None:
+        abort(404)
     
-    # Increment view count
-    content.view_count += 1
-    db.session.commit()
+    _record_view(content_id)
     
-    return jsonify(content.to_dict(include_details=True)), 200
+    updated_at, is_published = validators
+    etag = weak_etag('content', content_id, updated_at)
+    policy = 'content' if is_published else 'draft'
+    cached = not_modified(etag, updated_at, policy=policy)
+    if cached:
+        return cached
+    
+    content = Content.query.get_or_404(content_id)
+    return with_cache_headers(jsonify(content.to_dict(include_details=True)), etag, updated_at, policy=policy)
 
 
 @content_bp.route('', methods=['POST'])
@@ -112,17 +236,20 @@ def create_content():
     
     # Handle tags
     if 'tags' in data and isinstance(data['tags'], list):
-        tags = []
-        for tag_name in data['tags']:
-            tag = Tag.query.filter_by(name=tag_name.lower()).first()
-            if not tag:
-                tag = Tag(name=tag_name.lower(), slug=tag_name.lower().replace(' ', '-'))
-                db.session.add(tag)
-            tags.append(tag)
-        content.tags = tags
+        content.tags = Tag.resolve(data['tags'])
     
     db.session.add(content)
-    db.session.commit()
+    db.session.flush()
+    record_revision(content, content_state(content), author_id=instructor_id)
+    if content.is_published:
+        refresh_snapshot(content, 1)
+    adjust_instructor_stats(
+        instructor_id,
+        content_count=1,
+        published_content_count=1 if content.is_published else 0
+    )
+    db.session.flush()
+    on_commit(partial(catalog.invalidate, content.id))
     
     return jsonify({
         'message': 'Content created successfully',
@@ -147,6 +274,18 @@ def update_content(content_id):
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
+    # Drafts are recorded as revisions only; the live row is left untouched
+    if data.get('draft'):
+        revision = record_revision(content, normalize_changes(data), author_id=instructor_id)
+        db.session.flush()
+        return jsonify({
+            'message': 'Draft saved successfully' if revision else 'No changes to save',
+            'revision': revision.to_dict() if revision else None
+        }), 200
+    
+    was_published = bool(content.is_published)
+    record_revision(content, normalize_changes(data), author_id=instructor_id, base=content_state(content))
+    
     # Update fields
     updatable_fields = ['title', 'description', 'content_url', 'thumbnail_url', 
                        'duration_minutes', 'difficulty_level', 'language', 'price',
@@ -158,16 +297,21 @@ def update_content(content_id):
     
     # Update tags
     if 'tags' in data and isinstance(data['tags'], list):
-        tags = []
-        for tag_name in data['tags']:
-            tag = Tag.query.filter_by(name=tag_name.lower()).first()
-            if not tag:
-                tag = Tag(name=tag_name.lower(), slug=tag_name.lower().replace(' ', '-'))
-                db.session.add(tag)
-            tags.append(tag)
-        content.tags = tags
+        content.tags = Tag.resolve(data['tags'])
     
-    db.session.commit()
+    # Keep the served snapshot in step with the live row
+    if content.is_published:
+        refresh_snapshot(content, latest_revision_number(content.id))
+    elif was_published:
+        unpublish(content)
+    
+    adjust_instructor_stats(
+        content.instructor_id,
+        published_content_count=int(bool(content.is_published)) - int(was_published)
+    )
+    db.session.flush()
+    on_commit(partial(catalog.invalidate, content.id))
+    on_commit(partial(snapshots.evict, content.id))
     
     return jsonify({
         'message': 'Content updated successfully',
@@ -188,8 +332,125 @@ def delete_content(content_id):
     if content.instructor_id != instructor_id and current_user.role != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    db.session.delete(content)
-    db.session.commit()
+    # Hidden right away; its enrollments, reviews and progress go in the background
+    soft_delete_content(content)
+    db.session.flush()
+    purge_content.delay(content_id)
+    on_commit(partial(catalog.invalidate, content_id))
+    on_commit(partial(snapshots.evict, content_id))
     
     return jsonify({'message': 'Content deleted successfully'}), 200
 
+
+@content_bp.route('/<int:content_id>/publish', methods=['POST'])
+@jwt_required()
+@instructor_required
+def publish_content(content_id):
+    """Publish a revision, the latest by default (instructor/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    revision_number = data.get('revision')
+    if revision_number is not None and not ContentRevision.query.filter_by(
+        content_id=content_id, revision_number=revision_number
+    ).first():
+        return jsonify({'error': 'Revision not found'}), 404
+    
+    was_published = bool(content.is_published)
+    if not latest_revision_number(content_id):
+        record_revision(content, {}, author_id=instructor_id)
+    snapshot = publish(content, revision_number)
+    adjust_instructor_stats(content.instructor_id, published_content_count=0 if was_published else 1)
+    db.session.flush()
+    on_commit(partial(catalog.invalidate, content_id))
+    on_commit(partial(snapshots.evict, content_id))
+    
+    return jsonify({
+        'message': 'Content published successfully',
+        'revision_number': snapshot.revision_number,
+        'content': content.to_dict(include_details=True)
+    }), 200
+
+
+@content_bp.route('/<int:content_id>/revisions', methods=['GET'])
+@jwt_required()
+@instructor_required
+def get_content_revisions(content_id):
+    """List the revisions of content (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    pagination = content.revisions.order_by(None).order_by(desc(ContentRevision.revision_number)).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    live = db.session.query(ContentSnapshot.revision_number).filter_by(content_id=content_id).scalar()
+    
+    return jsonify({
+        'revisions': [revision.to_dict() for revision in pagination.items],
+        'published_revision': live,
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': pagination.total,
+            'pages': pagination.pages
+        }
+    }), 200
+
+
+@content_bp.route('/<int:content_id>/revisions/<int:revision_number>', methods=['GET'])
+@jwt_required()
+@instructor_required
+def get_content_revision(content_id, revision_number):
+    """Preview content as of a revision (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    revision = ContentRevision.query.filter_by(content_id=content_id, revision_number=revision_number).first_or_404()
+    
+    return jsonify({
+        'revision': revision.to_dict(),
+        'content': dict(content.to_dict(include_details=True), **reconstruct(content_id, revision_number))
+    }), 200
+
+
+@content_bp.route('/<int:content_id>/analytics', methods=['GET'])
+@jwt_required()
+@instructor_required
+def get_content_analytics(content_id):
+    """Get daily learning analytics for content (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    
+    summary = ContentDailyMetrics.summarize(
+        ContentDailyMetrics.content_id == content_id,
+        ContentDailyMetrics.day >= since
+    )
+    
+    return jsonify({'content_id': content_id, 'days': days, **summary}), 200
@@ -1,9 +1,19 @@
+from functools import partial
 from flask import Blueprint, request, jsonify
-from app import db
+from app import db, event_bus
 from app.models.enrollment import Enrollment
 from app.models.content import Content
+from app.models.user import User
+from app.utils.auth import instructor_required
+from app.utils.archival import history, restore
+from app.utils.bulk_enrollment import bulk_enroll
+from app.utils.streaming import ndjson_response
+from app.utils.instructor_stats import adjust_instructor_stats
+from app.utils.unit_of_work import on_commit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from collections import Counter
+from flask import current_app
 
 enrollments_bp = Blueprint('enrollments', __name__)
 
@@ -16,12 +26,27 @@ def get_enrollments():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     is_completed = request.args.get('is_completed', type=str)
+    include_archived = request.args.get('include_archived', 'false', type=str).lower() == 'true'
     
-    query = Enrollment.query.filter_by(user_id=user_id)
+    query = Enrollment.for_user(user_id)
     
     if is_completed is not None:
         query = query.filter_by(is_completed=is_completed.lower() == 'true')
     
+    # Full history reads through to archived (always completed) enrollments
+    if include_archived and (is_completed is None or is_completed.lower() == 'true'):
+        items = history('enrollment', user_id, query, 'enrolled_at')
+        start = (max(page, 1) - 1) * per_page
+        return jsonify({
+            'enrollments': items[start:start + per_page],
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': len(items),
+                'pages': -(-len(items) // per_page) if per_page else 0
+            }
+        }), 200
+    
     pagination = query.order_by(Enrollment.enrolled_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
@@ -52,7 +77,11 @@ def create_enrollment():
     content = Content.query.get_or_404(content_id)
     
     # Check if already enrolled
-    existing = Enrollment.query.filter_by(user_id=user_id, content_id=content_id).first()
+    existing = Enrollment.for_user(user_id).filter_by(content_id=content_id).first()
+    if not existing:
+        existing = restore('enrollment', user_id, content_id)
+        if existing:
+            db.session.flush()
     if existing:
         return jsonify({
             'message': 'Already enrolled',
@@ -69,7 +98,10 @@ def create_enrollment():
     )
     
     db.session.add(enrollment)
-    db.session.commit()
+    adjust_instructor_stats(content.instructor_id, total_enrollments=1)
+    db.session.flush()
+    
+    on_commit(partial(event_bus.publish, [f'user:{user_id}', f'content:{content_id}'], 'enrollment.created', enrollment.to_dict()))
     
     return jsonify({
         'message': 'Enrolled successfully',
@@ -77,15 +109,55 @@ def create_enrollment():
     }), 201
 
 
+@enrollments_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@instructor_required
+def bulk_create_enrollments():
+    """Enroll many users into many content items (instructor/admin only)
+    
+    Accepts either ``pairs`` ([[user_id, content_id], ...]) or ``user_ids``
+    and ``content_ids`` to enroll every user into every item. Streams one
+    NDJSON line per pair followed by a summary line.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    try:
+        if 'pairs' in data:
+            pairs = [(int(user_id), int(content_id)) for user_id, content_id in data['pairs']]
+        else:
+            user_ids = [int(user_id) for user_id in data.get('user_ids', [])]
+            content_ids = [int(content_id) for content_id in data.get('content_ids', [])]
+            if len(user_ids) * len(content_ids) > current_app.config.get('BULK_ENROLLMENT_MAX_PAIRS', 100000):
+                return jsonify({'error': 'Too many enrollment pairs'}), 400
+            pairs = [(user_id, content_id) for content_id in content_ids for user_id in user_ids]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'pairs or user_ids and content_ids must contain integer ids'}), 400
+    
+    if not pairs:
+        return jsonify({'error': 'pairs or user_ids and content_ids required'}), 400
+    if len(pairs) > current_app.config.get('BULK_ENROLLMENT_MAX_PAIRS', 100000):
+        return jsonify({'error': 'Too many enrollment pairs'}), 400
+    
+    actor = User.query.get(get_jwt_identity())
+    
+    def outcomes():
+        summary = Counter()
+        for outcome in bulk_enroll(pairs, actor):
+            summary[outcome['status']] += 1
+            yield outcome
+        yield {'summary': dict(summary)}
+    
+    return ndjson_response(outcomes())
+
+
 @enrollments_bp.route('/<int:enrollment_id>', methods=['PUT'])
 @jwt_required()
 def update_enrollment(enrollment_id):
     """Update enrollment (mark as completed)"""
     user_id = get_jwt_identity()
-    enrollment = Enrollment.query.get_or_404(enrollment_id)
-    
-    if enrollment.user_id != user_id:
-        return jsonify({'error': 'Unauthorized'}), 403
+    enrollment = Enrollment.get_for_user_or_404(user_id, enrollment_id)
     
     data = request.get_json()
     if data.get('is_completed'):
@@ -95,7 +167,15 @@ def update_enrollment(enrollment_id):
     if 'last_accessed_at' in data:
         enrollment.last_accessed_at = datetime.utcnow()
     
-    db.session.commit()
+    db.session.flush()
+    
+    on_commit(partial(
+        event_bus.publish,
+        [f'user:{user_id}', f'content:{enrollment.content_id}'],
+        'enrollment.updated',
+        enrollment.to_dict(),
+        coalesce_key=f'enrollment:{enrollment.id}'
+    ))
     
     return jsonify({
         'message': 'Enrollment updated successfully',
@@ -108,13 +188,20 @@ def update_enrollment(enrollment_id):
 def delete_enrollment(enrollment_id):
     """Unenroll from content"""
     user_id = get_jwt_identity()
-    enrollment = Enrollment.query.get_or_404(enrollment_id)
-    
-    if enrollment.user_id != user_id:
-        return jsonify({'error': 'Unauthorized'}), 403
+    enrollment = Enrollment.get_for_user_or_404(user_id, enrollment_id)
+    if enrollment.content is None:
+        return jsonify({'error': 'Content not found'}), 404  # Deleted, purge pending
     
+    adjust_instructor_stats(enrollment.content.instructor_id, total_enrollments=-1)
     db.session.delete(enrollment)
-    db.session.commit()
+    db.session.flush()
+    
+    on_commit(partial(
+        event_bus.publish,
+        [f'user:{user_id}', f'content:{enrollment.content_id}'],
+        'enrollment.deleted',
+        {'id': enrollment_id, 'user_id': user_id, 'content_id': enrollment.content_id}
+    ))
     
     return jsonify({'message': 'Unenrolled successfully'}), 200
 
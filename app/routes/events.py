@@ -0,0 +1,56 @@
+import json
+from flask import Blueprint, Response, current_app, jsonify
+from app import event_bus
+from app.models.content import Content
+from app.models.user import User, UserRole
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+events_bp = Blueprint('events', __name__)
+
+
+def _event_stream(*channels):
+    """Stream bus events for ``channels`` as Server-Sent Events"""
+    heartbeat = current_app.config.get('EVENT_STREAM_HEARTBEAT', 15)
+    
+    def generate():
+        # Subscribed once streaming starts, so a response that is never sent leaks nothing
+        subscription = event_bus.subscribe(*channels)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@events_bp.route('/me', methods=['GET'])
+@jwt_required()
+def stream_user_events():
+    """Stream the current user's progress, enrollment and review events"""
+    user_id = get_jwt_identity()
+    return _event_stream(f'user:{user_id}')
+
+
+@events_bp.route('/content/<int:content_id>', methods=['GET'])
+@jwt_required()
+def stream_content_events(content_id):
+    """Stream learner activity on content (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    user_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(user_id)
+    if content.instructor_id != user_id and (not current_user or current_user.role != UserRole.ADMIN):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return _event_stream(f'content:{content_id}')
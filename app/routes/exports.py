@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from app import db
+from app.models.enrollment import Enrollment
+from app.models.progress import Progress
+from app.models.review import Review
+from app.models.content import Content
+from app.utils.auth import admin_required
+from app.utils.streaming import csv_response, ndjson_response
+from app.utils.validators import parse_datetime
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+
+exports_bp = Blueprint('exports', __name__)
+
+# Rows fetched per round trip; on PostgreSQL this also enables a server-side cursor
+YIELD_PER = 1000
+
+EXPORTS = {
+    'enrollments': (Enrollment, Enrollment.enrolled_at, [
+        'id', 'user_id', 'content_id', 'enrolled_at', 'completed_at', 'is_completed', 'last_accessed_at'
+    ]),
+    'progress': (Progress, Progress.updated_at, [
+        'id', 'user_id', 'content_id', 'completion_percentage', 'last_position', 'notes', 'bookmarked', 'updated_at'
+    ]),
+    'reviews': (Review, Review.created_at, [
+        'id', 'user_id', 'content_id', 'rating', 'title', 'comment', 'is_verified_purchase',
+        'helpful_count', 'created_at', 'updated_at'
+    ]),
+}
+
+
+@exports_bp.route('/<string:resource>', methods=['GET'])
+@jwt_required()
+@admin_required
+def export_resource(resource):
+    """Stream enrollments, progress or reviews as CSV or NDJSON (admin only)"""
+    if resource not in EXPORTS:
+        return jsonify({'error': 'Unknown export'}), 404
+    
+    model, timestamp_column, columns = EXPORTS[resource]
+    export_format = request.args.get('format', 'csv', type=str)
+    content_id = request.args.get('content_id', type=int)
+    instructor_id = request.args.get('instructor_id', type=int)
+    
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    try:
+        since = parse_datetime(request.args.get('since'))
+        until = parse_datetime(request.args.get('until'))
+    except ValueError:
+        return jsonify({'error': 'since and until must be ISO 8601 dates'}), 400
+    
+    statement = select(*[getattr(model, column) for column in columns])
+    
+    # Filters
+    if content_id:
+        statement = statement.where(model.content_id == content_id)
+    if instructor_id:
+        statement = statement.join(Content, Content.id == model.content_id).where(
+            Content.instructor_id == instructor_id
+        )
+    if since:
+        statement = statement.where(timestamp_column >= since)
+    if until:
+        statement = statement.where(timestamp_column < until)
+    
+    statement = statement.order_by(model.id).execution_options(yield_per=YIELD_PER)
+    
+    def rows():
+        for row in db.session.execute(statement):
+            yield tuple(row)
+    
+    filename = f'{resource}.{export_format}'
+    if export_format == 'ndjson':
+        return ndjson_response((dict(zip(columns, row)) for row in rows()), filename=filename)
+    return csv_response(columns, rows(), filename=filename)
@@ -0,0 +1,58 @@
+from flask import Blueprint, request, jsonify
+from app.models.instructor_stats import InstructorStats
+from app.models.user import User, UserRole
+from sqlalchemy import desc
+
+instructors_bp = Blueprint('instructors', __name__)
+
+
+@instructors_bp.route('', methods=['GET'])
+def get_instructors():
+    """Get instructor directory with precomputed stats"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    sort_by = request.args.get('sort_by', 'enrollments', type=str)  # enrollments, content, name
+    
+    query = User.query.join(InstructorStats, InstructorStats.instructor_id == User.id).filter(
+        User.is_active == True,
+        InstructorStats.published_content_count > 0
+    ).add_entity(InstructorStats)
+    
+    if sort_by == 'content':
+        query = query.order_by(desc(InstructorStats.published_content_count), User.id)
+    elif sort_by == 'name':
+        query = query.order_by(User.full_name, User.id)
+    else:
+        query = query.order_by(desc(InstructorStats.total_enrollments), User.id)
+    
+    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'instructors': [
+            {**user.to_dict(), 'stats': stats.to_dict()}
+            for user, stats in pagination.items
+        ],
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': pagination.total,
+            'pages': pagination.pages
+        }
+    }), 200
+
+
+@instructors_bp.route('/<int:instructor_id>', methods=['GET'])
+def get_instructor(instructor_id):
+    """Get instructor profile with content count, enrollments and rating"""
+    user = User.query.get_or_404(instructor_id)
+    stats = InstructorStats.query.get(instructor_id)
+    
+    if not stats and user.role not in [UserRole.INSTRUCTOR, UserRole.ADMIN]:
+        return jsonify({'error': 'Instructor not found'}), 404
+    
+    return jsonify({
+        **user.to_dict(),
+        'stats': stats.to_dict() if stats else InstructorStats(
+            **dict.fromkeys(InstructorStats.COUNTERS, 0)
+        ).to_dict()
+    }), 200
@@ -0,0 +1,243 @@
+import mimetypes
+import time
+from datetime import datetime
+from functools import partial
+from flask import Blueprint, request, jsonify, current_app
+from app import db
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.media import MediaAsset, MediaStatus
+from app.models.user import User
+from app.jobs.tasks import process_media
+from app.utils.archival import archived_row
+from app.utils.auth import instructor_required
+from app.utils.media import (
+    absolute_path, deliver, finish_upload, is_allowed_type, is_shared, new_storage_path, read_token,
+    remove_files, signed_url, write_chunk
+)
+from app.utils.unit_of_work import on_commit
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+
+media_bp = Blueprint('media', __name__)
+
+
+def _get_asset(asset_id):
+    """Load an asset for its uploader or an admin; returns (asset, error_response)"""
+    asset = MediaAsset.query.get_or_404(asset_id)
+    user_id = get_jwt_identity()
+    current_user = User.query.get(user_id)
+    if asset.uploader_id != user_id and current_user.role != 'admin':
+        return None, (jsonify({'error': 'Unauthorized'}), 403)
+    return asset, None
+
+
+def _can_stream(asset, user_id):
+    """Uploader, admin, content owner, or a learner enrolled in the published content"""
+    if asset.uploader_id == user_id:
+        return True
+    current_user = User.query.get(user_id)
+    if current_user is not None and current_user.role == 'admin':
+        return True
+    content = asset.content
+    if content is None or not content.is_published:
+        return False
+    if content.instructor_id == user_id:
+        return True
+    enrolled = Enrollment.for_user(user_id).filter_by(content_id=content.id).first()
+    return enrolled is not None or archived_row('enrollment', user_id, content.id) is not None
+
+
+@media_bp.route('', methods=['POST'])
+@jwt_required()
+@instructor_required
+def create_upload():
+    """Start a chunked upload (instructor/admin only)"""
+    user_id = get_jwt_identity()
+    data = request.get_json()
+
+    if not data or not data.get('filename') or not data.get('size_bytes'):
+        return jsonify({'error': 'filename and size_bytes required'}), 400
+
+    size_bytes = data['size_bytes']
+    if not isinstance(size_bytes, int) or size_bytes <= 0:
+        return jsonify({'error': 'size_bytes must be a positive integer'}), 400
+    if size_bytes > current_app.config.get('MEDIA_MAX_UPLOAD_BYTES', 5 * 1024 ** 3):
+        return jsonify({'error': 'File too large'}), 413
+
+    mime_type = data.get('mime_type') or mimetypes.guess_type(data['filename'])[0]
+    if not is_allowed_type(mime_type):
+        return jsonify({'error': 'Unsupported media type'}), 415
+
+    content_id = data.get('content_id')
+    if content_id is not None:
+        content = Content.query.get_or_404(content_id)
+        current_user = User.query.get(user_id)
+        if content.instructor_id != user_id and current_user.role != 'admin':
+            return jsonify({'error': 'Unauthorized'}), 403
+
+    asset = MediaAsset(
+        uploader_id=user_id,
+        content_id=content_id,
+        filename=data['filename'][:255],
+        mime_type=mime_type,
+        size_bytes=size_bytes,
+        storage_path=new_storage_path(data['filename'])
+    )
+    db.session.add(asset)
+    db.session.flush()
+
+    return jsonify({
+        'message': 'Upload started',
+        'media': asset.to_dict(),
+        'chunk_size': current_app.config.get('MEDIA_CHUNK_SIZE', 8 * 1024 * 1024)
+    }), 201
+
+
+@media_bp.route('/<int:asset_id>/chunks', methods=['PUT'])
+@jwt_required()
+def upload_chunk(asset_id):
+    """Append a chunk at ``?offset=``; the body is streamed to disk as it arrives"""
+    asset, error = _get_asset(asset_id)
+    if error:
+        return error
+    if asset.status != MediaStatus.UPLOADING:
+        return jsonify({'error': 'Upload already completed'}), 409
+
+    offset = request.args.get('offset', type=int)
+    if offset != asset.bytes_received:
+        return jsonify({'error': 'Unexpected offset', 'expected_offset': asset.bytes_received}), 409
+
+    length = request.content_length
+    if not length:
+        return jsonify({'error': 'Content-Length required'}), 411
+    if length > current_app.config.get('MEDIA_CHUNK_MAX_BYTES', 64 * 1024 * 1024):
+        return jsonify({'error': 'Chunk too large'}), 413
+    if offset + length > asset.size_bytes:
+        return jsonify({'error': 'Chunk exceeds the declared size'}), 400
+
+    written = write_chunk(absolute_path(asset.storage_path), offset, request.stream, length)
+
+    # Conditional so a concurrent retry of the same chunk cannot double-count it
+    updated = MediaAsset.query.filter_by(id=asset_id, bytes_received=offset).update(
+        {'bytes_received': offset + written}, synchronize_session=False
+    )
+    if not updated:
+        return jsonify({'error': 'Concurrent upload to the same offset'}), 409
+
+    return jsonify({
+        'bytes_received': offset + written,
+        'complete': offset + written == asset.size_bytes
+    }), 200
+
+
+@media_bp.route('/<int:asset_id>/complete', methods=['POST'])
+@jwt_required()
+def complete_upload(asset_id):
+    """Queue a fully uploaded (or failed) asset for processing"""
+    asset, error = _get_asset(asset_id)
+    if error:
+        return error
+    if asset.status not in (MediaStatus.UPLOADING, MediaStatus.FAILED):
+        return jsonify({'error': f'Upload is already {asset.status}'}), 409
+    if asset.bytes_received != asset.size_bytes:
+        return jsonify({
+            'error': 'Upload incomplete',
+            'bytes_received': asset.bytes_received,
+            'size_bytes': asset.size_bytes
+        }), 400
+
+    if asset.status == MediaStatus.UPLOADING:
+        finish_upload(asset)
+    asset.status = MediaStatus.PROCESSING
+    asset.error = None
+    process_media.delay(asset.id)
+    db.session.flush()
+
+    return jsonify({
+        'message': 'Upload queued for processing',
+        'media': asset.to_dict()
+    }), 202
+
+
+@media_bp.route('/<int:asset_id>', methods=['GET'])
+@jwt_required()
+def get_asset(asset_id):
+    """Get an upload's status; poll until it is ready or failed"""
+    asset, error = _get_asset(asset_id)
+    if error:
+        return error
+
+    response = jsonify(asset.to_dict())
+    if asset.status == MediaStatus.PROCESSING:
+        response.headers['Retry-After'] = '2'
+    return response, 200
+
+
+@media_bp.route('/<int:asset_id>', methods=['DELETE'])
+@jwt_required()
+def delete_asset(asset_id):
+    """Delete an upload and, unless shared with a duplicate, its files"""
+    asset, error = _get_asset(asset_id)
+    if error:
+        return error
+
+    # Duplicates of this asset keep the shared files and stand on their own
+    shared = is_shared(asset)
+    MediaAsset.query.filter_by(duplicate_of_id=asset.id).update(
+        {'duplicate_of_id': None}, synchronize_session=False
+    )
+    db.session.delete(asset)
+    db.session.flush()
+    if not shared:
+        on_commit(partial(remove_files, asset.storage_path))
+
+    return jsonify({'message': 'Media deleted successfully'}), 200
+
+
+@media_bp.route('/<int:asset_id>/url', methods=['GET'])
+@jwt_required()
+def get_stream_url(asset_id):
+    """Issue a short-lived signed URL streaming the asset to an entitled user"""
+    asset = MediaAsset.query.get_or_404(asset_id)
+    user_id = get_jwt_identity()
+    
+    if not _can_stream(asset, user_id):
+        return jsonify({'error': 'Enrollment required'}), 403
+    if asset.status != MediaStatus.READY:
+        return jsonify({'error': 'Media is not ready', 'status': asset.status}), 409
+    
+    url, expires_at = signed_url(asset, user_id)
+    return jsonify({
+        'url': url,
+        'mime_type': asset.mime_type,
+        'expires_at': datetime.utcfromtimestamp(expires_at).isoformat()
+    }), 200
+
+
+@media_bp.route('/files/<token>', methods=['GET'])
+def serve_file(token):
+    """Serve a signed URL; checks only the signature, never the database"""
+    payload = read_token(token)
+    if payload is None:
+        return jsonify({'error': 'Invalid or expired link'}), 403
+    return deliver(payload['p'], payload['m'], max_age=payload['e'] - time.time())
+
+
+@media_bp.route('/<int:asset_id>/thumbnails/<int:width>', methods=['GET'])
+def get_thumbnail(asset_id, width):
+    """Serve a thumbnail; public once the asset's content is published"""
+    asset = MediaAsset.query.get_or_404(asset_id)
+    path = (asset.thumbnails or {}).get(str(width))
+    if path is None:
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    
+    content = asset.content
+    if content is not None and content.is_published:
+        return deliver(path, 'image/jpeg', max_age=current_app.config.get('MEDIA_THUMBNAIL_MAX_AGE', 86400), public=True)
+    
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    current_user = User.query.get(user_id) if user_id is not None else None
+    if current_user is None or (asset.uploader_id != user_id and current_user.role != 'admin'):
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    return deliver(path, 'image/jpeg', max_age=0)
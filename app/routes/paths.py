@@ -0,0 +1,136 @@
+from flask import Blueprint, request, jsonify
+from app import db
+from app.models.content import Content
+from app.models.learning_path import ContentPrerequisite
+from app.models.user import User
+from app.utils.auth import instructor_required
+from app.utils.learning_paths import (
+    PrerequisiteCycle, add_prerequisite, remove_prerequisite, completed_content, path_to, next_up
+)
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+
+paths_bp = Blueprint('paths', __name__)
+
+
+@paths_bp.route('/content/<int:content_id>/prerequisites', methods=['GET'])
+def get_prerequisites(content_id):
+    """Get the direct prerequisites of content"""
+    Content.query.get_or_404(content_id)
+    
+    prerequisites = Content.query.join(
+        ContentPrerequisite, ContentPrerequisite.prerequisite_id == Content.id
+    ).filter(ContentPrerequisite.content_id == content_id).order_by(Content.id).all()
+    
+    return jsonify({
+        'content_id': content_id,
+        'prerequisites': [item.to_dict() for item in prerequisites]
+    }), 200
+
+
+@paths_bp.route('/content/<int:content_id>/prerequisites', methods=['POST'])
+@jwt_required()
+@instructor_required
+def create_prerequisite(content_id):
+    """Require another item before content (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    if not data or not data.get('prerequisite_id'):
+        return jsonify({'error': 'prerequisite_id required'}), 400
+    
+    prerequisite_id = data['prerequisite_id']
+    if not isinstance(prerequisite_id, int) or isinstance(prerequisite_id, bool):
+        return jsonify({'error': 'prerequisite_id must be an integer'}), 400
+    Content.query.get_or_404(prerequisite_id)
+    
+    if db.session.get(ContentPrerequisite, (content_id, prerequisite_id)):
+        return jsonify({'error': 'Prerequisite already exists'}), 409
+    
+    try:
+        add_prerequisite(content_id, prerequisite_id)
+    except PrerequisiteCycle:
+        return jsonify({'error': 'Prerequisite would create a cycle'}), 409
+    db.session.flush()
+    
+    return jsonify({
+        'message': 'Prerequisite added successfully',
+        'content_id': content_id,
+        'prerequisite_id': prerequisite_id
+    }), 201
+
+
+@paths_bp.route('/content/<int:content_id>/prerequisites/<int:prerequisite_id>', methods=['DELETE'])
+@jwt_required()
+@instructor_required
+def delete_prerequisite(content_id, prerequisite_id):
+    """Remove a prerequisite from content (owner/admin only)"""
+    content = Content.query.get_or_404(content_id)
+    instructor_id = get_jwt_identity()
+    
+    # Check ownership or admin
+    current_user = User.query.get(instructor_id)
+    if content.instructor_id != instructor_id and current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    edge = ContentPrerequisite.query.get_or_404((content_id, prerequisite_id))
+    remove_prerequisite(edge)
+    db.session.flush()
+    
+    return jsonify({'message': 'Prerequisite removed successfully'}), 200
+
+
+@paths_bp.route('/<int:target_id>', methods=['GET'])
+def get_path(target_id):
+    """Get the ordered learning path leading to content, with the user's status if logged in"""
+    Content.query.get_or_404(target_id)
+    
+    ids = path_to(target_id)
+    items = {item.id: item for item in Content.query.filter(Content.id.in_(ids))}
+    
+    verify_jwt_in_request(optional=True)
+    user_id = get_jwt_identity()
+    completed = set()
+    if user_id is not None:
+        completed = {row[0] for row in db.session.execute(completed_content(user_id))}
+    
+    prerequisites = {}
+    for content_id, prerequisite_id in db.session.query(
+        ContentPrerequisite.content_id, ContentPrerequisite.prerequisite_id
+    ).filter(ContentPrerequisite.content_id.in_(ids)):
+        prerequisites.setdefault(content_id, []).append(prerequisite_id)
+    
+    steps = []
+    for content_id in ids:
+        step = {
+            'content': items[content_id].to_dict(),
+            'prerequisite_ids': sorted(prerequisites.get(content_id, [])),
+        }
+        if user_id is not None:
+            if content_id in completed:
+                step['status'] = 'completed'
+            elif all(p in completed for p in prerequisites.get(content_id, [])):
+                step['status'] = 'unlocked'
+            else:
+                step['status'] = 'locked'
+        steps.append(step)
+    
+    return jsonify({'target_id': target_id, 'steps': steps}), 200
+
+
+@paths_bp.route('/next', methods=['GET'])
+@jwt_required()
+def get_next_up():
+    """Get content the user has just unlocked by completing its prerequisites"""
+    user_id = get_jwt_identity()
+    target_id = request.args.get('target_id', type=int)
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    items = next_up(user_id, target_id=target_id, limit=limit)
+    
+    return jsonify({'content': [item.to_dict() for item in items]}), 200
@@ -1,8 +1,15 @@
+from datetime import datetime, timezone
+from functools import partial
 from flask import Blueprint, request, jsonify
-from app import db
+from app import db, event_bus, recent_activity
 from app.models.progress import Progress
 from app.models.content import Content
+from app.utils.archival import archived_row, history, restore
+from app.utils.notes_search import index_notes, search_notes
+from app.utils.unit_of_work import on_commit
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload, selectinload
 
 progress_bp = Blueprint('progress', __name__)
 
@@ -13,12 +20,12 @@ def get_content_progress(content_id):
     """Get user's progress for specific content"""
     user_id = get_jwt_identity()
     
-    progress = Progress.query.filter_by(
-        user_id=user_id,
-        content_id=content_id
-    ).first()
+    progress = Progress.for_user(user_id).filter_by(content_id=content_id).first()
     
     if not progress:
+        archived = archived_row('progress', user_id, content_id)
+        if archived:
+            return jsonify(archived), 200
         return jsonify({
             'message': 'No progress found',
             'progress': {
@@ -38,11 +45,25 @@ def get_user_progress():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     bookmarked_only = request.args.get('bookmarked', type=str)
+    include_archived = request.args.get('include_archived', 'false', type=str).lower() == 'true'
     
-    query = Progress.query.filter_by(user_id=user_id)
+    query = Progress.for_user(user_id)
     
     if bookmarked_only and bookmarked_only.lower() == 'true':
         query = query.filter_by(bookmarked=True)
+    elif include_archived:
+        # Full history reads through to archived progress
+        items = history('progress', user_id, query, 'updated_at')
+        start = (max(page, 1) - 1) * per_page
+        return jsonify({
+            'progress': items[start:start + per_page],
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': len(items),
+                'pages': -(-len(items) // per_page) if per_page else 0
+            }
+        }), 200
     
     pagination = query.order_by(Progress.updated_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
@@ -60,6 +81,91 @@ def get_user_progress():
     }), 200
 
 
+@progress_bp.route('/notes/search', methods=['GET'])
+@jwt_required()
+def search_user_notes():
+    """Full-text search over the user's notes with highlighted snippets"""
+    user_id = get_jwt_identity()
+    query = request.args.get('q', '', type=str).strip()
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    if not query:
+        return jsonify({'error': 'Search query required'}), 400
+    
+    matches = search_notes(user_id, query, limit=limit)
+    titles = dict(db.session.query(Content.id, Content.title).filter(
+        Content.id.in_([content_id for content_id, _, _ in matches])
+    ).all())
+    
+    return jsonify({
+        'query': query,
+        'results': [
+            {'content_id': content_id, 'content_title': titles.get(content_id), 'snippet': snippet, 'rank': round(rank, 4)}
+            for content_id, snippet, rank in matches
+            if content_id in titles
+        ]
+    }), 200
+
+
+def _unfinished(user_id):
+    """Rebuild the continue-watching list from the user's progress rows"""
+    rows = Progress.for_user(user_id).filter(
+        Progress.completion_percentage < 100,
+        or_(Progress.completion_percentage > 0, Progress.last_position.isnot(None))
+    ).order_by(Progress.updated_at.desc()).limit(recent_activity.limit).all()
+    return [
+        [row.content_id, row.last_position, float(row.completion_percentage),
+         row.updated_at.replace(tzinfo=timezone.utc).timestamp()]
+        for row in rows
+    ]
+
+
+def _recent_items(entries, contents, time_field):
+    items = []
+    for content_id, last_position, completion_percentage, timestamp in entries:
+        content = contents.get(content_id)
+        if content is None:
+            continue  # Deleted or unpublished since
+        item = {
+            'content': content.to_dict(),
+            time_field: datetime.utcfromtimestamp(timestamp).isoformat()
+        }
+        if completion_percentage is not None:
+            item['completion_percentage'] = completion_percentage
+            item['last_position'] = last_position
+        items.append(item)
+    return items
+
+
+@progress_bp.route('/recent', methods=['GET'])
+@jwt_required()
+def get_recent_activity():
+    """Continue-watching and recently viewed content for the home screen in one call"""
+    user_id = get_jwt_identity()
+    limit = min(request.args.get('limit', 10, type=int), recent_activity.limit)
+    
+    watching = recent_activity.continue_watching(user_id, seed=partial(_unfinished, user_id))[:limit]
+    viewed = recent_activity.viewed(user_id)[:limit]
+    
+    # One query for the metadata of both lists
+    content_ids = {entry[0] for entry in watching + viewed}
+    contents = {}
+    if content_ids:
+        contents = {content.id: content for content in Content.query.options(
+            joinedload(Content.instructor),
+            joinedload(Content.category),
+            selectinload(Content.tags)
+        ).filter(
+            Content.id.in_(content_ids),
+            or_(Content.is_published == True, Content.instructor_id == user_id)
+        ).all()}
+    
+    return jsonify({
+        'continue_watching': _recent_items(watching, contents, 'updated_at'),
+        'recently_viewed': _recent_items(viewed, contents, 'viewed_at')
+    }), 200
+
+
 @progress_bp.route('', methods=['POST'])
 @jwt_required()
 def update_progress():
@@ -73,10 +179,9 @@ def update_progress():
     content_id = data.get('content_id')
     Content.query.get_or_404(content_id)  # Ensure content exists
     
-    progress = Progress.query.filter_by(
-        user_id=user_id,
-        content_id=content_id
-    ).first()
+    progress = Progress.for_user(user_id).filter_by(content_id=content_id).first() or restore(
+        'progress', user_id, content_id
+    )
     
     if not progress:
         progress = Progress(
@@ -98,7 +203,27 @@ def update_progress():
         if 'bookmarked' in data:
             progress.bookmarked = data['bookmarked']
     
-    db.session.commit()
+    # Keep the notes search index in step within the same transaction
+    if 'notes' in data:
+        db.session.flush()
+        index_notes(progress)
+    
+    db.session.flush()
+    
+    on_commit(partial(
+        event_bus.publish,
+        [f'user:{user_id}', f'content:{content_id}'],
+        'progress.updated',
+        progress.to_dict(),
+        coalesce_key=f'progress:{user_id}:{content_id}'
+    ))
+    on_commit(partial(
+        recent_activity.record_progress,
+        user_id,
+        content_id,
+        progress.last_position,
+        float(progress.completion_percentage or 0)
+    ))
     
     return jsonify({
         'message': 'Progress updated successfully',
@@ -112,10 +237,9 @@ def toggle_bookmark(content_id):
     """Toggle bookmark for content"""
     user_id = get_jwt_identity()
     
-    progress = Progress.query.filter_by(
-        user_id=user_id,
-        content_id=content_id
-    ).first()
+    progress = Progress.for_user(user_id).filter_by(content_id=content_id).first() or restore(
+        'progress', user_id, content_id
+    )
     
     if not progress:
         progress = Progress(
@@ -127,7 +251,15 @@ def toggle_bookmark(content_id):
     else:
         progress.bookmarked = not progress.bookmarked
     
-    db.session.commit()
+    db.session.flush()
+    
+    on_commit(partial(
+        event_bus.publish,
+        [f'user:{user_id}', f'content:{content_id}'],
+        'progress.updated',
+        progress.to_dict(),
+        coalesce_key=f'progress:{user_id}:{content_id}'
+    ))
     
     return jsonify({
         'message': 'Bookmark toggled successfully',
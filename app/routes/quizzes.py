@@ -0,0 +1,274 @@
+from functools import partial
+from flask import Blueprint, request, jsonify
+from app import db, event_bus, recent_activity
+from app.models.content import Content, ContentType
+from app.models.progress import Progress
+from app.models.quiz import QuizQuestion, QuizAttempt, QuestionType
+from app.models.user import User, UserRole
+from app.utils.archival import restore
+from app.utils.auth import instructor_required
+from app.utils.counters import CounterBuffer
+from app.utils.quiz import AnswerKeyCache, passing_percentage, validate_question
+from app.utils.unit_of_work import on_commit
+from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
+
+quizzes_bp = Blueprint('quizzes', __name__)
+
+answer_keys = AnswerKeyCache()
+
+# Per-question statistics are batched so exam-day bursts don't contend on question rows
+attempt_counter = CounterBuffer(QuizQuestion, 'attempt_count')
+correct_counter = CounterBuffer(QuizQuestion, 'correct_count')
+
+
+def _get_quiz(content_id):
+    content = Content.query.get_or_404(content_id)
+    if content.content_type != ContentType.QUIZ:
+        return content, (jsonify({'error': 'Content is not a quiz'}), 400)
+    return content, None
+
+
+def _can_edit(content, user_id):
+    user = User.query.get(user_id) if user_id is not None else None
+    return user is not None and (content.instructor_id == user_id or user.role == UserRole.ADMIN)
+
+
+@quizzes_bp.route('/<int:content_id>/questions', methods=['GET'])
+def get_questions(content_id):
+    """Get quiz questions; answers are included for the owner/admin only"""
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    
+    verify_jwt_in_request(optional=True)
+    is_editor = _can_edit(content, get_jwt_identity())
+    if not content.is_published and not is_editor:
+        return jsonify({'error': 'Content not found'}), 404
+    
+    questions = content.quiz_questions.order_by(QuizQuestion.position, QuizQuestion.id).all()
+    
+    return jsonify({
+        'content_id': content_id,
+        'questions': [question.to_dict(include_answers=is_editor) for question in questions]
+    }), 200
+
+
+@quizzes_bp.route('/<int:content_id>/questions', methods=['POST'])
+@jwt_required()
+@instructor_required
+def create_question(content_id):
+    """Add a question to a quiz (owner/admin only)"""
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    if not _can_edit(content, get_jwt_identity()):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    message = validate_question(data)
+    if message:
+        return jsonify({'error': message}), 400
+    
+    question = QuizQuestion(
+        content_id=content_id,
+        position=data.get('position', content.quiz_questions.count()),
+        question_type=data.get('question_type', QuestionType.SINGLE_CHOICE),
+        prompt=data['prompt'],
+        choices=data['choices'],
+        correct_choices=sorted(set(data['correct_choices'])),
+        points=data.get('points', 1),
+        explanation=data.get('explanation')
+    )
+    db.session.add(question)
+    db.session.flush()
+    
+    return jsonify({
+        'message': 'Question created successfully',
+        'question': question.to_dict(include_answers=True)
+    }), 201
+
+
+@quizzes_bp.route('/<int:content_id>/questions/<int:question_id>', methods=['PUT'])
+@jwt_required()
+@instructor_required
+def update_question(content_id, question_id):
+    """Update a quiz question (owner/admin only)"""
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    if not _can_edit(content, get_jwt_identity()):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    question = QuizQuestion.query.filter_by(id=question_id, content_id=content_id).first_or_404()
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    merged = dict(question.to_dict(include_answers=True), **data)
+    message = validate_question(merged)
+    if message:
+        return jsonify({'error': message}), 400
+    
+    for field in ('position', 'question_type', 'prompt', 'choices', 'points', 'explanation'):
+        if field in data:
+            setattr(question, field, data[field])
+    if 'correct_choices' in data:
+        question.correct_choices = sorted(set(data['correct_choices']))
+    db.session.flush()
+    
+    return jsonify({
+        'message': 'Question updated successfully',
+        'question': question.to_dict(include_answers=True)
+    }), 200
+
+
+@quizzes_bp.route('/<int:content_id>/questions/<int:question_id>', methods=['DELETE'])
+@jwt_required()
+@instructor_required
+def delete_question(content_id, question_id):
+    """Delete a quiz question (owner/admin only)"""
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    if not _can_edit(content, get_jwt_identity()):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    question = QuizQuestion.query.filter_by(id=question_id, content_id=content_id).first_or_404()
+    db.session.delete(question)
+    db.session.flush()
+    
+    return jsonify({'message': 'Question deleted successfully'}), 200
+
+
+@quizzes_bp.route('/<int:content_id>/attempts', methods=['POST'])
+@jwt_required()
+def submit_attempt(content_id):
+    """Submit answers ({question_id: [choice indices]}) and get the graded attempt"""
+    user_id = get_jwt_identity()
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    if not content.is_published:
+        return jsonify({'error': 'Content is not published'}), 400
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('answers'), dict):
+        return jsonify({'error': 'answers required'}), 400
+    
+    key = answer_keys.get(content_id)
+    if not len(key):
+        return jsonify({'error': 'Quiz has no questions'}), 400
+    
+    try:
+        selections = key.encode(data['answers'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    correct, scores = key.grade(selections)
+    score = float(scores[0])
+    percentage = round(score / key.max_score * 100, 2) if key.max_score else 100.0
+    passed = percentage >= passing_percentage(content)
+    
+    attempt = QuizAttempt(
+        user_id=user_id,
+        content_id=content_id,
+        answers={str(question_id): selected for question_id, selected in data['answers'].items()},
+        results={str(question_id): bool(ok) for question_id, ok in zip(key.question_ids, correct[0])},
+        score=score,
+        max_score=key.max_score,
+        percentage=percentage,
+        passed=passed
+    )
+    db.session.add(attempt)
+    
+    # Passing completes the quiz
+    progress = None
+    if passed:
+        progress = Progress.for_user(user_id).filter_by(content_id=content_id).first() or restore(
+            'progress', user_id, content_id
+        )
+        if not progress:
+            progress = Progress(user_id=user_id, content_id=content_id)
+            db.session.add(progress)
+        progress.completion_percentage = 100.0
+    
+    db.session.flush()
+    
+    for question_id, ok in zip(key.question_ids, correct[0]):
+        on_commit(partial(attempt_counter.incr, question_id))
+        if ok:
+            on_commit(partial(correct_counter.incr, question_id))
+    
+    on_commit(partial(event_bus.publish, [f'user:{user_id}'], 'quiz.graded', attempt.to_dict()))
+    if progress is not None:
+        on_commit(partial(
+            event_bus.publish,
+            [f'user:{user_id}', f'content:{content_id}'],
+            'progress.updated',
+            progress.to_dict(),
+            coalesce_key=f'progress:{user_id}:{content_id}'
+        ))
+        on_commit(partial(
+            recent_activity.record_progress,
+            user_id,
+            content_id,
+            progress.last_position,
+            float(progress.completion_percentage)
+        ))
+    
+    return jsonify({
+        'message': 'Quiz passed' if passed else 'Quiz not passed',
+        'attempt': attempt.to_dict()
+    }), 201
+
+
+@quizzes_bp.route('/<int:content_id>/attempts', methods=['GET'])
+@jwt_required()
+def get_attempts(content_id):
+    """Get the user's attempts at a quiz, newest first"""
+    user_id = get_jwt_identity()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    
+    pagination = QuizAttempt.query.filter_by(user_id=user_id, content_id=content_id).order_by(
+        QuizAttempt.submitted_at.desc()
+    ).paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'attempts': [attempt.to_dict() for attempt in pagination.items],
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': pagination.total,
+            'pages': pagination.pages
+        }
+    }), 200
+
+
+@quizzes_bp.route('/<int:content_id>/stats', methods=['GET'])
+@jwt_required()
+@instructor_required
+def get_quiz_stats(content_id):
+    """Get per-question correctness statistics (owner/admin only)"""
+    content, error = _get_quiz(content_id)
+    if error:
+        return error
+    if not _can_edit(content, get_jwt_identity()):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    stats = []
+    for question in content.quiz_questions.order_by(QuizQuestion.position, QuizQuestion.id):
+        attempts = question.attempt_count + attempt_counter.pending(question.id)
+        correct = question.correct_count + correct_counter.pending(question.id)
+        stats.append({
+            'question_id': question.id,
+            'prompt': question.prompt,
+            'attempt_count': attempts,
+            'correct_count': correct,
+            'correct_rate': round(correct / attempts, 4) if attempts else None,
+        })
+    
+    return jsonify({'content_id': content_id, 'questions': stats}), 200
@@ -1,12 +1,22 @@
+from functools import partial
 from flask import Blueprint, request, jsonify
-from app import db
-from app.models.review import Review
+from app import db, event_bus
+from app.models.review import Review, ReviewVote
 from app.models.content import Content
 from app.models.enrollment import Enrollment
+from app.jobs.tasks import refresh_content_rating
+from app.utils.archival import archived_row
+from app.utils.counters import CounterBuffer
+from app.utils.instructor_stats import adjust_instructor_stats
+from app.utils.unit_of_work import on_commit
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 
 reviews_bp = Blueprint('reviews', __name__)
 
+# Helpful votes land in review_votes at once; the denormalized count is batched
+helpful_counter = CounterBuffer(Review, 'helpful_count')
+
 
 @reviews_bp.route('/content/<int:content_id>', methods=['GET'])
 def get_content_reviews(content_id):
@@ -20,7 +30,7 @@ def get_content_reviews(content_id):
     if sort_by == 'rating':
         query = query.order_by(Review.rating.desc())
     elif sort_by == 'helpful':
-        query = query.order_by(Review.helpful_count.desc())
+        query = query.order_by(Review.helpful_count.desc(), Review.id.desc())
     else:
         query = query.order_by(Review.created_at.desc())
     
@@ -62,10 +72,10 @@ def create_review():
         return jsonify({'error': 'Review already exists'}), 409
     
     # Check if user is enrolled (for verified purchase)
-    is_verified = Enrollment.query.filter_by(
-        user_id=user_id, 
-        content_id=content_id
-    ).first() is not None
+    is_verified = (
+        Enrollment.for_user(user_id).filter_by(content_id=content_id).first() is not None
+        or archived_row('enrollment', user_id, content_id) is not None
+    )
     
     review = Review(
         user_id=user_id,
@@ -77,10 +87,13 @@ def create_review():
     )
     
     db.session.add(review)
-    db.session.commit()
+    adjust_instructor_stats(content.instructor_id, rating_sum=rating, rating_count=1)
     
-    # Update content rating
-    content.update_rating()
+    # Update content rating in the background
+    refresh_content_rating.delay(content.id)
+    db.session.flush()
+    
+    on_commit(partial(event_bus.publish, [f'user:{user_id}', f'content:{content_id}'], 'review.created', review.to_dict()))
     
     return jsonify({
         'message': 'Review created successfully',
@@ -97,6 +110,8 @@ def update_review(review_id):
     
     if review.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
+    if review.content is None:
+        return jsonify({'error': 'Content not found'}), 404  # Deleted, purge pending
     
     data = request.get_json()
     
@@ -104,6 +119,7 @@ def update_review(review_id):
         rating = data['rating']
         if not (1 <= rating <= 5):
             return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+        adjust_instructor_stats(review.content.instructor_id, rating_sum=rating - review.rating)
         review.rating = rating
     
     if 'title' in data:
@@ -111,10 +127,11 @@ def update_review(review_id):
     if 'comment' in data:
         review.comment = data['comment']
     
-    db.session.commit()
+    # Update content rating in the background
+    refresh_content_rating.delay(review.content_id)
+    db.session.flush()
     
-    # Update content rating
-    review.content.update_rating()
+    on_commit(partial(event_bus.publish, [f'user:{user_id}', f'content:{review.content_id}'], 'review.updated', review.to_dict()))
     
     return jsonify({
         'message': 'Review updated successfully',
@@ -131,13 +148,22 @@ def delete_review(review_id):
     
     if review.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
+    if review.content is None:
+        return jsonify({'error': 'Content not found'}), 404  # Deleted, purge pending
     
-    content = review.content
+    adjust_instructor_stats(review.content.instructor_id, rating_sum=-review.rating, rating_count=-1)
     db.session.delete(review)
-    db.session.commit()
     
-    # Update content rating
-    content.update_rating()
+    # Update content rating in the background
+    refresh_content_rating.delay(review.content_id)
+    db.session.flush()
+    
+    on_commit(partial(
+        event_bus.publish,
+        [f'user:{user_id}', f'content:{review.content_id}'],
+        'review.deleted',
+        {'id': review_id, 'user_id': user_id, 'content_id': review.content_id}
+    ))
     
     return jsonify({'message': 'Review deleted successfully'}), 200
 
@@ -145,13 +171,40 @@ def delete_review(review_id):
 @reviews_bp.route('/<int:review_id>/helpful', methods=['POST'])
 @jwt_required()
 def mark_helpful(review_id):
-    """Mark a review as helpful"""
+    """Mark a review as helpful (once per user)"""
+    user_id = get_jwt_identity()
     review = Review.query.get_or_404(review_id)
-    review.helpful_count += 1
-    db.session.commit()
     
+    try:
+        with db.session.begin_nested():
+            db.session.add(ReviewVote(user_id=user_id, review_id=review_id))
+    except IntegrityError:
+        return jsonify({'error': 'Review already marked as helpful'}), 409
+    db.session.flush()
+    on_commit(partial(helpful_counter.incr, review_id))
+    
+    # The counter only hears of this vote once the request commits
     return jsonify({
         'message': 'Review marked as helpful',
-        'helpful_count': review.helpful_count
+        'helpful_count': review.helpful_count + helpful_counter.pending(review_id) + 1
+    }), 200
+
+
+@reviews_bp.route('/<int:review_id>/helpful', methods=['DELETE'])
+@jwt_required()
+def unmark_helpful(review_id):
+    """Withdraw a helpful vote"""
+    user_id = get_jwt_identity()
+    review = Review.query.get_or_404(review_id)
+    
+    removed = ReviewVote.query.filter_by(user_id=user_id, review_id=review_id).delete()
+    if not removed:
+        return jsonify({'error': 'Review not marked as helpful'}), 404
+    db.session.flush()
+    on_commit(partial(helpful_counter.incr, review_id, -1))
+    
+    return jsonify({
+        'message': 'Helpful vote removed',
+        'helpful_count': review.helpful_count + helpful_counter.pending(review_id) - 1
     }), 200
 
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from app import db
 from app.models.content import Content
 from app.models.tag import Tag
+from app.utils.fields import parse_fields, select_fields
 from sqlalchemy import or_, desc
 
 search_bp = Blueprint('search', __name__)
@@ -14,6 +15,8 @@ def search():
     tags = request.args.get('tags', '', type=str)
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
+    view = request.args.get('view', 'full', type=str)  # full, compact
+    fields = parse_fields(request.args.get('fields', type=str))
     
     # Start with published content
     search_query = Content.query.filter_by(is_published=True)
@@ -46,7 +49,10 @@ def search():
     
     return jsonify({
         'query': query,
-        'results': [item.to_dict() for item in results],
+        'results': [
+            select_fields(Content.compact_dict(item.to_dict()) if view == 'compact' else item.to_dict(), fields)
+            for item in results
+        ],
         'pagination': {
             'page': page,
             'per_page': per_page,
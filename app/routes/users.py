@@ -1,7 +1,15 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, request, jsonify, abort
+from functools import partial
+from app import db, recent_activity
 from app.models.user import User
+from app.jobs.tasks import purge_user
+from app.routes.content import catalog
 from app.utils.auth import admin_required, instructor_required
+from app.utils.deletion import soft_delete_user
+from app.utils.http_cache import not_modified, weak_etag, with_cache_headers
+from app.utils.unit_of_work import on_commit
+from app.utils.user_directory import SORTS, count_users, filtered_query, keyset_page
+from app.utils.versioning import snapshots
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 users_bp = Blueprint('users', __name__)
@@ -11,26 +19,46 @@ users_bp = Blueprint('users', __name__)
 @jwt_required()
 @admin_required
 def get_users():
-    """Get all users (admin only)"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    role = request.args.get('role', type=str)
+    """Search the user directory (admin only).
+
+    Pages are keyset-paginated: pass ``next_cursor`` back as ``cursor``.
+    ``page`` is still accepted for offset pagination.
+    """
+    per_page = max(min(request.args.get('per_page', 20, type=int), 100), 1)
+    sort = request.args.get('sort', 'newest', type=str)
+    is_active = request.args.get('is_active', type=str)
     
-    query = User.query
+    if sort not in SORTS:
+        return jsonify({'error': f"sort must be one of: {', '.join(SORTS)}"}), 400
+    if is_active is not None and is_active.lower() not in ('true', 'false'):
+        return jsonify({'error': 'is_active must be true or false'}), 400
     
-    if role:
-        query = query.filter_by(role=role)
+    query = filtered_query(
+        request.args.get('q', type=str),
+        role=request.args.get('role', type=str),
+        is_active=None if is_active is None else is_active.lower() == 'true'
+    )
+    total, estimated = count_users(query)
     
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-    users = pagination.items
+    page = request.args.get('page', type=int)
+    if page is not None:
+        pagination = keyset_page(query, sort, limit=per_page, offset=(max(page, 1) - 1) * per_page)
+    else:
+        try:
+            pagination = keyset_page(query, sort, cursor=request.args.get('cursor', type=str), limit=per_page)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    users, next_cursor = pagination
     
     return jsonify({
-        'users': [user.to_dict() for user in users],
+        'users': [user.to_dict(include_sensitive=True) for user in users],
         'pagination': {
             'page': page,
             'per_page': per_page,
-            'total': pagination.total,
-            'pages': pagination.pages
+            'next_cursor': next_cursor,
+            'total': total,
+            'total_is_estimate': estimated,
+            'pages': -(-total // per_page) if per_page else 0
         }
     }), 200
 
@@ -39,8 +67,18 @@ def get_users():
 @jwt_required()
 def get_user(user_id):
     """Get user by ID"""
+    row = db.session.query(User.updated_at).filter_by(id=user_id).first()
+    if row is None:
+        abort(404)
+    
+    updated_at = row.updated_at
+    etag = weak_etag('user', user_id, updated_at)
+    cached = not_modified(etag, updated_at, policy='user')
+    if cached:
+        return cached
+    
     user = User.query.get_or_404(user_id)
-    return jsonify(user.to_dict()), 200
+    return with_cache_headers(jsonify(user.to_dict()), etag, updated_at, policy='user')
 
 
 @users_bp.route('/<int:user_id>', methods=['PUT'])
@@ -68,7 +106,7 @@ def update_user(user_id):
     if 'avatar_url' in data:
         user.avatar_url = data['avatar_url']
     
-    db.session.commit()
+    db.session.flush()
     
     return jsonify({
         'message': 'User updated successfully',
@@ -82,8 +120,16 @@ def update_user(user_id):
 def delete_user(user_id):
     """Delete user (admin only)"""
     user = User.query.get_or_404(user_id)
-    db.session.delete(user)
-    db.session.commit()
+    
+    # Hidden right away along with their content; the rows go in the background
+    content_ids = soft_delete_user(user)
+    db.session.flush()
+    purge_user.delay(user_id)
+    
+    on_commit(partial(recent_activity.forget, user_id))
+    for content_id in content_ids:
+        on_commit(partial(catalog.invalidate, content_id))
+        on_commit(partial(snapshots.evict, content_id))
     
     return jsonify({'message': 'User deleted successfully'}), 200
 
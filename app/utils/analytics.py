@@ -0,0 +1,177 @@
+"""Incremental rollup of learning activity into ``content_daily_metrics``.
+
+Each run only reads source rows stamped since the start of the day the
+previous run stopped in, aggregates them per (content, day) with NumPy and
+replaces the rollup rows for those days. Earlier days are frozen, so the
+cost of a run is proportional to recent activity, not table size.
+
+Progress rows are updated in place, so each (user, content) pair counts
+once, on the day of its latest update. ``progress_rollup_state`` remembers
+where every pair was counted; when a pair moves off a frozen day, its old
+contribution is taken back from that day's row.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, time
+import numpy as np
+from sqlalchemy import select, delete, insert, tuple_, update
+from app import db
+from app.models.analytics import ContentDailyMetrics, ProgressRollupState, AnalyticsWatermark
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.progress import Progress
+from app.models.review import Review
+
+ROLLUP_NAME = 'content_daily_metrics'
+CHUNK_SIZE = 50000
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Upper bounds of the drop-off buckets; 100% lands in its own bucket
+BUCKET_EDGES = np.array([25.0, 50.0, 75.0, 100.0])
+BUCKET_COLUMNS = ['bucket_0_25', 'bucket_25_50', 'bucket_50_75', 'bucket_75_100', 'bucket_complete']
+
+
+def _group(content_ids, timestamps, metrics, totals):
+    """Sum ``metrics`` per (content_id, day) and add them into ``totals``"""
+    days = np.array(timestamps, dtype='datetime64[D]').astype(np.int64)
+    keys = (np.asarray(content_ids, dtype=np.int64) << 32) | days
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+    sums = {
+        name: np.bincount(inverse, weights=values, minlength=len(unique_keys))
+        for name, values in metrics.items()
+    }
+    for index, key in enumerate(unique_keys.tolist()):
+        bucket = totals[(key >> 32, key & 0xFFFFFFFF)]
+        for name, values in sums.items():
+            bucket[name] += values[index]
+
+
+def _scan(statement):
+    """Yield source rows in column-oriented chunks"""
+    result = db.session.execute(statement.execution_options(yield_per=CHUNK_SIZE))
+    for rows in result.partitions():
+        yield list(zip(*rows))
+
+
+def _track_progress(user_ids, content_ids, days, percentages, buckets, start, moved):
+    """Record where each progress pair is counted now.
+
+    Pairs last counted on a frozen day (before ``start``) add their old
+    contribution to ``moved``, keyed by (content_id, day), to be taken back.
+    """
+    pairs = list(zip(user_ids, content_ids))
+    for offset in range(0, len(pairs), 1000):
+        chunk = pairs[offset:offset + 1000]
+        key = tuple_(ProgressRollupState.user_id, ProgressRollupState.content_id).in_(chunk)
+        if start is not None:
+            for state in db.session.query(ProgressRollupState).filter(key, ProgressRollupState.day < start.date()):
+                bucket = moved[(state.content_id, state.day)]
+                bucket['progress_updates'] += 1
+                bucket['completion_sum'] += state.completion
+                bucket[BUCKET_COLUMNS[state.bucket]] += 1
+        db.session.execute(delete(ProgressRollupState).where(key))
+
+    db.session.execute(insert(ProgressRollupState), [
+        {
+            'user_id': user_id,
+            'content_id': content_id,
+            'day': date.fromordinal(EPOCH_ORDINAL + day),
+            'bucket': bucket,
+            'completion': completion,
+        }
+        for user_id, content_id, day, completion, bucket in zip(
+            user_ids, content_ids, days.tolist(), percentages.tolist(), buckets.tolist()
+        )
+    ])
+
+
+def _window(statement, column, start, end):
+    statement = statement.where(column.isnot(None), column < end)
+    if start is not None:
+        statement = statement.where(column >= start)
+    return statement
+
+
+def rollup_content_metrics(now=None):
+    """Bring ``content_daily_metrics`` up to date. The caller commits."""
+    now = now or datetime.utcnow()
+    watermark = db.session.get(AnalyticsWatermark, ROLLUP_NAME)
+    start = datetime.combine(watermark.processed_until.date(), time.min) if watermark else None
+    totals = defaultdict(lambda: defaultdict(float))
+    moved = defaultdict(lambda: defaultdict(float))
+
+    statement = _window(select(Enrollment.content_id, Enrollment.enrolled_at), Enrollment.enrolled_at, start, now)
+    for content_ids, timestamps in _scan(statement):
+        _group(content_ids, timestamps, {'new_enrollments': None}, totals)
+
+    statement = _window(select(Enrollment.content_id, Enrollment.completed_at), Enrollment.completed_at, start, now)
+    for content_ids, timestamps in _scan(statement):
+        _group(content_ids, timestamps, {'completions': None}, totals)
+
+    statement = _window(
+        select(Progress.user_id, Progress.content_id, Progress.updated_at, Progress.completion_percentage),
+        Progress.updated_at, start, now
+    )
+    for user_ids, content_ids, timestamps, percentages in _scan(statement):
+        percentages = np.asarray(percentages, dtype=np.float64)
+        buckets = np.searchsorted(BUCKET_EDGES, percentages, side='right')
+        metrics = {'progress_updates': None, 'completion_sum': percentages}
+        for index, name in enumerate(BUCKET_COLUMNS):
+            metrics[name] = (buckets == index).astype(np.float64)
+        _group(content_ids, timestamps, metrics, totals)
+        days = np.array(timestamps, dtype='datetime64[D]').astype(np.int64)
+        _track_progress(user_ids, content_ids, days, percentages, buckets, start, moved)
+
+    statement = _window(select(Review.content_id, Review.created_at, Review.rating), Review.created_at, start, now)
+    for content_ids, timestamps, ratings in _scan(statement):
+        _group(content_ids, timestamps, {
+            'review_count': None,
+            'rating_sum': np.asarray(ratings, dtype=np.float64)
+        }, totals)
+
+    # Replace the rollup rows of every day touched by this run
+    clear = delete(ContentDailyMetrics)
+    if start is not None:
+        clear = clear.where(ContentDailyMetrics.day >= start.date())
+    db.session.execute(clear)
+
+    instructors = {}
+    content_ids = list({content_id for content_id, _ in totals})
+    for offset in range(0, len(content_ids), 1000):
+        instructors.update(db.session.query(Content.id, Content.instructor_id).filter(
+            Content.id.in_(content_ids[offset:offset + 1000])
+        ).all())
+
+    rows = []
+    for (content_id, day), metrics in totals.items():
+        if content_id not in instructors:
+            continue  # Content deleted since the activity happened
+        row = {name: int(round(metrics.get(name, 0))) for name in ContentDailyMetrics.METRICS}
+        row['completion_sum'] = float(metrics.get('completion_sum', 0.0))
+        row.update(
+            content_id=content_id,
+            day=date.fromordinal(EPOCH_ORDINAL + day),
+            instructor_id=instructors[content_id]
+        )
+        rows.append(row)
+    if rows:
+        db.session.execute(insert(ContentDailyMetrics), rows)
+
+    # Progress that moved off a frozen day no longer counts there
+    for (content_id, day), metrics in moved.items():
+        db.session.execute(update(ContentDailyMetrics).where(
+            ContentDailyMetrics.content_id == content_id, ContentDailyMetrics.day == day
+        ).values({
+            getattr(ContentDailyMetrics, name): getattr(ContentDailyMetrics, name) - (
+                value if name == 'completion_sum' else int(round(value))
+            )
+            for name, value in metrics.items()
+        }))
+
+    if watermark is None:
+        watermark = AnalyticsWatermark(name=ROLLUP_NAME, processed_until=now)
+        db.session.add(watermark)
+    else:
+        watermark.processed_until = now
+    return len(rows)
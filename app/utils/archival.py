@@ -0,0 +1,130 @@
+"""Hot/cold archival of finished enrollments and stale progress.
+
+Completed enrollments and untouched progress rows are moved in batches
+from the hot, user-partitioned tables into ``archived_records``, one
+compressed row each. Reads that ask for a user's full history merge the
+archive back in, and writing to an archived pair restores its row first,
+so archival is invisible to clients apart from latency.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, tuple_
+from app import db
+from app.models.archive import ArchivedRecord
+from app.models.enrollment import Enrollment
+from app.models.progress import Progress
+from app.utils.validators import parse_datetime
+
+KINDS = {'enrollment': Enrollment, 'progress': Progress}
+BATCH_SIZE = 1000
+
+
+def _serialize(row):
+    values = {}
+    for column in row.__table__.columns:
+        value = getattr(row, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is not None and not isinstance(value, (bool, int, str)):
+            value = float(value)
+        values[column.key] = value
+    return values
+
+
+def _deserialize(model, values):
+    values = dict(values)
+    for column in model.__table__.columns:
+        if isinstance(column.type, db.DateTime) and values.get(column.key):
+            values[column.key] = parse_datetime(values[column.key])
+    return model(**values)
+
+
+def _stale_criteria(kind, now):
+    config = current_app.config
+    if kind == 'enrollment':
+        cutoff = now - timedelta(days=config.get('ARCHIVE_COMPLETED_AFTER_DAYS', 365))
+        return (Enrollment.is_completed == True, Enrollment.completed_at < cutoff)
+    cutoff = now - timedelta(days=config.get('ARCHIVE_STALE_PROGRESS_AFTER_DAYS', 365))
+    # Bookmarks stay hot; they back the user's bookmark list
+    return (Progress.updated_at < cutoff, Progress.bookmarked == False)
+
+
+def archive_stale_records(now=None, batch_size=BATCH_SIZE, max_batches=None):
+    """Move stale rows into the archive, committing after every batch.
+
+    Returns the number of rows archived per kind.
+    """
+    now = now or datetime.utcnow()
+    archived = {}
+    for kind, model in KINDS.items():
+        archived[kind] = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            rows = model.query.filter(*_stale_criteria(kind, now)).limit(batch_size).all()
+            if not rows:
+                break
+            
+            pairs = [(row.user_id, row.content_id) for row in rows]
+            db.session.execute(delete(ArchivedRecord).where(
+                ArchivedRecord.kind == kind,
+                tuple_(ArchivedRecord.user_id, ArchivedRecord.content_id).in_(pairs)
+            ))
+            db.session.execute(insert(ArchivedRecord), [{
+                'kind': kind,
+                'user_id': row.user_id,
+                'content_id': row.content_id,
+                'payload': ArchivedRecord.pack(_serialize(row)),
+                'archived_at': now,
+            } for row in rows])
+            db.session.execute(delete(model).where(
+                tuple_(model.id, model.user_id).in_([(row.id, row.user_id) for row in rows])
+            ).execution_options(synchronize_session=False))
+            db.session.commit()
+            
+            archived[kind] += len(rows)
+            batches += 1
+    return archived
+
+
+def archived_rows(kind, user_id):
+    """Return a user's archived rows of ``kind`` as dictionaries"""
+    return [
+        dict(record.unpack(), archived=True)
+        for record in ArchivedRecord.query.filter_by(user_id=user_id, kind=kind)
+    ]
+
+
+def history(kind, user_id, hot_rows, sort_key):
+    """Merge a user's hot rows with their archived ones, newest first"""
+    items = [row.to_dict() for row in hot_rows]
+    live = {item['content_id'] for item in items}
+    items.extend(item for item in archived_rows(kind, user_id) if item['content_id'] not in live)
+    items.sort(key=lambda item: item[sort_key] or '', reverse=True)
+    return items
+
+
+def archived_row(kind, user_id, content_id):
+    record = ArchivedRecord.query.filter_by(user_id=user_id, kind=kind, content_id=content_id).first()
+    return dict(record.unpack(), archived=True) if record else None
+
+
+def archived_pairs(kind, pairs):
+    """The (user_id, content_id) pairs among ``pairs`` with an archived row of ``kind``"""
+    return set(map(tuple, db.session.query(ArchivedRecord.user_id, ArchivedRecord.content_id).filter(
+        ArchivedRecord.kind == kind,
+        tuple_(ArchivedRecord.user_id, ArchivedRecord.content_id).in_(pairs)
+    ).all()))
+
+
+def restore(kind, user_id, content_id):
+    """Move an archived row back into its hot table. The caller commits."""
+    record = ArchivedRecord.query.filter_by(user_id=user_id, kind=kind, content_id=content_id).first()
+    if record is None:
+        return None
+    row = _deserialize(KINDS[kind], record.unpack())
+    if isinstance(row, Progress):
+        row.updated_at = datetime.utcnow()  # restored for a write; keep it hot
+    db.session.delete(record)
+    db.session.add(row)
+    return row
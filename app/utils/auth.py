@@ -1,9 +1,24 @@
 from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from app.models.user import User, UserRole
 
 
+def optional_identity():
+    """Identity of the caller, or None when anonymous.
+
+    An expired or invalid token also counts as anonymous, so public
+    endpoints keep working for clients sending a stale header.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    return get_jwt_identity()
+
+
 def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
@@ -0,0 +1,130 @@
+from collections import Counter
+from datetime import datetime
+from functools import partial
+from sqlalchemy import insert, select, tuple_
+from app import db, event_bus
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.partitioning import generate_id
+from app.models.user import User, UserRole
+from app.utils.archival import archived_pairs
+from app.utils.instructor_stats import adjust_instructor_stats
+from app.utils.unit_of_work import on_commit
+
+BATCH_SIZE = 1000
+
+
+class EnrollmentOutcome:
+    ENROLLED = 'enrolled'
+    ALREADY_ENROLLED = 'already_enrolled'
+    USER_NOT_FOUND = 'user_not_found'
+    CONTENT_NOT_FOUND = 'content_not_found'
+    CONTENT_NOT_PUBLISHED = 'content_not_published'
+    FORBIDDEN = 'forbidden'
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def _insert_ignoring_conflicts(rows):
+    """Insert enrollment rows, skipping existing pairs. Returns the inserted pairs."""
+    dialect = db.engine.dialect
+    if dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    pairs = [(row['user_id'], row['content_id']) for row in rows]
+    if dialect_insert is not None and getattr(dialect, 'insert_returning', False):
+        statement = dialect_insert(Enrollment).values(rows).on_conflict_do_nothing(
+            index_elements=['user_id', 'content_id']
+        ).returning(Enrollment.user_id, Enrollment.content_id)
+        return set(map(tuple, db.session.execute(statement).all()))
+
+    # No multi-row upsert with RETURNING: filter out existing pairs first
+    existing = set(map(tuple, db.session.execute(
+        select(Enrollment.user_id, Enrollment.content_id).where(
+            tuple_(Enrollment.user_id, Enrollment.content_id).in_(pairs)
+        )
+    ).all()))
+    rows = [row for row in rows if (row['user_id'], row['content_id']) not in existing]
+    if rows:
+        statement = insert(Enrollment).values(rows)
+        if dialect_insert is not None:
+            statement = dialect_insert(Enrollment).values(rows).on_conflict_do_nothing(
+                index_elements=['user_id', 'content_id']
+            )
+        db.session.execute(statement)
+    return {(row['user_id'], row['content_id']) for row in rows}
+
+
+def bulk_enroll(pairs, actor=None):
+    """Enroll (user_id, content_id) pairs, yielding one outcome dict per pair.
+
+    Content and users are validated with one query per batch of ids and each
+    batch of valid pairs is written with a single multi-row
+    ``INSERT ... ON CONFLICT DO NOTHING`` and committed before its outcomes
+    are yielded; each new enrollment is published as ``enrollment.created``
+    once its batch has committed. ``actor`` restricts non-admins to their
+    own content.
+    """
+    pairs = list(dict.fromkeys((int(user_id), int(content_id)) for user_id, content_id in pairs))
+    content_ids = list({content_id for _, content_id in pairs})
+    user_ids = list({user_id for user_id, _ in pairs})
+
+    content = {}
+    for chunk in _chunks(content_ids):
+        for content_id, is_published, instructor_id in db.session.query(
+            Content.id, Content.is_published, Content.instructor_id
+        ).filter(Content.id.in_(chunk)):
+            content[content_id] = (is_published, instructor_id)
+
+    existing_users = set()
+    for chunk in _chunks(user_ids):
+        existing_users.update(user_id for (user_id,) in db.session.query(User.id).filter(User.id.in_(chunk)))
+
+    is_admin = actor is None or actor.role == UserRole.ADMIN
+    for batch in _chunks(pairs):
+        outcomes = {}
+        rows = []
+        # Archived enrollments still count as enrolled (and in the instructor totals)
+        archived = archived_pairs('enrollment', batch)
+        for user_id, content_id in batch:
+            if content_id not in content:
+                outcomes[(user_id, content_id)] = EnrollmentOutcome.CONTENT_NOT_FOUND
+            elif not is_admin and content[content_id][1] != actor.id:
+                outcomes[(user_id, content_id)] = EnrollmentOutcome.FORBIDDEN
+            elif not content[content_id][0]:
+                outcomes[(user_id, content_id)] = EnrollmentOutcome.CONTENT_NOT_PUBLISHED
+            elif user_id not in existing_users:
+                outcomes[(user_id, content_id)] = EnrollmentOutcome.USER_NOT_FOUND
+            elif (user_id, content_id) in archived:
+                outcomes[(user_id, content_id)] = EnrollmentOutcome.ALREADY_ENROLLED
+            else:
+                rows.append({
+                    'id': generate_id(), 'user_id': user_id, 'content_id': content_id, 'enrolled_at': datetime.utcnow()
+                })
+
+        inserted = _insert_ignoring_conflicts(rows) if rows else set()
+        for row in rows:
+            pair = (row['user_id'], row['content_id'])
+            outcomes[pair] = EnrollmentOutcome.ENROLLED if pair in inserted else EnrollmentOutcome.ALREADY_ENROLLED
+            if pair in inserted:
+                on_commit(partial(
+                    event_bus.publish,
+                    [f'user:{pair[0]}', f'content:{pair[1]}'],
+                    'enrollment.created',
+                    Enrollment(is_completed=False, **row).to_dict()
+                ))
+
+        per_instructor = Counter(content[content_id][1] for _, content_id in inserted)
+        for instructor_id, count in per_instructor.items():
+            adjust_instructor_stats(instructor_id, total_enrollments=count)
+        db.session.commit()
+
+        for user_id, content_id in batch:
+            yield {'user_id': user_id, 'content_id': content_id, 'status': outcomes[(user_id, content_id)]}
@@ -0,0 +1,298 @@
+"""Compact in-memory snapshot of the published catalog.
+
+The snapshot keeps one row per published content item, stored in
+``created_at`` order, with:
+
+* ``ids`` and sort keys in typed arrays,
+* filter fields dictionary-encoded to small integer codes,
+* one bitmap (a Python int, bit ``i`` = row ``i``) per field value.
+
+A filter is a handful of bitmap ANDs, the total is a popcount, and a page
+is read by walking set bits in sort order, so browsing never touches the
+database. Content writes queue their id for refresh; the next read reloads
+just those rows and atomically swaps in a new, versioned snapshot. Edits of
+rows already in the snapshot are patched into a copy of its bitmaps and
+ranks; only rows appearing or disappearing rebuild it. Loading and building
+happen outside the engine's lock, and readers arriving meanwhile keep
+getting the current snapshot.
+"""
+
+import bisect
+import copy
+import heapq
+import threading
+import time
+from array import array
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from app.models.content import Content
+
+FILTER_FIELDS = ('content_type', 'category_id', 'instructor_id', 'is_free', 'difficulty_level', 'language', 'tags')
+
+# Positions of the set bits in every byte value
+_BYTE_BITS = [[bit for bit in range(8) if value >> bit & 1] for value in range(256)]
+
+
+def _record(content):
+    return {
+        'id': content.id,
+        'created_at': content.created_at.timestamp() if content.created_at else 0.0,
+        'rating': float(content.rating_average or 0),
+        'views': content.view_count or 0,
+        'content_type': content.content_type,
+        'category_id': content.category_id,
+        'instructor_id': content.instructor_id,
+        'is_free': bool(content.is_free),
+        'difficulty_level': content.difficulty_level,
+        'language': content.language,
+        'tags': [tag.name for tag in content.tags],
+        'payload': content.to_dict(),
+    }
+
+
+def _load(query):
+    return query.options(
+        joinedload(Content.instructor),
+        joinedload(Content.category),
+        selectinload(Content.tags)
+    ).all()
+
+
+class CatalogSnapshot:
+    """Immutable column-oriented view of published content"""
+
+    def __init__(self, records, version):
+        self.version = version
+        self.records = records
+        rows = sorted(records.values(), key=lambda r: (r['created_at'], r['id']), reverse=True)
+        count = len(rows)
+
+        self.ids = array('q', (r['id'] for r in rows))
+        self.position_of = {r['id']: position for position, r in enumerate(rows)}
+        self.payloads = [r['payload'] for r in rows]
+        self.all_rows = (1 << count) - 1
+
+        # Dictionary-encode filter values and build one bitmap per code
+        self.codes = {field: {} for field in FILTER_FIELDS}
+        bits = {field: [] for field in FILTER_FIELDS}
+        for position, r in enumerate(rows):
+            for field in FILTER_FIELDS:
+                values = r[field] if field == 'tags' else [r[field]]
+                for value in values:
+                    code = self.codes[field].setdefault(value, len(self.codes[field]))
+                    if code == len(bits[field]):
+                        bits[field].append([])
+                    bits[field][code].append(position)
+        self.bitmaps = {
+            field: [self._bitmap(positions, count) for positions in per_code]
+            for field, per_code in bits.items()
+        }
+
+        # Rows are stored newest first; other sort keys get a rank per row
+        self.ranks = {'created_at': None}
+        self.orders = {'created_at': array('l', range(count))}
+        for sort_key in ('rating', 'views'):
+            self._rank(sort_key, sorted(range(count), key=lambda p: self._sort_key(sort_key, rows[p])))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _sort_key(sort_key, record):
+        return -record[sort_key], -record['created_at'], -record['id']
+
+    def _rank(self, sort_key, order):
+        rank = array('l', [0]) * len(order)
+        for index, position in enumerate(order):
+            rank[position] = index
+        self.orders[sort_key] = array('l', order)
+        self.ranks[sort_key] = rank
+
+    def can_patch(self, changed):
+        """Whether ``changed`` only edits rows in place, without moving them"""
+        return all(
+            content_id in self.position_of and record['created_at'] == self.records[content_id]['created_at']
+            for content_id, record in changed.items()
+        )
+
+    def patched(self, changed, version):
+        """Return a copy with the edited ``changed`` records patched in"""
+        snapshot = copy.copy(self)
+        snapshot.version = version
+        snapshot.records = dict(self.records)
+        snapshot.records.update(changed)
+        snapshot.payloads = list(self.payloads)
+        snapshot.codes = {field: dict(codes) for field, codes in self.codes.items()}
+        snapshot.bitmaps = {field: list(bitmaps) for field, bitmaps in self.bitmaps.items()}
+        snapshot.orders = dict(self.orders)
+        snapshot.ranks = dict(self.ranks)
+
+        for content_id, record in changed.items():
+            position = self.position_of[content_id]
+            bit = 1 << position
+            old = self.records[content_id]
+            snapshot.payloads[position] = record['payload']
+            for field in FILTER_FIELDS:
+                old_values = set(old[field]) if field == 'tags' else {old[field]}
+                new_values = set(record[field]) if field == 'tags' else {record[field]}
+                bitmaps = snapshot.bitmaps[field]
+                for value in old_values - new_values:
+                    bitmaps[snapshot.codes[field][value]] &= ~bit
+                for value in new_values - old_values:
+                    code = snapshot.codes[field].setdefault(value, len(bitmaps))
+                    if code == len(bitmaps):
+                        bitmaps.append(0)
+                    bitmaps[code] |= bit
+
+        # Move the re-sorted rows within the orders they changed position in
+        for sort_key in ('rating', 'views'):
+            moved = {self.position_of[i] for i, r in changed.items() if r[sort_key] != self.records[i][sort_key]}
+            if not moved:
+                continue
+            record_at = lambda p: snapshot.records[snapshot.ids[p]]
+            order = [p for p in self.orders[sort_key] if p not in moved]
+            keys = [self._sort_key(sort_key, record_at(p)) for p in order]
+            for position in moved:
+                key = self._sort_key(sort_key, record_at(position))
+                index = bisect.bisect_left(keys, key)
+                keys.insert(index, key)
+                order.insert(index, position)
+            snapshot._rank(sort_key, order)
+        return snapshot
+
+    @staticmethod
+    def _bitmap(positions, count):
+        data = bytearray((count + 7) // 8)
+        for position in positions:
+            data[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(data, 'little')
+
+    @staticmethod
+    def _positions(mask):
+        """Yield the set bit positions of ``mask`` in ascending order"""
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        for index, byte in enumerate(data):
+            if byte:
+                base = index * 8
+                for bit in _BYTE_BITS[byte]:
+                    yield base + bit
+
+    def query(self, filters, sort_by='created_at', page=1, per_page=20):
+        """Return (payloads, total) for a filtered, sorted page"""
+        mask = self.all_rows
+        for field, value in filters.items():
+            code = self.codes[field].get(value)
+            mask &= self.bitmaps[field][code] if code is not None else 0
+            if not mask:
+                return [], 0
+
+        total = bin(mask).count('1')
+        offset = max(page - 1, 0) * per_page
+        ranks = self.ranks.get(sort_by)
+        if mask == self.all_rows:
+            positions = self.orders.get(sort_by, self.orders['created_at'])[offset:offset + per_page]
+        elif ranks is None:
+            positions = []
+            for index, position in enumerate(self._positions(mask)):
+                if index >= offset + per_page:
+                    break
+                if index >= offset:
+                    positions.append(position)
+        else:
+            positions = heapq.nsmallest(offset + per_page, self._positions(mask), key=ranks.__getitem__)[offset:]
+        return [self.payloads[position] for position in positions], total
+
+
+class CatalogEngine:
+    """Holds the current snapshot and refreshes it incrementally.
+
+    Enabled with ``CATALOG_SNAPSHOT_ENABLED``. ``CATALOG_SNAPSHOT_TTL`` bounds
+    how stale the snapshot may get for writes made by other worker processes.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._pending = set()
+        self._checked_at = 0
+        self._fingerprint = None
+        self._lock = threading.Lock()  # Guards the fields above; never held across I/O
+        self._build_lock = threading.Lock()  # One refresh at a time
+
+    @property
+    def enabled(self):
+        return current_app.config.get('CATALOG_SNAPSHOT_ENABLED', False)
+
+    def invalidate(self, content_id):
+        """Queue a content item for refresh on the next read"""
+        with self._lock:
+            self._pending.add(content_id)
+
+    def _fingerprint_now(self):
+        return tuple(db.session.query(func.count(Content.id), func.max(Content.updated_at)).filter(
+            Content.is_published == True
+        ).one())
+
+    def _stale(self):
+        return time.monotonic() - self._checked_at > current_app.config.get('CATALOG_SNAPSHOT_TTL', 60)
+
+    def snapshot(self):
+        """Return an up-to-date snapshot, refreshing it if needed.
+
+        While another thread refreshes, readers get the current snapshot
+        instead of waiting; only the very first load makes them wait.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._pending and not self._stale():
+                return snapshot
+        if not self._build_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            return self._refresh()
+        finally:
+            self._build_lock.release()
+
+    def _refresh(self):
+        with self._lock:
+            snapshot = self._snapshot
+            check = snapshot is None or self._stale()
+            if not check and not self._pending:
+                return snapshot  # Refreshed while we waited for the build lock
+            pending, self._pending = self._pending, set()
+
+        try:
+            fingerprint = self._fingerprint
+            if check:
+                fingerprint = self._fingerprint_now()
+                if snapshot is None or fingerprint != self._fingerprint:
+                    records = {content.id: _record(content) for content in _load(
+                        Content.query.filter_by(is_published=True)
+                    )}
+                    snapshot = CatalogSnapshot(records, (snapshot.version + 1) if snapshot else 1)
+                    pending = set()
+            if pending:
+                changed = {content.id: _record(content) for content in _load(
+                    Content.query.filter(Content.id.in_(pending), Content.is_published == True)
+                )}
+                if len(changed) == len(pending) and snapshot.can_patch(changed):
+                    snapshot = snapshot.patched(changed, snapshot.version + 1)
+                else:
+                    records = dict(snapshot.records)
+                    for content_id in pending:
+                        records.pop(content_id, None)
+                    records.update(changed)
+                    snapshot = CatalogSnapshot(records, snapshot.version + 1)
+        except Exception:
+            with self._lock:
+                self._pending |= pending
+            raise
+
+        # Readers holding the old snapshot keep using it undisturbed
+        with self._lock:
+            if check:
+                self._fingerprint = fingerprint
+                self._checked_at = time.monotonic()
+            self._snapshot = snapshot
+        return snapshot
@@ -0,0 +1,75 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'application/javascript',
+}
+
+
+class Compressor:
+    """Compresses eligible responses with brotli or gzip.
+
+    Only buffered responses of a compressible type and at least
+    ``COMPRESS_MIN_SIZE`` bytes are compressed; streamed responses (exports,
+    SSE) and file responses pass through untouched.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', COMPRESSIBLE_MIMETYPES))
+        app.after_request(self.after_request)
+        app.extensions['compressor'] = self
+
+    def _choose_encoding(self, accept_encodings):
+        if brotli is not None and accept_encodings['br'] and accept_encodings['br'] >= accept_encodings['gzip']:
+            return 'br'
+        if accept_encodings['gzip']:
+            return 'gzip'
+        return None
+
+    def after_request(self, response):
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in self.mimetypes
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self._choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=self.gzip_level)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(compressed))
+        return response
@@ -0,0 +1,97 @@
+import atexit
+import os
+import threading
+from collections import defaultdict
+from flask import current_app
+from app import db
+
+
+class CounterBuffer:
+    """Buffers counter increments in memory and applies them in batches.
+
+    Increments are flushed by a daemon thread every ``flush_interval``
+    seconds, or sooner once ``max_pending`` keys are waiting. A flush issues
+    one atomic ``UPDATE ... SET col = col + n`` per distinct increment size
+    on its own connection, so request handlers never commit for a counter
+    and concurrent increments are never lost. ``updated_at`` is left
+    untouched since counters are not content edits.
+    """
+
+    def __init__(self, model, column, flush_interval=5, max_pending=1000):
+        self.model = model
+        self.column = column
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._app = None
+        self._pid = None
+
+    def incr(self, key, amount=1):
+        """Add ``amount`` to the counter of the row with primary key ``key``"""
+        self._ensure_flusher()
+        with self._lock:
+            self._pending[key] += amount
+            if len(self._pending) >= self.max_pending:
+                self._wakeup.set()
+
+    def pending(self, key):
+        """Increments for ``key`` that have not been written yet"""
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def flush(self):
+        """Write all buffered increments to the database"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        if not pending:
+            return
+
+        by_amount = defaultdict(list)
+        for key, amount in pending.items():
+            by_amount[amount].append(key)
+
+        table = self.model.__table__
+        column = table.c[self.column]
+        try:
+            with db.engine.begin() as conn:
+                for amount, keys in by_amount.items():
+                    values = {self.column: column + amount}
+                    if 'updated_at' in table.c:
+                        values['updated_at'] = table.c.updated_at
+                    conn.execute(table.update().where(table.c.id.in_(keys)).values(**values))
+        except Exception:
+            # Put the increments back so they are retried on the next flush
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            raise
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._app = current_app._get_current_object()
+            self._pid = os.getpid()
+            thread = threading.Thread(target=self._run, name=f'{self.column}-flusher', daemon=True)
+            thread.start()
+            atexit.register(self._flush_at_exit)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    self._app.logger.exception('Failed to flush %s counters', self.column)
+
+    def _flush_at_exit(self):
+        if self._pid == os.getpid():
+            with self._app.app_context():
+                self.flush()
@@ -0,0 +1,299 @@
+"""Soft deletion of users and content with a batched background purge.
+
+Deleting only stamps ``deleted_at`` (see ``SoftDeleteMixin``), which hides
+the row from every query at once, and takes the row out of the instructor
+counters, the prerequisite graph and the notes index. The ``purge_user`` and
+``purge_content`` jobs then remove the dependent rows with set-based
+``DELETE ... WHERE id IN (...)`` statements of ``batch_size`` rows, committing
+after each batch so no transaction holds locks on a popular course for long,
+and repair the rating and enrollment aggregates the removed rows fed into.
+
+A deleted content item's instructor counters are settled in the deleting
+transaction itself; its reviews and enrollments then sit under a hidden
+parent that nothing counts. A deleted user is different: until the purge
+removes them, their reviews, helpful votes and enrollments still count in
+content ratings, helpful counts and instructor totals, and the purge takes
+each one out as it deletes it.
+
+Every batch deletes with ``RETURNING`` (or, where the dialect has none, locks
+its rows with ``SKIP LOCKED`` first) and adjusts aggregates only for the rows
+it actually removed. A purge may therefore stop after any batch, crash
+included, or race another run of itself (a retried job, a ``purge_deleted``
+sweep) and still account for every row exactly once. The hidden parent row
+is deleted last, so ``purge_deleted`` finds unfinished purges too.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import delete, or_, select, tuple_, update
+from app import db
+from app.models.archive import ArchivedRecord
+from app.models.analytics import ContentDailyMetrics, ProgressRollupState
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.instructor_stats import InstructorStats
+from app.models.learning_path import ContentPrerequisite, ContentPrerequisiteClosure
+from app.models.media import MediaAsset
+from app.models.progress import Progress
+from app.models.quiz import QuizAttempt, QuizQuestion
+from app.models.review import Review, ReviewVote
+from app.models.revision import ContentRevision, ContentSnapshot
+from app.models.tag import content_tags
+from app.models.user import User
+from app.utils.instructor_stats import adjust_instructor_stats, review_totals
+from app.utils.learning_paths import detach_content
+from app.utils.notes_search import unindex_content, unindex_user
+from app.utils.versioning import unpublish
+
+BATCH_SIZE = 1000
+
+
+def soft_delete_content(content):
+    """Hide a content item and take it out of the derived data. The caller commits."""
+    rating_sum, rating_count = review_totals(content.id)
+    adjust_instructor_stats(
+        content.instructor_id,
+        content_count=-1,
+        published_content_count=-1 if content.is_published else 0,
+        total_enrollments=-content.enrollments.count() - content.archived_records.filter_by(kind='enrollment').count(),
+        rating_sum=-rating_sum,
+        rating_count=-rating_count
+    )
+    if content.is_published:
+        unpublish(content)
+    detach_content(content.id)
+    unindex_content(content.id)
+    content.soft_delete()
+
+
+def soft_delete_user(user):
+    """Hide a user along with the content they created. The caller commits.
+
+    Returns the ids of the hidden content items.
+    """
+    content_ids = []
+    for content in user.created_content.all():
+        soft_delete_content(content)
+        content_ids.append(content.id)
+    user.is_active = False
+    user.soft_delete()
+    return content_ids
+
+
+def _delete_rows(model, *criteria, batch_size=BATCH_SIZE):
+    """Delete matching rows ``batch_size`` at a time, committing after each batch"""
+    # User-partitioned tables key their rows on (id, user_id)
+    keys = (model.id, model.user_id) if hasattr(model, 'for_user') else (model.id,)
+    deleted = 0
+    while True:
+        rows = db.session.query(*keys).filter(*criteria).limit(batch_size).all()
+        if not rows:
+            return deleted
+        key = tuple_(*keys).in_(rows) if len(keys) > 1 else keys[0].in_([row[0] for row in rows])
+        db.session.execute(delete(model).where(key).execution_options(synchronize_session=False))
+        db.session.commit()
+        deleted += len(rows)
+
+
+def _claim(query):
+    """Read a batch, locking it where the dialect cannot return deleted rows"""
+    if not db.engine.dialect.delete_returning:
+        query = query.with_for_update(skip_locked=True)
+    return query.all()
+
+
+def _delete_returning(statement, rows, *columns):
+    """Execute ``statement``, returning ``columns`` of the rows it removed.
+
+    With ``RETURNING`` a row deleted by a concurrent purge is not reported
+    here; otherwise ``_claim`` locked ``rows``, which are then all ours.
+    """
+    statement = statement.execution_options(synchronize_session=False)
+    if db.engine.dialect.delete_returning:
+        return db.session.execute(statement.returning(*columns)).all()
+    db.session.execute(statement)
+    return [tuple(getattr(row, column.key) for column in columns) for row in rows]
+
+
+def _instructors(content_ids):
+    """Instructor of each live content item; deleted ones were already taken out of the counters"""
+    return dict(db.session.query(Content.id, Content.instructor_id).filter(Content.id.in_(set(content_ids))).all())
+
+
+def _deleted(model, row_id):
+    """A soft-deleted row that has not been purged yet, else None"""
+    row = model.query.execution_options(include_deleted=True).filter(model.id == row_id).first()
+    return row if row is not None and row.is_deleted else None
+
+
+def purge_content(content_id, batch_size=BATCH_SIZE):
+    """Remove a soft-deleted content item and everything hanging off it.
+
+    Returns False if the item is gone or not deleted.
+    """
+    if _deleted(Content, content_id) is None:
+        return False
+
+    reviews = select(Review.id).where(Review.content_id == content_id)
+    _delete_rows(ReviewVote, ReviewVote.review_id.in_(reviews), batch_size=batch_size)
+    for model in (Review, Enrollment, Progress, QuizAttempt, QuizQuestion, ContentRevision, ArchivedRecord):
+        _delete_rows(model, model.content_id == content_id, batch_size=batch_size)
+
+    # What is left is small per item, so it goes in one statement each
+    db.session.execute(delete(ContentSnapshot).where(ContentSnapshot.content_id == content_id))
+    db.session.execute(delete(ContentDailyMetrics).where(ContentDailyMetrics.content_id == content_id))
+    db.session.execute(delete(ProgressRollupState).where(ProgressRollupState.content_id == content_id))
+    db.session.execute(delete(content_tags).where(content_tags.c.content_id == content_id))
+    db.session.execute(delete(ContentPrerequisite).where(or_(
+        ContentPrerequisite.content_id == content_id, ContentPrerequisite.prerequisite_id == content_id
+    )))
+    db.session.execute(delete(ContentPrerequisiteClosure).where(or_(
+        ContentPrerequisiteClosure.ancestor_id == content_id, ContentPrerequisiteClosure.descendant_id == content_id
+    )))
+    # Uploads stay with their uploader
+    db.session.execute(update(MediaAsset).where(MediaAsset.content_id == content_id).values(content_id=None))
+    db.session.execute(delete(Content).where(Content.id == content_id).execution_options(synchronize_session=False))
+    db.session.commit()
+    return True
+
+
+def _purge_reviews(user_id, batch_size):
+    """Delete a user's reviews and refresh the ratings they were part of"""
+    from app.jobs.tasks import refresh_content_rating
+    while True:
+        rows = _claim(db.session.query(Review.id, Review.content_id, Review.rating).filter(
+            Review.user_id == user_id
+        ).limit(batch_size))
+        if not rows:
+            return
+
+        ids = [row.id for row in rows]
+        db.session.execute(delete(ReviewVote).where(ReviewVote.review_id.in_(ids)))
+        deleted = _delete_returning(delete(Review).where(Review.id.in_(ids)), rows, Review.content_id, Review.rating)
+
+        instructors = _instructors(content_id for content_id, _ in deleted)
+        totals = defaultdict(lambda: [0, 0])
+        for content_id, rating in deleted:
+            if content_id in instructors:
+                totals[instructors[content_id]][0] += rating
+                totals[instructors[content_id]][1] += 1
+        for instructor_id, (rating_sum, rating_count) in totals.items():
+            adjust_instructor_stats(instructor_id, rating_sum=-rating_sum, rating_count=-rating_count)
+        # Enqueued with the batch, so a rerun after a crash misses no rating
+        for content_id in instructors:
+            refresh_content_rating.delay(content_id)
+        db.session.commit()
+
+
+def _purge_votes(user_id, batch_size):
+    """Delete a user's helpful votes and take them off the reviews' counts"""
+    while True:
+        rows = _claim(db.session.query(ReviewVote.id, ReviewVote.review_id).filter(
+            ReviewVote.user_id == user_id
+        ).limit(batch_size))
+        if not rows:
+            return
+        deleted = _delete_returning(
+            delete(ReviewVote).where(ReviewVote.id.in_([row.id for row in rows])), rows, ReviewVote.review_id
+        )
+        # One vote per user and review, so each review loses exactly one
+        if deleted:
+            db.session.execute(update(Review).where(Review.id.in_([review_id for (review_id,) in deleted])).values(
+                helpful_count=Review.helpful_count - 1,
+                updated_at=Review.updated_at
+            ).execution_options(synchronize_session=False))
+        db.session.commit()
+
+
+def _purge_enrollments(user_id, batch_size):
+    """Delete a user's live and archived enrollments, off their instructors' totals"""
+    while True:
+        rows = _claim(Enrollment.for_user(user_id).with_entities(Enrollment.id, Enrollment.content_id).limit(batch_size))
+        archived = not rows
+        if archived:
+            rows = _claim(db.session.query(ArchivedRecord.id, ArchivedRecord.content_id).filter(
+                ArchivedRecord.user_id == user_id, ArchivedRecord.kind == 'enrollment'
+            ).limit(batch_size))
+            if not rows:
+                return
+
+        model = ArchivedRecord if archived else Enrollment
+        criteria = [model.id.in_([row.id for row in rows])]
+        if not archived:
+            criteria.append(Enrollment.user_id == user_id)
+        deleted = _delete_returning(delete(model).where(*criteria), rows, model.content_id)
+
+        instructors = _instructors(content_id for (content_id,) in deleted)
+        counts = Counter(instructors[content_id] for (content_id,) in deleted if content_id in instructors)
+        for instructor_id, count in counts.items():
+            adjust_instructor_stats(instructor_id, total_enrollments=-count)
+        db.session.commit()
+
+
+def _purge_uploads(user_id, batch_size):
+    """Delete a user's media assets and the files no other asset shares"""
+    from app.utils.media import remove_files
+    while True:
+        rows = db.session.query(MediaAsset.id, MediaAsset.storage_path).filter(
+            MediaAsset.uploader_id == user_id
+        ).limit(batch_size).all()
+        if not rows:
+            return
+        ids = [row.id for row in rows]
+        # Later uploads deduplicated against these ones keep the shared files
+        db.session.execute(update(MediaAsset).where(MediaAsset.duplicate_of_id.in_(ids)).values(duplicate_of_id=None))
+        db.session.execute(delete(MediaAsset).where(MediaAsset.id.in_(ids)).execution_options(synchronize_session=False))
+        db.session.commit()
+
+        paths = {row.storage_path for row in rows}
+        shared = {path for (path,) in db.session.query(MediaAsset.storage_path).filter(MediaAsset.storage_path.in_(paths))}
+        for path in paths - shared:
+            remove_files(path)
+
+
+def purge_user(user_id, batch_size=BATCH_SIZE):
+    """Remove a soft-deleted user and everything they left behind.
+
+    Returns False if the user is gone or not deleted.
+    """
+    if _deleted(User, user_id) is None:
+        return False
+
+    for (content_id,) in db.session.query(Content.id).execution_options(include_deleted=True).filter(
+        Content.instructor_id == user_id
+    ).all():
+        purge_content(content_id, batch_size=batch_size)
+
+    _purge_reviews(user_id, batch_size)
+    _purge_votes(user_id, batch_size)
+    _purge_enrollments(user_id, batch_size)
+    _delete_rows(Progress, Progress.user_id == user_id, batch_size=batch_size)
+    _delete_rows(ArchivedRecord, ArchivedRecord.user_id == user_id, batch_size=batch_size)
+    _delete_rows(QuizAttempt, QuizAttempt.user_id == user_id, batch_size=batch_size)
+    _purge_uploads(user_id, batch_size)
+
+    unindex_user(user_id)
+    db.session.execute(delete(ProgressRollupState).where(ProgressRollupState.user_id == user_id))
+    # Revisions they wrote on other instructors' content stay, unattributed
+    db.session.execute(update(ContentRevision).where(ContentRevision.author_id == user_id).values(author_id=None))
+    db.session.execute(delete(InstructorStats).where(InstructorStats.instructor_id == user_id))
+    db.session.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    db.session.commit()
+    return True
+
+
+def purge_deleted(before=None, batch_size=BATCH_SIZE):
+    """Purge every row soft-deleted before ``before``; a sweep for missed jobs.
+
+    Returns (users, content items) purged.
+    """
+    before = before or datetime.utcnow()
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).execution_options(include_deleted=True).filter(
+        User.deleted_at < before
+    )]
+    users = sum(purge_user(user_id, batch_size=batch_size) for user_id in user_ids)
+    content_ids = [content_id for (content_id,) in db.session.query(Content.id).execution_options(include_deleted=True).filter(
+        Content.deleted_at < before
+    )]
+    content = sum(purge_content(content_id, batch_size=batch_size) for content_id in content_ids)
+    return users, content
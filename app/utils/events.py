@@ -0,0 +1,111 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from werkzeug.utils import import_string
+
+
+class Subscription:
+    """Bounded, coalescing queue of events for one subscriber.
+
+    Events published with the same ``coalesce_key`` replace the one still
+    waiting in the queue, so a burst of progress updates is delivered as its
+    latest state. When the queue is full the oldest event is dropped rather
+    than blocking publishers.
+    """
+
+    def __init__(self, channels, max_size):
+        self.channels = channels
+        self.max_size = max_size
+        self.dropped = 0
+        self._events = OrderedDict()
+        self._condition = threading.Condition()
+
+    def put(self, event):
+        key = event.get('coalesce_key') or uuid.uuid4().hex
+        with self._condition:
+            if key not in self._events and len(self._events) >= self.max_size:
+                self._events.popitem(last=False)
+                self.dropped += 1
+            self._events[key] = event
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Return the next event, or None if none arrived within ``timeout``"""
+        with self._condition:
+            if not self._events:
+                self._condition.wait(timeout)
+            if not self._events:
+                return None
+            return self._events.popitem(last=False)[1]
+
+
+class LocalTransport:
+    """In-process transport; a stand-in for a cross-worker broker.
+
+    A transport moves published messages to every worker process. Alternative
+    implementations (e.g. Redis pub/sub) provide the same two methods and are
+    selected with ``EVENT_BUS_TRANSPORT``.
+    """
+
+    def __init__(self, app=None):
+        self._deliver = None
+
+    def start(self, deliver):
+        """Call ``deliver(message)`` for every message published by any worker"""
+        self._deliver = deliver
+
+    def publish(self, message):
+        if self._deliver:
+            self._deliver(message)
+
+
+class EventBus:
+    """Publish/subscribe bus feeding the Server-Sent Events endpoints"""
+
+    def __init__(self, app=None):
+        self.transport = None
+        self.max_queue_size = 100
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_queue_size = app.config.get('EVENT_QUEUE_SIZE', 100)
+        transport_class = import_string(app.config.get('EVENT_BUS_TRANSPORT', 'app.utils.events.LocalTransport'))
+        self.transport = transport_class(app)
+        self.transport.start(self._deliver)
+        app.extensions['event_bus'] = self
+
+    def publish(self, channels, event_type, data, coalesce_key=None):
+        """Publish an event to one or more channels, e.g. ``user:1``, ``content:2``"""
+        self.transport.publish({
+            'channels': list(channels),
+            'type': event_type,
+            'data': data,
+            'coalesce_key': coalesce_key,
+            'published_at': time.time(),
+        })
+
+    def subscribe(self, *channels):
+        subscription = Subscription(channels, self.max_queue_size)
+        with self._lock:
+            for channel in channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].discard(subscription)
+                if not self._subscriptions[channel]:
+                    del self._subscriptions[channel]
+
+    def _deliver(self, message):
+        with self._lock:
+            subscriptions = set()
+            for channel in message['channels']:
+                subscriptions.update(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(message)
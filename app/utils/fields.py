@@ -0,0 +1,13 @@
+def parse_fields(value):
+    """Parse a ``?fields=id,title`` argument into a set of field names"""
+    if not value:
+        return None
+    fields = {field.strip() for field in value.split(',') if field.strip()}
+    return fields or None
+
+
+def select_fields(data, fields):
+    """Keep only the requested top-level keys of a serialized item"""
+    if not fields:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
@@ -0,0 +1,58 @@
+import hashlib
+from datetime import timezone
+from flask import current_app, make_response, request
+
+# Cache-Control per resource; override entries with the CACHE_POLICIES config dict
+DEFAULT_CACHE_POLICIES = {
+    'content': 'public, max-age=60, stale-while-revalidate=300',
+    'content_list': 'public, max-age=30, stale-while-revalidate=120',
+    'category': 'public, max-age=300, stale-while-revalidate=3600',
+    'category_list': 'public, max-age=300, stale-while-revalidate=3600',
+    'user': 'private, no-cache',
+    'draft': 'private, no-store',
+}
+
+
+def cache_policy(name):
+    """Return the Cache-Control value for a named policy"""
+    policies = {**DEFAULT_CACHE_POLICIES, **current_app.config.get('CACHE_POLICIES', {})}
+    return policies[name]
+
+
+def weak_etag(*parts):
+    """Build a weak ETag value (without quotes) from version-like parts"""
+    return hashlib.sha1(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:20]
+
+
+def _as_utc(value):
+    return value.replace(tzinfo=timezone.utc, microsecond=0) if value else None
+
+
+def not_modified(etag=None, last_modified=None, policy=None):
+    """Return a 304 response if the request's validators still match, else None.
+
+    Call this with cheaply obtained validators (e.g. a single ``updated_at``
+    column) before loading and serializing the full resource.
+    """
+    if request.if_none_match:
+        matched = etag is not None and request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matched = _as_utc(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return with_cache_headers(make_response('', 304), etag, last_modified, policy)
+
+
+def with_cache_headers(response, etag=None, last_modified=None, policy=None):
+    """Attach validators and Cache-Control to a response"""
+    response = make_response(response)
+    if etag:
+        response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    if policy:
+        response.headers['Cache-Control'] = cache_policy(policy)
+    return response
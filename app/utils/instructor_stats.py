@@ -0,0 +1,120 @@
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import db
+from app.models.archive import ArchivedRecord
+from app.models.instructor_stats import InstructorStats
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.review import Review
+from app.models.user import User, UserRole
+
+
+def adjust_instructor_stats(instructor_id, **deltas):
+    """Apply counter deltas to an instructor's stats in the current transaction.
+
+    Uses ``col = col + delta`` so concurrent writers never lose updates. The
+    row is created on first use, seeded from the instructor's committed
+    source rows so counting starts from their full history, not from zero.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not instructor_id or not deltas:
+        return
+
+    values = {name: getattr(InstructorStats, name) + delta for name, delta in deltas.items()}
+    statement = update(InstructorStats).where(InstructorStats.instructor_id == instructor_id).values(**values)
+    if db.session.execute(statement).rowcount:
+        return
+
+    # A separate session sees only committed rows, so this transaction's
+    # changes are counted once, through ``deltas``
+    with Session(db.engine) as committed:
+        seed = instructor_totals(committed, instructor_id).get(instructor_id, dict.fromkeys(InstructorStats.COUNTERS, 0))
+    try:
+        with db.session.begin_nested():
+            db.session.add(InstructorStats(
+                instructor_id=instructor_id,
+                **{name: max(seed[name] + deltas.get(name, 0), 0) for name in InstructorStats.COUNTERS}
+            ))
+    except IntegrityError:
+        # Another request created the row first
+        db.session.execute(statement)
+
+
+def review_totals(content_id):
+    """Return (rating_sum, rating_count) for a content item's reviews"""
+    rating_sum, rating_count = db.session.query(
+        func.coalesce(func.sum(Review.rating), 0),
+        func.count(Review.id)
+    ).filter(Review.content_id == content_id).one()
+    return int(rating_sum), rating_count
+
+
+def instructor_totals(session, instructor_id=None):
+    """Counters recomputed from the source tables, per instructor with content.
+
+    Limited to one instructor when ``instructor_id`` is given.
+    """
+    totals = {}
+
+    def bucket(instructor_id):
+        return totals.setdefault(instructor_id, dict.fromkeys(InstructorStats.COUNTERS, 0))
+
+    # Evaluated now: the loops below reuse the name ``instructor_id``
+    criteria = [Content.instructor_id == instructor_id] if instructor_id is not None else []
+
+    def scoped(query):
+        return query.filter(*criteria)
+
+    content_rows = scoped(session.query(
+        Content.instructor_id,
+        func.count(Content.id),
+        func.sum(db.case((Content.is_published.is_(True), 1), else_=0))
+    )).group_by(Content.instructor_id)
+    for instructor_id, content_count, published_count in content_rows:
+        bucket(instructor_id).update(content_count=content_count, published_content_count=int(published_count or 0))
+
+    enrollment_rows = scoped(session.query(Content.instructor_id, func.count(Enrollment.id)).join(
+        Enrollment, Enrollment.content_id == Content.id
+    )).group_by(Content.instructor_id)
+    for instructor_id, total_enrollments in enrollment_rows:
+        bucket(instructor_id)['total_enrollments'] = total_enrollments
+    
+    # Archived enrollments still count towards an instructor's total
+    archived_rows = scoped(session.query(Content.instructor_id, func.count(ArchivedRecord.id)).join(
+        ArchivedRecord, ArchivedRecord.content_id == Content.id
+    ).filter(ArchivedRecord.kind == 'enrollment')).group_by(Content.instructor_id)
+    for instructor_id, archived_enrollments in archived_rows:
+        bucket(instructor_id)['total_enrollments'] += archived_enrollments
+
+    review_rows = scoped(session.query(
+        Content.instructor_id, func.sum(Review.rating), func.count(Review.id)
+    ).join(Review, Review.content_id == Content.id)).group_by(Content.instructor_id)
+    for instructor_id, rating_sum, rating_count in review_rows:
+        bucket(instructor_id).update(rating_sum=int(rating_sum or 0), rating_count=rating_count)
+    return totals
+
+
+def reconcile_instructor_stats():
+    """Recompute every instructor's counters from the source tables. The caller commits."""
+    totals = instructor_totals(db.session)
+
+    # Instructors without any content still get a zeroed row
+    for (instructor_id,) in db.session.query(User.id).filter(User.role == UserRole.INSTRUCTOR):
+        totals.setdefault(instructor_id, dict.fromkeys(InstructorStats.COUNTERS, 0))
+
+    existing = {stats.instructor_id: stats for stats in InstructorStats.query.all()}
+    changed = 0
+    for instructor_id, counters in totals.items():
+        stats = existing.pop(instructor_id, None)
+        if stats is None:
+            db.session.add(InstructorStats(instructor_id=instructor_id, **counters))
+            changed += 1
+        elif any(getattr(stats, name) != value for name, value in counters.items()):
+            for name, value in counters.items():
+                setattr(stats, name, value)
+            changed += 1
+    for stats in existing.values():
+        db.session.delete(stats)
+        changed += 1
+    return changed
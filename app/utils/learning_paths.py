@@ -0,0 +1,185 @@
+"""Prerequisite graph between content items.
+
+Edges live in ``content_prerequisites``; ``content_prerequisite_closure``
+holds every (ancestor, descendant) pair with the number of distinct paths
+between them, maintained on each edge change. Reachability and cycle
+checks are then single lookups, and a topological order falls out of the
+ancestor counts: in a DAG every ancestor of a node has strictly fewer
+ancestors than the node itself.
+
+An edge change reads the ancestors and descendants around it and rewrites
+closure rows any other change may touch too, so edge changes are
+serialized by ``_lock_graph`` before they check anything.
+"""
+
+from collections import defaultdict
+from sqlalchemy import delete, func, insert, or_, select, text, union, update
+from app import db
+from app.models.archive import ArchivedRecord
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.learning_path import ContentPrerequisite, ContentPrerequisiteClosure as Closure
+
+
+# Key of the PostgreSQL advisory lock guarding the prerequisite graph
+GRAPH_LOCK_KEY = 0x70726571  # 'preq'
+
+
+class PrerequisiteCycle(ValueError):
+    """Adding the edge would make the graph cyclic"""
+
+
+def _lock_graph(*content_ids):
+    """Hold the graph until the transaction ends, so edge changes run one at a time"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': GRAPH_LOCK_KEY})
+        return
+    # Elsewhere a no-op write: row locks where there are any, the database
+    # write lock on SQLite (whose SELECT ... FOR UPDATE locks nothing)
+    db.session.execute(update(Content).where(Content.id.in_(content_ids)).values(
+        id=Content.id, updated_at=Content.updated_at
+    ).execution_options(synchronize_session=False))
+
+
+def is_ancestor(ancestor_id, descendant_id):
+    return db.session.query(Closure.path_count).filter_by(
+        ancestor_id=ancestor_id, descendant_id=descendant_id
+    ).first() is not None
+
+
+def _ancestors(content_id):
+    paths = dict(db.session.query(Closure.ancestor_id, Closure.path_count).filter_by(descendant_id=content_id).all())
+    paths[content_id] = 1
+    return paths
+
+
+def _descendants(content_id):
+    paths = dict(db.session.query(Closure.descendant_id, Closure.path_count).filter_by(ancestor_id=content_id).all())
+    paths[content_id] = 1
+    return paths
+
+
+def _apply_edge(prerequisite_id, content_id, sign):
+    """Add (sign=1) or remove (sign=-1) the paths running through one edge"""
+    ancestors = _ancestors(prerequisite_id)
+    descendants = _descendants(content_id)
+    rows = {
+        (row.ancestor_id, row.descendant_id): row
+        for row in Closure.query.filter(
+            Closure.ancestor_id.in_(list(ancestors)),
+            Closure.descendant_id.in_(list(descendants))
+        )
+    }
+    for ancestor_id, up in ancestors.items():
+        for descendant_id, down in descendants.items():
+            row = rows.get((ancestor_id, descendant_id))
+            change = sign * up * down
+            if row is None:
+                if change > 0:
+                    db.session.add(Closure(
+                        ancestor_id=ancestor_id, descendant_id=descendant_id, path_count=change
+                    ))
+            elif row.path_count + change <= 0:
+                db.session.delete(row)
+            else:
+                row.path_count += change
+
+
+def add_prerequisite(content_id, prerequisite_id):
+    """Make ``prerequisite_id`` required before ``content_id``. The caller commits."""
+    _lock_graph(content_id, prerequisite_id)
+    if content_id == prerequisite_id or is_ancestor(content_id, prerequisite_id):
+        raise PrerequisiteCycle(f'{content_id} is already a prerequisite of {prerequisite_id}')
+    db.session.add(ContentPrerequisite(content_id=content_id, prerequisite_id=prerequisite_id))
+    _apply_edge(prerequisite_id, content_id, 1)
+
+
+def remove_prerequisite(edge):
+    """Remove an edge. The caller commits."""
+    _lock_graph(edge.content_id, edge.prerequisite_id)
+    _apply_edge(edge.prerequisite_id, edge.content_id, -1)
+    db.session.delete(edge)
+
+
+def detach_content(content_id):
+    """Remove every edge touching a content item before it is deleted"""
+    for edge in ContentPrerequisite.query.filter(or_(
+        ContentPrerequisite.content_id == content_id,
+        ContentPrerequisite.prerequisite_id == content_id
+    )).all():
+        remove_prerequisite(edge)
+        db.session.flush()
+
+
+def rebuild_closure():
+    """Recompute the closure from the edges. The caller commits."""
+    parents = defaultdict(list)
+    for content_id, prerequisite_id in db.session.query(ContentPrerequisite.content_id, ContentPrerequisite.prerequisite_id):
+        parents[content_id].append(prerequisite_id)
+    
+    memo = {}
+    
+    def ancestors(node, visiting=()):
+        if node in memo:
+            return memo[node]
+        if node in visiting:
+            raise PrerequisiteCycle(f'Cycle through content {node}')
+        paths = defaultdict(int)
+        for parent in parents.get(node, ()):
+            paths[parent] += 1
+            for ancestor, count in ancestors(parent, visiting + (node,)).items():
+                paths[ancestor] += count
+        memo[node] = paths
+        return paths
+    
+    rows = [
+        {'ancestor_id': ancestor, 'descendant_id': node, 'path_count': count}
+        for node in list(parents) for ancestor, count in ancestors(node).items()
+    ]
+    db.session.execute(delete(Closure))
+    if rows:
+        db.session.execute(insert(Closure), rows)
+    return len(rows)
+
+
+def completed_content(user_id):
+    """Selectable of content ids the user has completed, archived ones included"""
+    return union(
+        select(Enrollment.content_id).where(Enrollment.user_id == user_id, Enrollment.is_completed == True),
+        select(ArchivedRecord.content_id).where(ArchivedRecord.user_id == user_id, ArchivedRecord.kind == 'enrollment')
+    )
+
+
+def path_to(target_id):
+    """Content ids leading to ``target_id`` (inclusive) in topological order"""
+    ancestor_counts = func.count(Closure.ancestor_id)
+    members = [row[0] for row in db.session.query(Closure.ancestor_id).filter_by(descendant_id=target_id)]
+    members.append(target_id)
+    order = dict(db.session.query(Closure.descendant_id, ancestor_counts).filter(
+        Closure.descendant_id.in_(members)
+    ).group_by(Closure.descendant_id).all())
+    return sorted(members, key=lambda node: (order.get(node, 0), node))
+
+
+def next_up(user_id, target_id=None, limit=20):
+    """Published items whose prerequisites the user has all completed.
+
+    Only items with at least one prerequisite are considered; items the
+    user has already completed are skipped. With ``target_id`` the result
+    is limited to the path leading to that item.
+    """
+    completed = completed_content(user_id)
+    edges = select(ContentPrerequisite.prerequisite_id).where(ContentPrerequisite.content_id == Content.id)
+    query = Content.query.filter(
+        Content.is_published == True,
+        edges.exists(),
+        ~edges.where(ContentPrerequisite.prerequisite_id.notin_(completed)).exists(),
+        Content.id.notin_(completed)
+    )
+    if target_id is not None:
+        query = query.filter(or_(
+            Content.id == target_id,
+            Content.id.in_(select(Closure.ancestor_id).where(Closure.descendant_id == target_id))
+        ))
+    return query.order_by(Content.id).limit(limit).all()
@@ -0,0 +1,314 @@
+"""Media ingestion and delivery.
+
+Uploads arrive as a series of chunks that are copied from the request stream
+straight to a file under ``MEDIA_ROOT``, so no request holds a whole file or
+blocks a worker for the full transfer. Completing an upload enqueues the
+``process_media`` job, which fans the CPU-heavy work out to a process pool:
+the SHA-256 used for deduplication and the metadata probe run side by side,
+then every thumbnail size is rendered in parallel.
+
+Pillow renders thumbnails and ``ffprobe``/``ffmpeg`` read audio/video
+metadata and grab a poster frame; both are optional and whatever they would
+produce is simply left out when they are missing.
+
+Streams are handed out as short-lived signed URLs once the viewer's
+enrollment has been checked. The signed token carries the file's path and
+type, so the seek-heavy range requests that follow never touch the
+database; the file itself goes out through ``sendfile`` (``send_file`` with
+``wsgi.file_wrapper``), or through the front server when
+``MEDIA_ACCEL_REDIRECT_PREFIX`` names an nginx internal location.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from flask import abort, current_app, send_file
+from sqlalchemy import select
+from itsdangerous import BadSignature, URLSafeSerializer
+from werkzeug.security import safe_join
+from app import db
+from app.models.media import MediaAsset, MediaStatus
+from app.utils.unit_of_work import on_commit
+from app.utils.versioning import content_state, reconstruct, record_revision
+
+# What a corrupt or unsupported file raises; it fails the same way on every retry
+DECODE_ERRORS = (subprocess.CalledProcessError, ValueError)
+
+try:
+    from PIL import Image, UnidentifiedImageError
+    DECODE_ERRORS += (UnidentifiedImageError,)
+except ImportError:  # Pillow is optional; thumbnails are skipped without it
+    Image = None
+
+COPY_BUFFER_SIZE = 1024 * 1024
+DEFAULT_THUMBNAIL_SIZES = (160, 320, 640)
+DEFAULT_ALLOWED_TYPES = ('video/', 'audio/', 'image/', 'application/pdf', 'application/epub+zip')
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def media_root():
+    return os.path.abspath(current_app.config.get('MEDIA_ROOT', 'uploads'))
+
+
+def absolute_path(relative_path):
+    return os.path.join(media_root(), relative_path)
+
+
+def new_storage_path(filename):
+    """Relative path for a new upload; the directory also holds its thumbnails"""
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    return os.path.join('media', uuid.uuid4().hex, 'original' + extension)
+
+
+def is_allowed_type(mime_type):
+    allowed = current_app.config.get('MEDIA_ALLOWED_TYPES', DEFAULT_ALLOWED_TYPES)
+    return bool(mime_type) and any(mime_type.startswith(prefix) for prefix in allowed)
+
+
+def write_chunk(path, offset, stream, length):
+    """Copy up to ``length`` bytes from ``stream`` into ``path`` at ``offset``.
+
+    Returns the number of bytes written, which is short if the client went
+    away mid-chunk; the next chunk then resumes from there.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+    return written
+
+
+def finish_upload(asset):
+    """Drop bytes past the declared size left by abandoned chunks"""
+    os.truncate(absolute_path(asset.storage_path), asset.size_bytes)
+
+
+def is_shared(asset):
+    """Whether another asset points at the same files (a deduplicated upload)"""
+    return db.session.query(MediaAsset.query.filter(
+        MediaAsset.storage_path == asset.storage_path,
+        MediaAsset.id != asset.id
+    ).exists()).scalar()
+
+
+def remove_files(storage_path):
+    shutil.rmtree(os.path.dirname(absolute_path(storage_path)), ignore_errors=True)
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='media-url')
+
+
+def signed_url(asset, user_id):
+    """Return (url, expires_at) of a signed link streaming ``asset``"""
+    expires_at = int(time.time()) + current_app.config.get('MEDIA_URL_TTL', 3600)
+    token = _serializer().dumps({'p': asset.storage_path, 'm': asset.mime_type, 'u': user_id, 'e': expires_at})
+    return f'/api/media/files/{token}', expires_at
+
+
+def read_token(token):
+    """Return the payload of a valid, unexpired token, else None"""
+    try:
+        payload = _serializer().loads(token)
+    except BadSignature:
+        return None
+    if payload.get('e', 0) < time.time():
+        return None
+    return payload
+
+
+def deliver(relative_path, mimetype, max_age, public=False):
+    """Respond with a stored file; Range and conditional requests are honoured"""
+    prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+    if prefix:
+        # nginx serves the internal location itself, ranges and sendfile included
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + relative_path.replace(os.sep, '/')
+    else:
+        path = safe_join(media_root(), relative_path)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = send_file(path, mimetype=mimetype, conditional=True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Cache-Control'] = f"{'public' if public else 'private'}, max-age={max(int(max_age), 0)}"
+    return response
+
+
+# Process pool workers; these only take and return plain values
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def probe(path, mime_type):
+    """Return (metadata, poster) where ``poster`` is an image to thumbnail, if any"""
+    metadata = {}
+    poster = None
+    kind = (mime_type or '').split('/')[0]
+
+    if kind == 'image' and Image is not None:
+        with Image.open(path) as image:
+            metadata.update(width=image.width, height=image.height, format=image.format)
+        poster = path
+    elif kind in ('video', 'audio') and shutil.which('ffprobe'):
+        output = subprocess.run(
+            ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, timeout=300, check=True
+        ).stdout
+        info = json.loads(output)
+        container = info.get('format', {})
+        if container.get('duration'):
+            metadata['duration_seconds'] = round(float(container['duration']), 3)
+        if container.get('bit_rate'):
+            metadata['bit_rate'] = int(container['bit_rate'])
+        metadata['format'] = container.get('format_name')
+        for stream in info.get('streams', []):
+            if stream.get('codec_type') == 'video' and 'video_codec' not in metadata:
+                metadata.update(width=stream.get('width'), height=stream.get('height'), video_codec=stream.get('codec_name'))
+            elif stream.get('codec_type') == 'audio' and 'audio_codec' not in metadata:
+                metadata['audio_codec'] = stream.get('codec_name')
+
+        if kind == 'video' and shutil.which('ffmpeg'):
+            poster = os.path.join(os.path.dirname(path), 'poster.jpg')
+            seek = min(metadata.get('duration_seconds', 0) / 10, 10)
+            subprocess.run(
+                ['ffmpeg', '-v', 'error', '-y', '-ss', str(seek), '-i', path, '-frames:v', '1', poster],
+                capture_output=True, timeout=300, check=True
+            )
+    return metadata, poster
+
+
+def render_thumbnail(source, width, destination):
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        image.thumbnail((width, max(1, image.height * width // image.width)))
+        image.save(destination, 'JPEG', quality=85, optimize=True)
+
+
+def _executor():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # Pools do not survive fork, so each worker process starts its own
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=current_app.config.get('MEDIA_PROCESS_WORKERS') or None)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _find_original(asset_id, sha256, size_bytes):
+    """Id of an earlier ready upload with the same bytes, read on its own connection"""
+    with db.engine.connect() as connection:
+        return connection.execute(select(MediaAsset.id).where(
+            MediaAsset.sha256 == sha256,
+            MediaAsset.size_bytes == size_bytes,
+            MediaAsset.status == MediaStatus.READY,
+            MediaAsset.duplicate_of_id.is_(None),
+            MediaAsset.id != asset_id
+        ).order_by(MediaAsset.id).limit(1)).scalar()
+
+
+def analyze(asset_id, storage_path, mime_type, size_bytes):
+    """Hash, probe and thumbnail an upload in the process pool.
+
+    Touches no session, so the caller holds no transaction while the pool
+    works. Returns a dict of results; a duplicate of an earlier upload only
+    gets ``sha256`` and ``original_id``.
+    """
+    pool = _executor()
+    path = absolute_path(storage_path)
+    digest = pool.submit(file_digest, path)
+    probed = pool.submit(probe, path, mime_type)
+
+    sha256 = digest.result()
+    original_id = _find_original(asset_id, sha256, size_bytes)
+    if original_id is not None:
+        if not probed.cancel():
+            probed.exception()
+        return {'sha256': sha256, 'original_id': original_id}
+
+    metadata, poster = probed.result()
+    thumbnails = {}
+    if poster and Image is not None:
+        directory = os.path.dirname(storage_path)
+        rendered = {
+            width: pool.submit(render_thumbnail, poster, width, absolute_path(os.path.join(directory, f'thumb_{width}.jpg')))
+            for width in current_app.config.get('MEDIA_THUMBNAIL_SIZES', DEFAULT_THUMBNAIL_SIZES)
+        }
+        for width, future in rendered.items():
+            future.result()
+            thumbnails[str(width)] = os.path.join(directory, f'thumb_{width}.jpg')
+    return {'sha256': sha256, 'original_id': None, 'metadata': metadata, 'thumbnails': thumbnails}
+
+
+def apply_analysis(asset, analysis):
+    """Write what ``analyze`` found onto the asset and its content. The caller commits."""
+    asset.sha256 = analysis['sha256']
+    if analysis['original_id'] is not None:
+        original = db.session.get(MediaAsset, analysis['original_id'])
+        if original is None or original.status != MediaStatus.READY:
+            raise RuntimeError(f'Original upload {analysis["original_id"]} went away; processing again')
+        # Same bytes as an earlier upload: share its files and results, and
+        # drop this upload's copy only once the asset no longer points at it
+        on_commit(partial(remove_files, asset.storage_path))
+        asset.duplicate_of_id = original.id
+        asset.storage_path = original.storage_path
+        asset.thumbnails = original.thumbnails
+        asset.metadata_json = original.metadata_json
+    else:
+        asset.metadata_json = analysis['metadata']
+        asset.thumbnails = analysis['thumbnails']
+
+    asset.status = MediaStatus.READY
+    asset.error = None
+    if asset.content is not None:
+        attach_to_content(asset.content, asset)
+
+
+def attach_to_content(content, asset):
+    """Carry what processing learned onto the asset's content.
+
+    Live content gets a draft revision for the instructor to publish;
+    content that is not published yet is updated in place. The caller
+    commits.
+    """
+    metadata = asset.metadata_json or {}
+    # Build on the latest draft, which is what the revision below applies to
+    current = reconstruct(content.id) or content_state(content)
+    changes = {
+        'metadata_json': dict(current.get('metadata_json') or {}, media=dict(
+            metadata, asset_id=asset.id, sha256=asset.sha256, mime_type=asset.mime_type, size_bytes=asset.size_bytes
+        ))
+    }
+    changes['content_url'] = f'/api/media/{asset.id}/url'
+    if asset.thumbnails:
+        largest = max(asset.thumbnails, key=int)
+        changes['thumbnail_url'] = f'/api/media/{asset.id}/thumbnails/{largest}'
+    if metadata.get('duration_seconds'):
+        changes['duration_minutes'] = max(1, round(metadata['duration_seconds'] / 60))
+
+    if content.is_published:
+        record_revision(content, changes, author_id=asset.uploader_id)
+        return
+    record_revision(content, changes, author_id=asset.uploader_id, base=content_state(content))
+    for field, value in changes.items():
+        setattr(content, field, value)
@@ -0,0 +1,177 @@
+"""Full-text index over ``Progress.notes``.
+
+SQLite uses an FTS5 table keyed by the progress row id; PostgreSQL a plain
+table with a ``tsvector`` column and a GIN index. Both are derived data,
+written in the same transaction as the notes they index and rebuilt from
+``progress`` by ``flask reindex-notes``. Each (user, content) pair has at
+most one entry, so results never repeat a content item.
+
+The structures are created by ``create_all``, the warm-up and ``flask
+reindex-notes``, each in a transaction of its own. Request transactions
+never run DDL: until the index exists, writes skip it and searches scan
+the notes instead.
+"""
+
+import re
+import threading
+from sqlalchemy import event, inspect, text
+from app import db
+from app.models.progress import Progress
+
+SQLITE_TABLE = 'progress_notes_fts'
+POSTGRES_TABLE = 'progress_notes_search'
+INDEX_TABLES = {'sqlite': SQLITE_TABLE, 'postgresql': POSTGRES_TABLE}
+SNIPPET_START, SNIPPET_END = '<mark>', '</mark>'
+
+_ready = set()
+_lock = threading.Lock()
+
+
+def _dialect(connection=None):
+    return (connection or db.session.connection()).dialect.name
+
+
+def create_notes_index(target=None, connection=None, **kw):
+    """Create the index structures; usable as an ``after_create`` hook"""
+    connection = connection or db.session.connection()
+    dialect = _dialect(connection)
+    if dialect == 'sqlite':
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+            f"notes, user_key, content_id UNINDEXED, tokenize='porter unicode61')"
+        ))
+    elif dialect == 'postgresql':
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+            f"user_id INTEGER NOT NULL, content_id INTEGER NOT NULL, notes TEXT NOT NULL, "
+            f"document TSVECTOR NOT NULL, PRIMARY KEY (user_id, content_id))"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_TABLE}_document ON {POSTGRES_TABLE} USING GIN (document)"
+        ))
+
+
+def ensure_notes_index():
+    """Create the index structures on a connection of their own and commit them"""
+    with _lock:
+        with db.engine.begin() as connection:
+            create_notes_index(connection=connection)
+            dialect = _dialect(connection)
+        _ready.add(dialect)
+    return dialect
+
+
+def _index_dialect():
+    """Dialect of the index, or None while its structures don't exist yet"""
+    connection = db.session.connection()
+    dialect = _dialect(connection)
+    if dialect not in _ready:
+        # Created elsewhere since: another process, or create_all in this one
+        if dialect not in INDEX_TABLES or not inspect(connection).has_table(INDEX_TABLES[dialect]):
+            return None
+        _ready.add(dialect)
+    return dialect
+
+
+def index_notes(progress):
+    """Add, replace or drop the index entry of a progress row. The caller commits."""
+    dialect = _index_dialect()
+    notes = (progress.notes or '').strip()
+    params = {'id': progress.id, 'user_id': progress.user_id, 'content_id': progress.content_id, 'notes': notes}
+    if dialect == 'sqlite':
+        db.session.execute(text(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = :id'), params)
+        if notes:
+            db.session.execute(text(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, notes, user_key, content_id) '
+                f"VALUES (:id, :notes, 'u' || :user_id, :content_id)"
+            ), params)
+    elif dialect == 'postgresql':
+        if notes:
+            db.session.execute(text(
+                f"INSERT INTO {POSTGRES_TABLE} (user_id, content_id, notes, document) "
+                f"VALUES (:user_id, :content_id, :notes, to_tsvector('english', :notes)) "
+                f"ON CONFLICT (user_id, content_id) DO UPDATE SET notes = EXCLUDED.notes, document = EXCLUDED.document"
+            ), params)
+        else:
+            db.session.execute(text(
+                f'DELETE FROM {POSTGRES_TABLE} WHERE user_id = :user_id AND content_id = :content_id'
+            ), params)
+
+
+def unindex_content(content_id):
+    """Drop every index entry of a content item. The caller commits."""
+    dialect = _index_dialect()
+    if dialect in INDEX_TABLES:
+        db.session.execute(text(
+            f'DELETE FROM {INDEX_TABLES[dialect]} WHERE content_id = :content_id'
+        ), {'content_id': content_id})
+
+
+def unindex_user(user_id):
+    """Drop every index entry of a user. The caller commits."""
+    dialect = _index_dialect()
+    if dialect == 'sqlite':
+        db.session.execute(text(f"DELETE FROM {SQLITE_TABLE} WHERE user_key = 'u' || :user_id"), {'user_id': user_id})
+    elif dialect == 'postgresql':
+        db.session.execute(text(f'DELETE FROM {POSTGRES_TABLE} WHERE user_id = :user_id'), {'user_id': user_id})
+
+
+def search_notes(user_id, query, limit=20):
+    """Return (content_id, snippet, rank) tuples of a user's matching notes, best first"""
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return []
+    dialect = _index_dialect()
+    
+    if dialect == 'sqlite':
+        # Quote every term so user input can't inject FTS5 syntax; the last one matches as a prefix
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        rows = db.session.execute(text(
+            f"SELECT content_id, snippet({SQLITE_TABLE}, 0, :start, :end, '…', 12), bm25({SQLITE_TABLE}) "
+            f"FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH :match ORDER BY bm25({SQLITE_TABLE}) LIMIT :limit"
+        ), {
+            'match': f'user_key : "u{int(user_id)}" AND notes : ({match})',
+            'start': SNIPPET_START, 'end': SNIPPET_END, 'limit': limit
+        })
+        return [(int(content_id), snippet, -rank) for content_id, snippet, rank in rows]
+    
+    if dialect == 'postgresql':
+        rows = db.session.execute(text(
+            f"SELECT content_id, ts_headline('english', notes, query, :options), ts_rank(document, query) AS rank "
+            f"FROM {POSTGRES_TABLE}, plainto_tsquery('english', :query) query "
+            f"WHERE user_id = :user_id AND document @@ query ORDER BY rank DESC LIMIT :limit"
+        ), {
+            'query': ' '.join(terms), 'user_id': user_id, 'limit': limit,
+            'options': f'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords=24, MinWords=8, MaxFragments=2'
+        })
+        return [(content_id, snippet, float(rank)) for content_id, snippet, rank in rows]
+    
+    # No full-text support: fall back to scanning the user's notes
+    like = Progress.for_user(user_id).filter(Progress.notes.ilike(f'%{terms[0]}%'))
+    for term in terms[1:]:
+        like = like.filter(Progress.notes.ilike(f'%{term}%'))
+    return [(progress.content_id, progress.notes[:200], 0.0) for progress in like.limit(limit)]
+
+
+def reindex_notes(batch_size=1000):
+    """Create the index if needed and rebuild it from ``progress``. The caller commits."""
+    dialect = ensure_notes_index()
+    if dialect not in INDEX_TABLES:
+        return 0
+    db.session.execute(text(f'DELETE FROM {INDEX_TABLES[dialect]}'))
+    
+    count, last_id = 0, None
+    while True:
+        query = Progress.query.filter(Progress.notes.isnot(None), Progress.notes != '')
+        if last_id is not None:
+            query = query.filter(Progress.id > last_id)
+        batch = query.order_by(Progress.id).limit(batch_size).all()
+        if not batch:
+            return count
+        for progress in batch:
+            index_notes(progress)
+        count += len(batch)
+        last_id = batch[-1].id
+
+
+event.listen(Progress.__table__, 'after_create', create_notes_index)
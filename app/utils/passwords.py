@@ -0,0 +1,133 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+# bcrypt only looks at the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool has no free slots"""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Password hashing pool is saturated')
+        self.retry_after = retry_after
+
+
+def _encode(password):
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    return password[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def _hash_worker(password, rounds):
+    """Runs in a pool process"""
+    import bcrypt
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_worker(pw_hash, password):
+    """Runs in a pool process"""
+    import bcrypt
+    try:
+        return bcrypt.checkpw(_encode(password), pw_hash.encode('utf-8'))
+    except ValueError:
+        # Malformed or foreign hash format
+        return False
+
+
+def _warm_worker():
+    """Runs in a pool process; loads bcrypt ahead of the first request"""
+    import bcrypt  # noqa: F401
+    return os.getpid()
+
+
+def get_hash_rounds(pw_hash):
+    """Return the cost factor stored in a bcrypt hash ($2b$<rounds>$...)"""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Dispatches bcrypt work to a bounded process pool.
+
+    Hashing is CPU bound and holds a request worker for the whole
+    computation, so it runs in separate processes instead. At most
+    ``PASSWORD_HASH_QUEUE_DEPTH`` operations may be queued or running at
+    once; beyond that callers get ``PasswordHasherBusy`` immediately rather
+    than piling up behind the pool.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = os.cpu_count() or 1
+        self.queue_depth = self.workers * 4
+        self.timeout = 10
+        self.start_method = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        self.queue_depth = app.config.get('PASSWORD_HASH_QUEUE_DEPTH', max(self.workers, 1) * 4)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.start_method = app.config.get('PASSWORD_HASH_START_METHOD')
+        self._slots = threading.BoundedSemaphore(self.queue_depth)
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    context = multiprocessing.get_context(self.start_method) if self.start_method else None
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def _run(self, func, *args):
+        # Workers set to 0 runs inline (useful for tests and CLI scripts)
+        if not self.workers:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy()
+
+    def warm_up(self):
+        """Start every pool process now instead of on the first logins"""
+        if not self.workers:
+            return
+        executor = self._get_executor()
+        futures = [executor.submit(_warm_worker) for _ in range(self.workers)]
+        for future in futures:
+            future.result(timeout=self.timeout)
+
+    def generate_password_hash(self, password):
+        """Hash a password with the configured cost factor"""
+        return self._run(_hash_worker, password, self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        """Verify a password against a stored hash"""
+        return self._run(_check_worker, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True when the hash was created with a different cost factor"""
+        return get_hash_rounds(pw_hash) != self.rounds
@@ -0,0 +1,130 @@
+"""Quiz grading.
+
+A quiz's answer key is held as one bitmask per question (bit ``i`` set =
+choice ``i`` is correct) in a NumPy array. Submissions are encoded the same
+way, so grading any number of attempts is a single array comparison and a
+dot product with the points vector. Keys are cached per process and
+rebuilt when the question bank changes.
+"""
+
+import threading
+import numpy as np
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models.quiz import QuizQuestion, QuestionType
+
+MAX_CHOICES = 63
+
+
+def _is_int(value):
+    # JSON true/false arrive as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _mask(indices):
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def validate_question(data, partial=False):
+    """Return an error message for invalid question data, or None"""
+    question_type = data.get('question_type', QuestionType.SINGLE_CHOICE)
+    if question_type not in (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE, QuestionType.TRUE_FALSE):
+        return 'Invalid question type'
+    if not partial and not all(k in data for k in ('prompt', 'choices', 'correct_choices')):
+        return 'prompt, choices and correct_choices required'
+    
+    choices = data.get('choices')
+    if choices is not None and (not isinstance(choices, list) or not 2 <= len(choices) <= MAX_CHOICES):
+        return f'choices must be a list of 2 to {MAX_CHOICES} options'
+    correct = data.get('correct_choices')
+    if correct is not None:
+        if not isinstance(correct, list) or not correct or not all(_is_int(i) for i in correct):
+            return 'correct_choices must be a non-empty list of choice indices'
+        if choices is not None and not all(0 <= i < len(choices) for i in correct):
+            return 'correct_choices must refer to existing choices'
+        if question_type != QuestionType.MULTIPLE_CHOICE and len(set(correct)) != 1:
+            return 'This question type has exactly one correct choice'
+    points = data.get('points', 1)
+    if not _is_int(points) or points < 0:
+        return 'points must be a non-negative integer'
+    position = data.get('position')
+    if position is not None and not _is_int(position):
+        return 'position must be an integer'
+    return None
+
+
+class AnswerKey:
+    """Vectorized answer key of one quiz"""
+
+    def __init__(self, questions):
+        self.question_ids = [question.id for question in questions]
+        self.positions = {question_id: index for index, question_id in enumerate(self.question_ids)}
+        self.choice_counts = np.array([len(question.choices) for question in questions], dtype=np.int64)
+        self.keys = np.array([_mask(question.correct_choices) for question in questions], dtype=np.int64)
+        self.points = np.array([question.points for question in questions], dtype=np.float64)
+        self.max_score = float(self.points.sum())
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def encode(self, answers):
+        """Encode ``{question_id: [choice indices]}`` as a row of bitmasks.
+
+        Unanswered questions encode as 0 and are graded wrong; unknown
+        questions or out-of-range choices raise ValueError.
+        """
+        row = np.zeros(len(self.question_ids), dtype=np.int64)
+        for question_id, selected in answers.items():
+            position = self.positions.get(int(question_id))
+            if position is None:
+                raise ValueError(f'Unknown question {question_id}')
+            if not isinstance(selected, list):
+                selected = [selected]
+            if not all(_is_int(i) and 0 <= i < self.choice_counts[position] for i in selected):
+                raise ValueError(f'Invalid choice for question {question_id}')
+            row[position] = _mask(selected)
+        return row
+
+    def grade(self, selections):
+        """Grade an (attempts x questions) array of encoded answers.
+
+        Returns the per-question correctness matrix and the score of each
+        attempt.
+        """
+        correct = np.asarray(selections, dtype=np.int64).reshape(-1, len(self.question_ids)) == self.keys
+        return correct, correct.astype(np.float64) @ self.points
+
+
+class AnswerKeyCache:
+    """Per-process answer keys, rebuilt when a quiz's questions change"""
+
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def get(self, content_id):
+        # Counters are flushed without touching updated_at, so grading never invalidates keys
+        version = tuple(db.session.query(func.count(QuizQuestion.id), func.max(QuizQuestion.updated_at)).filter(
+            QuizQuestion.content_id == content_id
+        ).one())
+        with self._lock:
+            cached = self._keys.get(content_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        key = AnswerKey(QuizQuestion.query.filter_by(content_id=content_id).order_by(
+            QuizQuestion.position, QuizQuestion.id
+        ).all())
+        with self._lock:
+            self._keys[content_id] = (version, key)
+        return key
+
+
+def passing_percentage(content):
+    """Pass mark of a quiz: ``metadata_json['passing_percentage']`` or QUIZ_PASSING_PERCENTAGE"""
+    metadata = content.metadata_json if isinstance(content.metadata_json, dict) else {}
+    return float(metadata.get('passing_percentage', current_app.config.get('QUIZ_PASSING_PERCENTAGE', 70)))
@@ -0,0 +1,83 @@
+import time
+from app.utils.store import create_store
+
+
+class RecentActivity:
+    """Capped per-user recency lists for the home screen.
+
+    Each user has two lists of at most ``RECENT_ITEMS_LIMIT`` entries, most
+    recent first: content they viewed, and content they started but have not
+    completed ("continue watching"). An entry is a compact
+    ``[content_id, last_position, completion_percentage, timestamp]`` list, so
+    a whole list is a single small value in the store. Lists live in memory
+    by default; ``RECENT_ACTIVITY_STORAGE_URL`` points every worker process at
+    a shared store instead.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.limit = app.config.get('RECENT_ITEMS_LIMIT', 20)
+        self.ttl = app.config.get('RECENT_ACTIVITY_TTL', 30 * 24 * 3600)
+        self.store = create_store(app.config.get('RECENT_ACTIVITY_STORAGE_URL', 'memory://'))
+        app.extensions['recent_activity'] = self
+
+    @staticmethod
+    def _viewed_key(user_id):
+        return f'recent:viewed:{user_id}'
+
+    @staticmethod
+    def _watching_key(user_id):
+        return f'recent:watching:{user_id}'
+
+    def _push(self, key, entry):
+        def push(entries):
+            entries = [item for item in entries or [] if item[0] != entry[0]]
+            return [entry] + entries[:self.limit - 1]
+
+        self.store.update(key, push, ttl=self.ttl)
+
+    def record_view(self, user_id, content_id):
+        """Move ``content_id`` to the front of the user's recently viewed list"""
+        self._push(self._viewed_key(user_id), [content_id, None, None, time.time()])
+
+    def record_progress(self, user_id, content_id, last_position, completion_percentage):
+        """Track unfinished content for "continue watching"; completed content drops out"""
+        key = self._watching_key(user_id)
+        if not completion_percentage and last_position is None:
+            return  # Not started yet
+        if completion_percentage >= 100:
+            self.store.update(
+                key,
+                lambda entries: [item for item in entries or [] if item[0] != content_id],
+                ttl=self.ttl
+            )
+            return
+        self._push(key, [content_id, last_position, completion_percentage, time.time()])
+
+    def forget(self, user_id):
+        self.store.delete(self._viewed_key(user_id))
+        self.store.delete(self._watching_key(user_id))
+
+    def viewed(self, user_id):
+        return self.store.get(self._viewed_key(user_id)) or []
+
+    def continue_watching(self, user_id, seed=None):
+        """Return the user's unfinished content.
+
+        When the list is missing (new store, expired, evicted) ``seed()`` is
+        called to rebuild it from the database.
+        """
+        entries = self.store.get(self._watching_key(user_id))
+        if entries is None and seed is not None:
+            # Query outside the store, which is locked for the whole update
+            seeded = seed()[:self.limit]
+            entries = self.store.update(
+                self._watching_key(user_id),
+                lambda current: current if current is not None else seeded,
+                ttl=self.ttl
+            )
+        return entries or []
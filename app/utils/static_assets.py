@@ -0,0 +1,137 @@
+"""Precompressed, fingerprinted frontend assets served from memory.
+
+Every file under ``FRONTEND_DIR`` is read once, hashed and compressed with
+gzip (and brotli when available). Assets are served at
+``/assets/<name>.<hash>.<ext>`` with a year-long immutable cache lifetime;
+references to them in the HTML pages are rewritten to those URLs. Pages
+themselves keep stable URLs, so they are revalidated with a strong ETag
+instead and answer with 304 while unchanged.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import abort, current_app, make_response, request
+from app.utils.compression import brotli
+
+PAGE_CACHE_CONTROL = 'no-cache'
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class Asset:
+    """One file with its fingerprint and compressed variants"""
+
+    def __init__(self, name, data, mimetype):
+        self.name = name
+        self.mimetype = mimetype
+        self.fingerprint = hashlib.sha256(data).hexdigest()[:12]
+        self.variants = {None: data}
+        if len(data) >= 256:
+            self.variants['gzip'] = gzip.compress(data, compresslevel=9)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(data, quality=11)
+
+    @property
+    def url(self):
+        stem, extension = os.path.splitext(self.name)
+        return f'/assets/{stem}.{self.fingerprint}{extension}'
+
+
+class StaticAssets:
+    """Serves the frontend pages and their assets"""
+
+    def __init__(self, app=None):
+        self._assets = None
+        self._signature = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get(
+            'FRONTEND_DIR', os.path.join(os.path.dirname(app.root_path), 'frontend')
+        )
+        app.add_url_rule('/assets/<path:filename>', 'frontend_asset', self.serve_asset)
+        app.extensions['static_assets'] = self
+
+    def _scan(self):
+        """(path, mtime, size) of every frontend file; changes when any file does"""
+        signature = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                signature.append((os.path.join(root, name), stat.st_mtime_ns, stat.st_size))
+        return sorted(signature)
+
+    def load(self):
+        """Read, fingerprint and compress every frontend file"""
+        with self._lock:
+            if self._assets is not None:
+                return self._assets
+            self._signature = self._scan()
+            files = {}
+            for root, _, names in os.walk(self.directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    relative = os.path.relpath(path, self.directory).replace(os.sep, '/')
+                    with open(path, 'rb') as f:
+                        files[relative] = f.read()
+
+            assets = {}
+            for name, data in files.items():
+                if not name.endswith('.html'):
+                    assets[name] = Asset(name, data, mimetypes.guess_type(name)[0] or 'application/octet-stream')
+            # Point pages at the fingerprinted URLs; pages are built last for that reason
+            names = '|'.join(re.escape(name) for name in assets)
+            pattern = re.compile(r'((?:src|href)=["\'])/?(%s)(["\'])' % names) if names else None
+            for name, data in files.items():
+                if name.endswith('.html'):
+                    html = data.decode('utf-8')
+                    if pattern is not None:
+                        html = pattern.sub(lambda m: m.group(1) + assets[m.group(2)].url + m.group(3), html)
+                    assets[name] = Asset(name, html.encode('utf-8'), 'text/html')
+            self._assets = {'by_name': assets, 'by_url': {asset.url: asset for asset in assets.values()}}
+            return self._assets
+
+    def _respond(self, asset, cache_control):
+        accepted = request.accept_encodings
+        encoding = None
+        if 'br' in asset.variants and accepted['br']:
+            encoding = 'br'
+        elif 'gzip' in asset.variants and accepted['gzip']:
+            encoding = 'gzip'
+        # Each encoding is a different representation, so it gets its own ETag
+        etag = f'{asset.fingerprint}-{encoding}' if encoding else asset.fingerprint
+
+        response = make_response()
+        response.headers['Cache-Control'] = cache_control
+        response.vary.add('Accept-Encoding')
+        response.set_etag(etag)
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+
+        response.set_data(asset.variants[encoding])
+        response.mimetype = asset.mimetype
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def serve_page(self, name):
+        """Serve an HTML page; its URL is stable, so it is revalidated every time"""
+        if current_app.debug and self._assets is not None and self._scan() != self._signature:
+            self._assets = None  # Pick up edits while developing
+        asset = self.load()['by_name'].get(name)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, PAGE_CACHE_CONTROL)
+
+    def serve_asset(self, filename):
+        """Serve a fingerprinted asset; its URL changes with its content"""
+        asset = self.load()['by_url'].get('/assets/' + filename)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, ASSET_CACHE_CONTROL)
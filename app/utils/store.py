@@ -0,0 +1,110 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class MemoryStore:
+    """Process-local key/value store with per-key expiry"""
+
+    # Sweep expired keys every N writes so abandoned keys don't pile up
+    SWEEP_INTERVAL = 1000
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.time():
+                return default
+            return item[0]
+
+    def update(self, key, func, ttl):
+        """Atomically replace the value of ``key`` with ``func(old_value)``"""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            current = item[0] if item is not None and item[1] >= now else None
+            value = func(current)
+            self._data[key] = (value, now + ttl)
+            self._writes += 1
+            if self._writes % self.SWEEP_INTERVAL == 0:
+                self._sweep(now)
+            return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _sweep(self, now):
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at < now]
+        for key in expired:
+            del self._data[key]
+
+
+class SQLiteStore:
+    """Key/value store in a local SQLite file.
+
+    Shared by every worker process on the same host, which makes it a local
+    stand-in for a networked store such as Redis. Values are stored as JSON.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS kv ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_kv_expires_at ON kv (expires_at)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._connection().execute(
+            'SELECT value FROM kv WHERE key = ? AND expires_at >= ?', (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def update(self, key, func, ttl):
+        """Atomically replace the value of ``key`` with ``func(old_value)``"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT value FROM kv WHERE key = ? AND expires_at >= ?', (key, now)
+            ).fetchone()
+            value = func(json.loads(row[0]) if row else None)
+            conn.execute(
+                'INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), now + ttl)
+            )
+            conn.execute('DELETE FROM kv WHERE expires_at < ?', (now,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return value
+
+    def delete(self, key):
+        self._connection().execute('DELETE FROM kv WHERE key = ?', (key,))
+
+
+def create_store(url):
+    """Build a store from a URL: ``memory://`` or ``sqlite:///path/to/file.db``"""
+    if not url or url == 'memory://':
+        return MemoryStore()
+    if url.startswith('sqlite:///'):
+        return SQLiteStore(url[len('sqlite:///'):])
+    raise ValueError(f'Unsupported store URL: {url}')
@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Response, stream_with_context
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def ndjson_response(rows, status=200, filename=None):
+    """Stream an iterable of dicts as newline-delimited JSON"""
+    def generate():
+        for row in rows:
+            yield json.dumps(row, default=_json_default) + '\n'
+
+    response = Response(stream_with_context(generate()), status=status, mimetype='application/x-ndjson')
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def csv_response(columns, rows, filename=None):
+    """Stream an iterable of tuples as CSV with a header row"""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([value.isoformat() if isinstance(value, (datetime, date)) else value for value in row])
+            # Flush roughly every 64 KiB rather than per row
+            if buffer.tell() >= 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
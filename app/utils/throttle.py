@@ -0,0 +1,84 @@
+import time
+from app.utils.store import create_store
+
+
+class LoginThrottle:
+    """Sliding-window login throttle keyed by username and client IP.
+
+    Failures are counted per username and per IP over the
+    ``LOGIN_THROTTLE_WINDOW`` seconds before the most recent one. Once a key
+    reaches its failure limit, further attempts are locked out with
+    exponential backoff measured from the most recent failure. Failures are
+    kept for the window plus the longest backoff, so a lockout longer than
+    the window still runs its course. Checks only touch the throttle store,
+    so rejected attempts never reach the database or bcrypt. The client IP
+    is ``request.remote_addr``; set ``PROXY_FIX_X_FOR`` behind proxies.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.window = app.config.get('LOGIN_THROTTLE_WINDOW', 300)
+        self.username_limit = app.config.get('LOGIN_MAX_FAILURES_PER_USERNAME', 5)
+        self.ip_limit = app.config.get('LOGIN_MAX_FAILURES_PER_IP', 100)
+        self.backoff_base = app.config.get('LOGIN_BACKOFF_BASE', 1)
+        self.backoff_max = app.config.get('LOGIN_BACKOFF_MAX', 900)
+        self.store = create_store(app.config.get('LOGIN_THROTTLE_STORAGE_URL', 'memory://'))
+        app.extensions['login_throttle'] = self
+
+    @staticmethod
+    def _username_key(username):
+        return f'login:user:{str(username).strip().lower()}'
+
+    @staticmethod
+    def _ip_key(ip):
+        return f'login:ip:{ip}'
+
+    def _keys(self, username, ip):
+        keys = [(self._username_key(username), self.username_limit)]
+        if ip:
+            keys.append((self._ip_key(ip), self.ip_limit))
+        return keys
+
+    @property
+    def retention(self):
+        return self.window + self.backoff_max
+
+    def _retry_after(self, failures, limit, now):
+        failures = [ts for ts in failures or [] if ts > now - self.retention]
+        if not failures:
+            return 0
+        failures = [ts for ts in failures if ts > failures[-1] - self.window]
+        if len(failures) < limit:
+            return 0
+        delay = min(self.backoff_base * 2 ** (len(failures) - limit), self.backoff_max)
+        return max(failures[-1] + delay - now, 0)
+
+    def check(self, username, ip):
+        """Return seconds to wait before another attempt is allowed (0 if none)"""
+        now = time.time()
+        retry_after = 0
+        for key, limit in self._keys(username, ip):
+            retry_after = max(retry_after, self._retry_after(self.store.get(key), limit, now))
+        return retry_after
+
+    def record_failure(self, username, ip):
+        """Record a failed attempt against the username and the IP"""
+        now = time.time()
+        for key, limit in self._keys(username, ip):
+            # Backoff stops growing once it reaches the cap, so older entries are dead weight
+            keep = limit + int(self.backoff_max).bit_length()
+
+            def append(failures, keep=keep):
+                failures = [ts for ts in failures or [] if ts > now - self.retention]
+                failures.append(now)
+                return failures[-keep:]
+
+            self.store.update(key, append, ttl=self.retention)
+
+    def reset(self, username):
+        """Clear username failures after a successful login"""
+        self.store.delete(self._username_key(username))
@@ -0,0 +1,147 @@
+"""Request-scoped unit of work.
+
+Routes stage their changes with ``db.session.add``/``flush`` and leave the
+commit to the end of the request: one commit when the response is a
+success, a rollback on an error response or an unhandled exception. Work
+that may fail on its own goes in a savepoint
+(``with db.session.begin_nested(): ...``) so only that part is undone.
+
+Side effects that must only happen once the data is durable (publishing
+events, evicting caches, buffered counters) are registered with
+``on_commit`` and run right after the commit; a rollback discards them.
+Callbacks run inside the commit, so they must not use the session.
+
+The response is built before the commit. If the commit fails, its body is
+replaced with a JSON error (409 for a constraint violation, else 500), so
+clients never see a success for changes that were not saved.
+
+``UNIT_OF_WORK_STRICT`` reports requests that commit more than once or
+write during a GET/HEAD: ``'warn'`` logs them and ``'raise'`` (for tests)
+turns them into errors.
+"""
+
+import json
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class UnitOfWorkViolation(RuntimeError):
+    """A request broke the one-commit, no-writes-on-GET rules"""
+
+
+def on_commit(callback):
+    """Run ``callback()`` after the current transaction commits, or now if none is open"""
+    from app import db
+    session = db.session()
+    if not session.in_transaction():
+        callback()
+        return
+    session.info.setdefault('on_commit', []).append((session.get_nested_transaction() or session.get_transaction(), callback))
+
+
+def _after_commit(session):
+    # Also fired when a savepoint is released; only the outer commit counts
+    if session.in_nested_transaction():
+        return
+    for _, callback in session.info.pop('on_commit', []):
+        try:
+            callback()
+        except Exception:
+            current_app.logger.exception('on_commit callback failed')
+    if has_request_context():
+        g.uow_commits = g.get('uow_commits', 0) + 1
+
+
+def _within(transaction, ancestor):
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # Drop the callbacks registered inside the rolled back (sub)transaction
+    pending = session.info.get('on_commit')
+    if pending:
+        pending[:] = [entry for entry in pending if not _within(entry[0], previous_transaction)]
+
+
+def _after_flush(session, flush_context):
+    if has_request_context():
+        g.uow_wrote = True
+
+
+class UnitOfWork:
+    """Commits each request's session once, after the view has returned"""
+
+    def __init__(self, app=None, db=None):
+        self.db = db
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.db = db
+        if not event.contains(Session, 'after_commit', _after_commit):
+            event.listen(Session, 'after_commit', _after_commit)
+            event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+            event.listen(Session, 'after_flush', _after_flush)
+        app.before_request(self._begin)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        app.extensions['unit_of_work'] = self
+
+    def _begin(self):
+        g.uow_commits = 0
+        g.uow_wrote = False
+
+    def _finish(self, response):
+        session = self.db.session()
+        if response.status_code >= 400:
+            session.rollback()
+        elif session.new or session.dirty or session.deleted or (
+            session.in_transaction() and (g.get('uow_wrote') or request.method not in SAFE_METHODS)
+        ):
+            try:
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                current_app.logger.exception('Commit failed for %s %s', request.method, request.path)
+                self._fail(response, e)
+                return response
+        self._check(response)
+        return response
+
+    def _fail(self, response, error):
+        # Rewrite the response in place so headers added by other hooks (CORS) stay
+        conflict = isinstance(error, IntegrityError)
+        response.status_code = 409 if conflict else 500
+        response.set_data(json.dumps({
+            'error': 'Conflicting change, please retry' if conflict else 'Could not save changes'
+        }))
+        response.mimetype = 'application/json'
+        for header in ('ETag', 'Last-Modified', 'Location', 'Content-Encoding'):
+            response.headers.pop(header, None)
+
+    def _check(self, response):
+        strict = current_app.config.get('UNIT_OF_WORK_STRICT')
+        if not strict:
+            return
+        problems = []
+        if g.get('uow_commits', 0) > 1:
+            problems.append(f"{g.uow_commits} commits")
+        if request.method in SAFE_METHODS and g.get('uow_wrote'):
+            problems.append(f'writes during {request.method}')
+        if problems:
+            message = f"{request.method} {request.endpoint}: {', '.join(problems)}"
+            if strict == 'raise':
+                raise UnitOfWorkViolation(message)
+            current_app.logger.warning('Unit of work violation: %s', message)
+
+    def _teardown(self, exc):
+        if exc is not None:
+            self.db.session.rollback()
@@ -1,4 +1,5 @@
 import re
+from datetime import datetime, timezone
 from flask import jsonify
 
 
@@ -20,3 +21,18 @@ def validate_password(password):
         return False, "Password must contain at least one digit"
     return True, "Password is valid"
 
+
+def parse_datetime(value):
+    """Parse an ISO 8601 timestamp into naive UTC; raises ValueError if malformed.
+
+    Accepts a trailing ``Z``, which ``datetime.fromisoformat`` rejects before
+    Python 3.11.
+    """
+    if not value:
+        return None
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
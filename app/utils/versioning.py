@@ -0,0 +1,190 @@
+"""Content revisions and published snapshots.
+
+Every edit appends an immutable ``ContentRevision`` holding only the fields
+that changed since the previous revision; every ``KEYFRAME_INTERVAL``-th
+revision stores the full state so rebuilding any revision reads at most
+that many rows. Drafts live only in revisions, so the ``Content`` row always
+holds the published state. Publishing applies a revision to the row and
+swaps in a serialized ``ContentSnapshot`` in the same transaction; detail
+reads serve that JSON with the live counters and related names laid over it.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from flask import current_app
+from app import db
+from app.models.revision import ContentRevision, ContentSnapshot
+from app.models.tag import Tag
+
+VERSIONED_FIELDS = (
+    'title', 'description', 'content_type', 'content_url', 'thumbnail_url',
+    'duration_minutes', 'difficulty_level', 'language', 'price', 'is_free',
+    'category_id', 'metadata_json', 'tags'
+)
+
+
+def content_state(content):
+    """Return the versioned fields of a content row as plain JSON values"""
+    state = {field: getattr(content, field) for field in VERSIONED_FIELDS if field != 'tags'}
+    if isinstance(state['price'], Decimal):
+        state['price'] = float(state['price'])
+    state['tags'] = sorted(tag.name for tag in content.tags)
+    return state
+
+
+def normalize_changes(data):
+    """Pick versioned fields out of request data"""
+    changes = {field: data[field] for field in VERSIONED_FIELDS if field in data and field != 'tags'}
+    if 'price' in changes and changes['price'] is not None:
+        changes['price'] = float(changes['price'])
+    if isinstance(data.get('tags'), list):
+        changes['tags'] = sorted({tag_name.lower() for tag_name in data['tags']})
+    return changes
+
+
+def latest_revision_number(content_id):
+    return db.session.query(db.func.max(ContentRevision.revision_number)).filter_by(
+        content_id=content_id
+    ).scalar() or 0
+
+
+def reconstruct(content_id, revision_number=None):
+    """Rebuild the full state at a revision (the latest by default), or None"""
+    if revision_number is None:
+        revision_number = latest_revision_number(content_id)
+    keyframe = db.session.query(db.func.max(ContentRevision.revision_number)).filter(
+        ContentRevision.content_id == content_id,
+        ContentRevision.is_keyframe == True,
+        ContentRevision.revision_number <= revision_number
+    ).scalar()
+    if keyframe is None:
+        return None
+    
+    state = {}
+    for revision in ContentRevision.query.filter(
+        ContentRevision.content_id == content_id,
+        ContentRevision.revision_number.between(keyframe, revision_number)
+    ).order_by(ContentRevision.revision_number):
+        state.update(revision.delta)
+    return state
+
+
+def record_revision(content, changes, author_id=None, base=None):
+    """Append a revision applying ``changes`` on top of ``base``.
+
+    ``base`` defaults to the latest revision, so drafts stack; passing the
+    live row's state discards unpublished drafts instead. Content that
+    predates versioning gets a keyframe of its current row first. Returns
+    the new revision, or None if nothing changed.
+    """
+    # Concurrent edits of one item queue on its row instead of racing for the next number
+    db.session.query(type(content).id).filter_by(id=content.id).with_for_update().scalar()
+    number = latest_revision_number(content.id)
+    previous = reconstruct(content.id, number) if number else None
+    if previous is None:
+        previous = content_state(content)
+        number += 1
+        db.session.add(ContentRevision(
+            content_id=content.id, revision_number=number, is_keyframe=True,
+            delta=previous, author_id=author_id
+        ))
+    
+    target = dict(base if base is not None else previous, **changes)
+    delta = {field: value for field, value in target.items() if previous.get(field) != value}
+    if not delta:
+        return None
+    
+    number += 1
+    is_keyframe = (number - 1) % current_app.config.get('CONTENT_REVISION_KEYFRAME_INTERVAL', 20) == 0
+    revision = ContentRevision(
+        content_id=content.id,
+        revision_number=number,
+        is_keyframe=is_keyframe,
+        delta=dict(previous, **delta) if is_keyframe else delta,
+        author_id=author_id
+    )
+    db.session.add(revision)
+    return revision
+
+
+def apply_state(content, state):
+    """Write a reconstructed state onto the content row"""
+    for field in VERSIONED_FIELDS:
+        if field == 'tags':
+            content.tags = Tag.resolve(state.get('tags', []))
+        elif field in state:
+            setattr(content, field, state[field])
+
+
+def publish(content, revision_number=None):
+    """Make a revision live. The caller commits, then calls ``snapshots.evict``."""
+    number = revision_number or latest_revision_number(content.id)
+    state = reconstruct(content.id, number) if number else None
+    if state is None:
+        return None
+    apply_state(content, state)
+    content.is_published = True
+    content.updated_at = datetime.utcnow()
+    return refresh_snapshot(content, number)
+
+
+def refresh_snapshot(content, revision_number=None):
+    """Re-serialize the published snapshot from the (published) row"""
+    db.session.flush()
+    snapshot = db.session.get(ContentSnapshot, content.id)
+    if snapshot is None:
+        snapshot = ContentSnapshot(content_id=content.id)
+        db.session.add(snapshot)
+    if revision_number is not None:
+        snapshot.revision_number = revision_number
+    elif snapshot.revision_number is None:
+        snapshot.revision_number = latest_revision_number(content.id)
+    snapshot.payload = json.dumps(content.to_dict(include_details=True))
+    snapshot.published_at = datetime.utcnow()
+    return snapshot
+
+
+def unpublish(content):
+    """Take content offline by dropping its snapshot. The caller commits."""
+    content.is_published = False
+    snapshot = db.session.get(ContentSnapshot, content.id)
+    if snapshot is not None:
+        db.session.delete(snapshot)
+
+
+class SnapshotCache:
+    """Per-process LRU of parsed snapshots keyed by content id.
+
+    Entries are tagged with their publish time, so a publish in another
+    process is noticed by the validator lookup and the entry is replaced.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_id, published_at):
+        with self._lock:
+            entry = self._entries.get(content_id)
+            if entry is None or entry[0] != published_at:
+                return None
+            self._entries.move_to_end(content_id)
+            return entry[1]
+
+    def put(self, content_id, published_at, payload):
+        with self._lock:
+            self._entries[content_id] = (published_at, payload)
+            self._entries.move_to_end(content_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, content_id):
+        with self._lock:
+            self._entries.pop(content_id, None)
+
+
+snapshots = SnapshotCache()
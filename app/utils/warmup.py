@@ -0,0 +1,68 @@
+"""Warm-up run before an instance accepts traffic.
+
+Pays the one-off costs that would otherwise land on the first requests:
+opening database connections, configuring ORM mappers, spawning the
+password hashing processes, building the catalog snapshot, creating the
+notes search index and compressing the frontend assets.
+"""
+
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from app import db, password_hasher, static_assets
+
+
+def _prime_pool(app):
+    """Open ``DB_WARM_CONNECTIONS`` connections at once and return them to the pool"""
+    connections = []
+    try:
+        for _ in range(app.config.get('DB_WARM_CONNECTIONS', 2)):
+            connection = db.engine.connect()
+            connections.append(connection)
+            connection.execute(text('SELECT 1'))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _build_catalog(app):
+    from app.routes.content import catalog
+    if catalog.enabled:
+        catalog.snapshot()
+
+
+def _build_notes_index(app):
+    from app.utils.notes_search import ensure_notes_index
+    ensure_notes_index()
+
+
+def warm_up(app):
+    """Run every warm-up step; returns the seconds spent per step"""
+    state = app.extensions.setdefault('warm_up', {'ready': False, 'timings': {}})
+    steps = (
+        ('mappers', lambda: configure_mappers()),
+        ('database', lambda: _prime_pool(app)),
+        ('password_hasher', password_hasher.warm_up),
+        ('catalog', lambda: _build_catalog(app)),
+        ('notes_index', lambda: _build_notes_index(app)),
+        ('frontend', static_assets.load),
+    )
+    with app.app_context():
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                app.logger.exception('Warm-up step %s failed', name)
+            state['timings'][name] = round(time.perf_counter() - started, 4)
+    state['ready'] = True
+    return state['timings']
+
+
+def start_warm_up(app):
+    """Warm up in the background; ``/api/ready`` reports 503 until done"""
+    app.extensions['warm_up'] = {'ready': False, 'timings': {}}
+    thread = threading.Thread(target=warm_up, args=(app,), name='warm-up', daemon=True)
+    thread.start()
+    return thread
@@ -5,8 +5,11 @@ A comprehensive learning content platform with REST APIs, PostgreSQL, and Docker
 
 from app import create_app, db
 from app.models import User, Content, Category, Tag
-from flask_migrate import upgrade
+import click
 import os
+import statistics
+import subprocess
+import sys
 
 app = create_app()
 
@@ -18,7 +21,7 @@ def init_db():
         db.create_all()
         
         # Create default admin user
-        from app import bcrypt
+        from app import password_hasher
         from app.models.user import UserRole
         
         admin = User.query.filter_by(username='admin').first()
@@ -26,7 +29,7 @@ def init_db():
             admin = User(
                 username='admin',
                 email='admin@educationplatform.com',
-                password_hash=bcrypt.generate_password_hash('admin123').decode('utf-8'),
+                password_hash=password_hasher.generate_password_hash('admin123'),
                 full_name='Administrator',
                 role=UserRole.ADMIN
             )
@@ -53,5 +56,154 @@ def init_db():
         print("Database initialized successfully!")
 
 
+@app.cli.command('run-worker')
+@click.option('--concurrency', default=4, help='Number of jobs to run in parallel')
+@click.option('--poll-interval', default=1.0, help='Seconds to wait when the queue is empty')
+@click.option('--once', is_flag=True, help='Exit once no due jobs remain')
+def run_worker(concurrency, poll_interval, once):
+    """Run background job workers"""
+    from app.jobs import Worker
+    
+    print(f"Starting worker with concurrency={concurrency}")
+    Worker(app, concurrency=concurrency, poll_interval=poll_interval).run(once=once)
+
+
+@app.cli.command('rollup-analytics')
+@click.option('--schedule', is_flag=True, help='Also keep a recurring rollup job queued')
+def rollup_analytics_command(schedule):
+    """Roll recent activity into per-content daily analytics"""
+    from app.utils.analytics import rollup_content_metrics
+    from app.jobs.tasks import rollup_analytics
+    
+    rows = rollup_content_metrics()
+    if schedule:
+        rollup_analytics.apply_async(kwargs={'reschedule': True})
+    db.session.commit()
+    print(f"Rolled up {rows} content-day rows")
+
+
+@app.cli.command('purge-deleted')
+@click.option('--batch-size', default=1000, help='Rows deleted per committed batch')
+def purge_deleted_command(batch_size):
+    """Hard-delete soft-deleted users and content whose purge job never ran"""
+    from app.utils.deletion import purge_deleted
+    
+    users, content = purge_deleted(batch_size=batch_size)
+    db.session.commit()
+    print(f"Purged {users} users and {content} content items")
+
+
+@app.cli.command('reconcile-instructor-stats')
+def reconcile_instructor_stats_command():
+    """Recompute per-instructor counters from the source tables"""
+    from app.utils.instructor_stats import reconcile_instructor_stats
+    
+    changed = reconcile_instructor_stats()
+    db.session.commit()
+    print(f"Reconciled instructor stats ({changed} rows changed)")
+
+
+@app.cli.command('reconcile-helpful-counts')
+def reconcile_helpful_counts_command():
+    """Recompute reviews' helpful counts from their votes"""
+    from app.models.review import Review
+    
+    changed = Review.reconcile_helpful_counts()
+    db.session.commit()
+    print(f"Reconciled helpful counts ({changed} reviews changed)")
+
+
+@app.cli.command('archive-records')
+@click.option('--batch-size', default=1000, help='Rows moved per transaction')
+@click.option('--max-batches', default=None, type=int, help='Stop after this many batches per table')
+@click.option('--schedule', is_flag=True, help='Also keep a recurring archival job queued')
+def archive_records_command(batch_size, max_batches, schedule):
+    """Move completed enrollments and stale progress into the archive"""
+    from app.utils.archival import archive_stale_records
+    from app.jobs.tasks import archive_stale_records as archive_task
+    
+    archived = archive_stale_records(batch_size=batch_size, max_batches=max_batches)
+    if schedule:
+        archive_task.apply_async(kwargs={'reschedule': True})
+        db.session.commit()
+    for kind, count in archived.items():
+        print(f"Archived {count} {kind} rows")
+
+
+@app.cli.command('rebuild-learning-paths')
+def rebuild_learning_paths_command():
+    """Recompute the prerequisite reachability index from its edges"""
+    from app.utils.learning_paths import rebuild_closure
+    
+    rows = rebuild_closure()
+    db.session.commit()
+    print(f"Rebuilt learning path index ({rows} reachable pairs)")
+
+
+@app.cli.command('reindex-notes')
+def reindex_notes_command():
+    """Rebuild the full-text index over progress notes"""
+    from app.utils.notes_search import reindex_notes
+    
+    count = reindex_notes()
+    db.session.commit()
+    print(f"Indexed notes of {count} progress rows")
+
+
+@app.cli.command('bulk-enroll')
+@click.option('--users', 'users_file', type=click.File('r'), required=True, help='File with one user id per line')
+@click.option('--content', 'content_ids', required=True, help='Comma-separated content ids')
+def bulk_enroll_command(users_file, content_ids):
+    """Enroll a cohort of users into a set of content items"""
+    from collections import Counter
+    from app.utils.bulk_enrollment import bulk_enroll
+    
+    user_ids = [int(line) for line in (line.strip() for line in users_file) if line]
+    content_ids = [int(content_id) for content_id in content_ids.split(',') if content_id.strip()]
+    pairs = [(user_id, content_id) for content_id in content_ids for user_id in user_ids]
+    
+    summary = Counter(outcome['status'] for outcome in bulk_enroll(pairs))
+    for status, count in sorted(summary.items()):
+        print(f"{status}: {count}")
+
+
+@app.cli.command('bench-startup')
+@click.option('--runs', default=5, help='Number of fresh interpreter starts to time')
+@click.option('--warm-up', 'with_warm_up', is_flag=True, help='Also time the warm-up hook')
+def bench_startup(runs, with_warm_up):
+    """Time application startup in fresh interpreters"""
+    script = (
+        "import time; started = time.perf_counter()\n"
+        "from app import create_app\n"
+        "application = create_app()\n"
+        "created = time.perf_counter()\n"
+        "if %r:\n"
+        "    from app.utils.warmup import warm_up; warm_up(application)\n"
+        "print(created - started, time.perf_counter() - created)\n"
+    ) % with_warm_up
+    
+    create_times, warm_times = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.split()
+        create_times.append(float(output[-2]))
+        warm_times.append(float(output[-1]))
+    
+    print(f"create_app: min {min(create_times):.3f}s, median {statistics.median(create_times):.3f}s, max {max(create_times):.3f}s")
+    if with_warm_up:
+        print(f"warm-up:    min {min(warm_times):.3f}s, median {statistics.median(warm_times):.3f}s, max {max(warm_times):.3f}s")
+
+
 if __name__ == '__main__':
+    # The reloader runs this module twice: in a watcher process and in the
+    # serving child. Only the child (WERKZEUG_RUN_MAIN) warms up and works.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from app.utils.warmup import warm_up
+        warm_up(app)
+        # The image runs no separate worker, so background jobs run in here too
+        if app.config.get('JOBS_EMBEDDED_WORKER', True):
+            from app.jobs import Worker
+            Worker(app, concurrency=app.config.get('JOBS_EMBEDDED_CONCURRENCY', 2)).start()
     app.run(debug=True, host='0.0.0.0', port=5000)
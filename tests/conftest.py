@@ -0,0 +1,45 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models.user import User
+
+
+class TestConfig:
+    TESTING = True
+    SECRET_KEY = 'test-secret-key'
+    JWT_SECRET_KEY = 'test-jwt-secret-key-long-enough-for-hs256'
+    JWT_VERIFY_SUB = False
+    BCRYPT_LOG_ROUNDS = 4
+    JOBS_EAGER = True
+    UNIT_OF_WORK_STRICT = 'raise'
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type('Config', (TestConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'MEDIA_ROOT': str(tmp_path / 'media'),
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return (user id, auth headers)"""
+    def make(username, role='student'):
+        user = User(username=username, email=f'{username}@example.com', password_hash='x', full_name=username.title(), role=role)
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        return user.id, {'Authorization': f'Bearer {token}'}
+    return make
@@ -0,0 +1,37 @@
+from datetime import datetime
+from app import db
+from app.models.analytics import ContentDailyMetrics
+from app.models.content import Content
+from app.models.progress import Progress
+from app.utils.analytics import rollup_content_metrics
+
+
+def test_progress_counts_once_on_its_latest_day(make_user):
+    instructor_id, _ = make_user('teacher', role='instructor')
+    student_ids = [make_user(f'student{i}')[0] for i in range(2)]
+    content = Content(title='Intro', description='d', content_type='video', instructor_id=instructor_id)
+    db.session.add(content)
+    db.session.flush()
+    content_id = content.id
+    for student_id in student_ids:
+        db.session.add(Progress(
+            user_id=student_id, content_id=content_id, completion_percentage=10, updated_at=datetime(2026, 3, 1, 9)
+        ))
+    db.session.commit()
+    rollup_content_metrics(now=datetime(2026, 3, 1, 23))
+    db.session.commit()
+
+    # The first student comes back on each of the next two days
+    for day, percentage in ((2, 60), (3, 100)):
+        progress = Progress.query.filter_by(user_id=student_ids[0], content_id=content_id).one()
+        progress.completion_percentage = percentage
+        progress.updated_at = datetime(2026, 3, day, 9)
+        db.session.commit()
+        rollup_content_metrics(now=datetime(2026, 3, day, 23))
+        db.session.commit()
+
+    summary = ContentDailyMetrics.summarize(ContentDailyMetrics.content_id == content_id)
+    assert summary['totals']['progress_updates'] == 2
+    assert summary['totals']['average_completion'] == 55.0
+    assert summary['totals']['dropoff'] == {'0-25': 1, '25-50': 0, '50-75': 0, '75-100': 0, 'completed': 1}
+    assert [(day['day'], day['progress_updates']) for day in summary['daily']] == [('2026-03-01', 1), ('2026-03-03', 1)]
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.instructor_stats import InstructorStats
+from app.utils.archival import archive_stale_records
+from app.utils.bulk_enrollment import EnrollmentOutcome, bulk_enroll
+
+
+def test_archived_enrollment_still_counts_as_enrolled(client, make_user):
+    instructor_id, teacher = make_user('teacher', role='instructor')
+    student_id, student = make_user('student')
+    response = client.post('/api/content', json={
+        'title': 'Intro', 'description': 'd', 'content_type': 'video', 'is_free': True
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    assert client.post('/api/enrollments', json={'content_id': content_id}, headers=student).status_code == 201
+
+    enrollment = Enrollment.for_user(student_id).filter_by(content_id=content_id).one()
+    enrollment.is_completed = True
+    enrollment.completed_at = datetime.utcnow() - timedelta(days=400)
+    db.session.commit()
+    assert archive_stale_records()['enrollment'] == 1
+
+    outcomes = list(bulk_enroll([(student_id, content_id)]))
+    assert outcomes[0]['status'] == EnrollmentOutcome.ALREADY_ENROLLED
+    assert Enrollment.for_user(student_id).filter_by(content_id=content_id).count() == 0
+    assert db.session.get(InstructorStats, instructor_id).total_enrollments == 1
+
+    response = client.post('/api/reviews', json={'content_id': content_id, 'rating': 5}, headers=student)
+    assert response.status_code == 201
+    assert response.get_json()['review']['is_verified_purchase'] is True
@@ -0,0 +1,56 @@
+import random
+from app.utils.catalog import FILTER_FIELDS, CatalogSnapshot
+
+
+def make_record(content_id, rng, **overrides):
+    record = {
+        'id': content_id,
+        'created_at': float(rng.randint(0, 50)),
+        'rating': rng.choice([0.0, 1.5, 3.0, 4.5]),
+        'views': rng.randint(0, 9),
+        'content_type': rng.choice(['video', 'article', 'course']),
+        'category_id': rng.choice([None, 1, 2]),
+        'instructor_id': rng.choice([1, 2, 3]),
+        'is_free': rng.choice([True, False]),
+        'difficulty_level': rng.choice(['beginner', 'advanced']),
+        'language': 'en',
+        'tags': rng.sample(['python', 'sql', 'web', 'data'], rng.randint(0, 2)),
+    }
+    record.update(overrides)
+    record['payload'] = {'id': content_id, 'rating': record['rating'], 'views': record['views']}
+    return record
+
+
+def test_patched_snapshot_matches_a_rebuild():
+    rng = random.Random(1)
+    records = {content_id: make_record(content_id, rng) for content_id in range(1, 200)}
+    snapshot = CatalogSnapshot(records, 1)
+
+    for _ in range(20):
+        changed = {
+            content_id: make_record(content_id, rng, created_at=records[content_id]['created_at'])
+            for content_id in rng.sample(sorted(records), 5)
+        }
+        assert snapshot.can_patch(changed)
+        snapshot = snapshot.patched(changed, snapshot.version + 1)
+        records = dict(records)
+        records.update(changed)
+        rebuilt = CatalogSnapshot(records, snapshot.version)
+
+        for _ in range(20):
+            filters = {}
+            for field in rng.sample(FILTER_FIELDS, rng.randint(0, 2)):
+                sample = records[rng.choice(sorted(records))]
+                filters[field] = rng.choice(['python', 'sql', 'missing']) if field == 'tags' else sample[field]
+            for sort_by in ('created_at', 'rating', 'views'):
+                for page in (1, 3):
+                    assert snapshot.query(filters, sort_by, page, 15) == rebuilt.query(filters, sort_by, page, 15)
+
+
+def test_moved_rows_are_not_patched():
+    rng = random.Random(2)
+    records = {content_id: make_record(content_id, rng) for content_id in range(1, 10)}
+    snapshot = CatalogSnapshot(records, 1)
+
+    assert not snapshot.can_patch({20: make_record(20, rng)})
+    assert not snapshot.can_patch({1: make_record(1, rng, created_at=records[1]['created_at'] + 1)})
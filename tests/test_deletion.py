@@ -0,0 +1,150 @@
+import pytest
+from sqlalchemy import text
+from app import db
+from app.jobs import Worker
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.instructor_stats import InstructorStats
+from app.models.progress import Progress
+from app.models.review import Review
+from app.models.user import User
+from app.utils import deletion
+from app.utils.deletion import purge_content, soft_delete_content
+from app.utils.instructor_stats import reconcile_instructor_stats
+
+
+@pytest.fixture
+def catalog(app, client, make_user):
+    """Two published courses by one instructor, each enrolled in and reviewed by three students"""
+    app.config['JOBS_EAGER'] = False  # Purges go through the queue, as in production
+    instructor_id, teacher = make_user('teacher', role='instructor')
+    students = [make_user(f'student{i}') for i in range(3)]
+    _, admin = make_user('admin', role='admin')
+
+    for title in ('Doomed', 'Kept'):
+        response = client.post('/api/content', json={
+            'title': title, 'description': 'd', 'content_type': 'course', 'is_free': True
+        }, headers=teacher)
+        course_id = response.get_json()['content']['id']
+        assert client.post(f'/api/content/{course_id}/publish', headers=teacher).status_code == 200
+        for rating, (_, headers) in zip((5, 4, 3), students):
+            assert client.post('/api/enrollments', json={'content_id': course_id}, headers=headers).status_code == 201
+            assert client.post('/api/progress', json={
+                'content_id': course_id, 'completion_percentage': 50, 'notes': 'halfway'
+            }, headers=headers).status_code in (200, 201)
+            assert client.post('/api/reviews', json={'content_id': course_id, 'rating': rating}, headers=headers).status_code == 201
+    run_jobs(app)
+    return {
+        'instructor_id': instructor_id, 'teacher': teacher, 'admin': admin, 'students': students,
+        'doomed': Content.query.filter_by(title='Doomed').one().id,
+        'kept': Content.query.filter_by(title='Kept').one().id,
+    }
+
+
+def run_jobs(app):
+    db.session.remove()
+    Worker(app, poll_interval=0).run(once=True)
+    db.session.remove()
+
+
+def stats(instructor_id):
+    row = db.session.get(InstructorStats, instructor_id)
+    return {name: getattr(row, name) for name in InstructorStats.COUNTERS}
+
+
+def test_deleted_course_is_hidden_at_once_and_purged_by_the_job(app, client, catalog):
+    doomed = catalog['doomed']
+
+    assert client.delete(f'/api/content/{doomed}', headers=catalog['teacher']).status_code == 200
+
+    assert client.get(f'/api/content/{doomed}').status_code == 404
+    # Counters are settled by the delete itself; the rows wait for the purge
+    expected = {
+        'content_count': 1, 'published_content_count': 1, 'total_enrollments': 3, 'rating_sum': 12, 'rating_count': 3
+    }
+    assert stats(catalog['instructor_id']) == expected
+    assert Enrollment.query.filter_by(content_id=doomed).count() == 3
+
+    run_jobs(app)
+
+    assert Content.query.execution_options(include_deleted=True).filter_by(id=doomed).count() == 0
+    assert Enrollment.query.filter_by(content_id=doomed).count() == 0
+    assert Review.query.filter_by(content_id=doomed).count() == 0
+    assert Progress.query.filter_by(content_id=doomed).count() == 0
+    assert Enrollment.query.filter_by(content_id=catalog['kept']).count() == 3
+    assert stats(catalog['instructor_id']) == expected
+    assert reconcile_instructor_stats() == 0
+
+
+def test_deleted_student_is_purged_and_ratings_repaired(app, client, catalog):
+    student_id, _ = catalog['students'][0]  # Rated both courses 5
+
+    assert client.delete(f'/api/users/{student_id}', headers=catalog['admin']).status_code == 200
+    run_jobs(app)
+
+    assert User.query.execution_options(include_deleted=True).filter_by(id=student_id).count() == 0
+    assert Review.query.filter_by(user_id=student_id).count() == 0
+    assert stats(catalog['instructor_id']) == {
+        'content_count': 2, 'published_content_count': 2, 'total_enrollments': 4, 'rating_sum': 14, 'rating_count': 4
+    }
+    for course_id in (catalog['doomed'], catalog['kept']):
+        content = db.session.get(Content, course_id)
+        assert (content.rating_count, float(content.rating_average)) == (2, 3.5)
+    assert reconcile_instructor_stats() == 0
+
+
+def test_purge_resumes_after_stopping_part_way(app, catalog, monkeypatch):
+    doomed = catalog['doomed']
+    soft_delete_content(db.session.get(Content, doomed))
+    db.session.commit()
+    expected = stats(catalog['instructor_id'])
+
+    # The first batch commits, then the worker dies
+    commit = db.session.commit
+    batches = []
+
+    def dying_commit():
+        batches.append(1)
+        if len(batches) > 1:
+            raise RuntimeError('worker died')
+        commit()
+
+    monkeypatch.setattr(db.session, 'commit', dying_commit)
+    with pytest.raises(RuntimeError):
+        purge_content(doomed, batch_size=1)
+    monkeypatch.undo()
+    db.session.rollback()
+    assert Content.query.execution_options(include_deleted=True).filter_by(id=doomed).count() == 1
+
+    assert purge_content(doomed, batch_size=1)
+    assert Review.query.filter_by(content_id=doomed).count() == 0
+    assert stats(catalog['instructor_id']) == expected
+    assert reconcile_instructor_stats() == 0
+
+
+def test_racing_purges_take_each_review_out_once(app, client, catalog, monkeypatch):
+    student_id, _ = catalog['students'][0]  # Rated both courses 5
+    assert client.delete(f'/api/users/{student_id}', headers=catalog['admin']).status_code == 200
+    claim = deletion._claim
+    raced = []
+
+    def racing_claim(query):
+        rows = claim(query)
+        if rows and not raced and rows[0]._fields[-1] == 'rating':
+            # Another run of the purge deletes one review in between and takes it out itself
+            raced.append(rows[0].id)
+            with db.engine.begin() as connection:
+                connection.execute(text('DELETE FROM reviews WHERE id = :id'), {'id': rows[0].id})
+                connection.execute(text(
+                    'UPDATE instructor_stats SET rating_sum = rating_sum - 5, rating_count = rating_count - 1 '
+                    'WHERE instructor_id = :id'
+                ), {'id': catalog['instructor_id']})
+        return rows
+
+    monkeypatch.setattr(deletion, '_claim', racing_claim)
+    run_jobs(app)
+
+    assert raced
+    assert Review.query.filter_by(user_id=student_id).count() == 0
+    assert stats(catalog['instructor_id'])['rating_count'] == 4
+    assert reconcile_instructor_stats() == 0
@@ -0,0 +1,52 @@
+from sqlalchemy import func, select
+from app import db, event_bus
+from app.models.enrollment import Enrollment
+from app.routes.events import _event_stream
+from app.utils.bulk_enrollment import EnrollmentOutcome, bulk_enroll
+
+
+def test_stream_subscribes_only_while_it_is_sent(app):
+    with app.test_request_context():
+        response = _event_stream('user:1')
+
+    assert 'user:1' not in event_bus._subscriptions
+    body = iter(response.response)
+    assert next(body) == 'retry: 5000\n\n'
+    assert len(event_bus._subscriptions['user:1']) == 1
+
+    response.close()
+
+    assert 'user:1' not in event_bus._subscriptions
+
+
+def test_bulk_enroll_publishes_each_new_enrollment_once_committed(client, make_user, monkeypatch):
+    _, teacher = make_user('teacher', role='instructor')
+    students = [make_user(f'student{i}')[0] for i in range(3)]
+    response = client.post('/api/content', json={
+        'title': 'Course', 'description': 'd', 'content_type': 'course', 'is_free': True
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    list(bulk_enroll([(students[0], content_id)]))
+    published = []
+
+    def publish(channels, event_type, data, coalesce_key=None):
+        # Published only once the enrollment is visible to other connections
+        with db.engine.connect() as connection:
+            assert connection.execute(select(func.count()).select_from(Enrollment).where(
+                Enrollment.user_id == data['user_id'], Enrollment.content_id == content_id
+            )).scalar() == 1
+        published.append((channels, event_type, data))
+
+    monkeypatch.setattr(event_bus, 'publish', publish)
+
+    outcomes = list(bulk_enroll([(user_id, content_id) for user_id in students]))
+
+    assert [outcome['status'] for outcome in outcomes] == [
+        EnrollmentOutcome.ALREADY_ENROLLED, EnrollmentOutcome.ENROLLED, EnrollmentOutcome.ENROLLED
+    ]
+    assert [(channels, event_type) for channels, event_type, _ in published] == [
+        ([f'user:{user_id}', f'content:{content_id}'], 'enrollment.created') for user_id in students[1:]
+    ]
+    assert [data['user_id'] for _, _, data in published] == students[1:]
+    assert all(data['enrolled_at'] and data['is_completed'] is False for _, _, data in published)
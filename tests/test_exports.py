@@ -0,0 +1,8 @@
+def test_since_accepts_a_utc_z_suffix(client, make_user):
+    _, admin = make_user('admin', role='admin')
+
+    response = client.get('/api/exports/enrollments?format=ndjson&since=2026-01-01T00:00:00Z', headers=admin)
+    assert response.status_code == 200
+
+    response = client.get('/api/exports/enrollments?since=yesterday', headers=admin)
+    assert response.status_code == 400
@@ -0,0 +1,33 @@
+from app import db
+from app.models.content import Content
+from app.models.enrollment import Enrollment
+from app.models.instructor_stats import InstructorStats
+from app.models.review import Review
+
+
+def test_first_write_seeds_the_row_from_existing_history(client, make_user):
+    instructor_id, _ = make_user('teacher', role='instructor')
+    student_ids = [make_user(f'student{i}')[0] for i in range(3)]
+    # History written before the counters existed
+    content = Content(title='Intro', description='d', content_type='video', instructor_id=instructor_id, is_published=True)
+    draft = Content(title='Draft', description='d', content_type='video', instructor_id=instructor_id)
+    db.session.add_all([content, draft])
+    db.session.flush()
+    for student_id in student_ids[:2]:
+        db.session.add(Enrollment(user_id=student_id, content_id=content.id))
+    db.session.add(Review(user_id=student_ids[0], content_id=content.id, rating=4))
+    db.session.commit()
+    content_id = content.id
+    assert db.session.get(InstructorStats, instructor_id) is None
+
+    _, headers = make_user('late')
+    response = client.post('/api/enrollments', json={'content_id': content_id}, headers=headers)
+    assert response.status_code == 201
+
+    db.session.remove()
+    stats = db.session.get(InstructorStats, instructor_id)
+    assert (stats.content_count, stats.published_content_count, stats.total_enrollments) == (2, 1, 3)
+    assert (stats.rating_sum, stats.rating_count) == (4, 1)
+
+    response = client.get(f'/api/instructors/{instructor_id}')
+    assert response.status_code == 200
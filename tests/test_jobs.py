@@ -0,0 +1,55 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.jobs import Worker, background_task
+from app.models.job import Job, JobStatus
+
+runs = []
+release = threading.Event()
+
+
+@background_task(name='tests.slow_job')
+def slow_job():
+    runs.append(1)
+    release.wait(10)
+
+
+def test_running_job_is_not_picked_up_again(app):
+    app.config.update(JOBS_EAGER=False, JOBS_LOCK_TIMEOUT=0.5, JOBS_HEARTBEAT_INTERVAL=0.1)
+    slow_job.delay()
+    db.session.commit()
+    owner = Worker(app, poll_interval=0.05)
+    thread = threading.Thread(target=owner.run, kwargs={'once': True})
+    thread.start()
+    try:
+        while not runs:
+            time.sleep(0.05)
+        # Well past the lock timeout, another worker keeps finding nothing to do
+        other = Worker(app, poll_interval=0)
+        for _ in range(15):
+            time.sleep(0.1)
+            other._last_requeue = 0
+            other.requeue_stale()
+            assert other.claim(1) == []
+    finally:
+        release.set()
+        thread.join(10)
+
+    db.session.remove()
+    assert runs == [1]
+    assert Job.query.one().status == JobStatus.SUCCEEDED
+
+
+def test_job_with_a_silent_heartbeat_is_requeued(app):
+    db.session.add(Job(
+        name='tests.slow_job', status=JobStatus.RUNNING, attempts=1, locked_by='gone:1',
+        locked_at=datetime.utcnow() - timedelta(minutes=10)
+    ))
+    db.session.commit()
+
+    Worker(app).requeue_stale()
+
+    db.session.remove()
+    job = Job.query.one()
+    assert (job.status, job.locked_by) == (JobStatus.PENDING, None)
@@ -0,0 +1,99 @@
+import pytest
+from app import db
+from app.models.enrollment import Enrollment
+from app.models.learning_path import ContentPrerequisiteClosure as Closure
+from app.utils.learning_paths import rebuild_closure
+
+
+@pytest.fixture
+def diamond(client, make_user):
+    """Published items A, B, C, D with edges A -> B, A -> C, B -> D and C -> D"""
+    _, teacher = make_user('teacher', role='instructor')
+    ids = {}
+    for title in 'ABCD':
+        response = client.post('/api/content', json={
+            'title': title, 'description': 'd', 'content_type': 'course', 'is_free': True
+        }, headers=teacher)
+        ids[title] = response.get_json()['content']['id']
+        assert client.post(f'/api/content/{ids[title]}/publish', headers=teacher).status_code == 200
+    for prerequisite, content in ('AB', 'AC', 'BD', 'CD'):
+        response = client.post(f'/api/paths/content/{ids[content]}/prerequisites', json={
+            'prerequisite_id': ids[prerequisite]
+        }, headers=teacher)
+        assert response.status_code == 201
+    return ids, teacher
+
+
+def closure():
+    return {(row.ancestor_id, row.descendant_id): row.path_count for row in Closure.query}
+
+
+def test_diamond_counts_both_paths(diamond):
+    ids, _ = diamond
+
+    rows = closure()
+
+    assert rows[(ids['A'], ids['D'])] == 2
+    assert rows[(ids['B'], ids['D'])] == 1
+    assert (ids['B'], ids['C']) not in rows
+
+
+def test_removing_an_edge_drops_only_its_paths(client, diamond):
+    ids, teacher = diamond
+
+    response = client.delete(f"/api/paths/content/{ids['D']}/prerequisites/{ids['B']}", headers=teacher)
+
+    assert response.status_code == 200
+    rows = closure()
+    assert rows[(ids['A'], ids['D'])] == 1
+    assert (ids['B'], ids['D']) not in rows
+
+
+def test_cycle_is_rejected(client, diamond):
+    ids, teacher = diamond
+
+    response = client.post(f"/api/paths/content/{ids['A']}/prerequisites", json={
+        'prerequisite_id': ids['D']
+    }, headers=teacher)
+
+    assert response.status_code == 409
+    assert (ids['D'], ids['A']) not in closure()
+
+
+@pytest.mark.parametrize('prerequisite_id', ['1', 1.5, True, [1]])
+def test_non_integer_prerequisite_is_rejected(client, diamond, prerequisite_id):
+    ids, teacher = diamond
+
+    response = client.post(f"/api/paths/content/{ids['A']}/prerequisites", json={
+        'prerequisite_id': prerequisite_id
+    }, headers=teacher)
+
+    assert response.status_code == 400
+
+
+def test_rebuild_matches_incremental_closure(client, diamond):
+    ids, teacher = diamond
+    client.delete(f"/api/paths/content/{ids['D']}/prerequisites/{ids['C']}", headers=teacher)
+    maintained = closure()
+
+    rebuild_closure()
+    db.session.commit()
+
+    assert closure() == maintained
+
+
+def test_next_up_and_path_follow_completion(client, make_user, diamond):
+    ids, _ = diamond
+    user_id, headers = make_user('student')
+    db.session.add(Enrollment(user_id=user_id, content_id=ids['A'], is_completed=True))
+    db.session.commit()
+
+    response = client.get('/api/paths/next', headers=headers)
+
+    assert [item['id'] for item in response.get_json()['content']] == [ids['B'], ids['C']]
+
+    steps = client.get(f"/api/paths/{ids['D']}", headers=headers).get_json()['steps']
+
+    assert [step['content']['id'] for step in steps] == [ids['A'], ids['B'], ids['C'], ids['D']]
+    assert [step['status'] for step in steps] == ['completed', 'unlocked', 'unlocked', 'locked']
+    assert steps[-1]['prerequisite_ids'] == [ids['B'], ids['C']]
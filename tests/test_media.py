@@ -0,0 +1,41 @@
+import os
+from app import db
+from app.jobs import Worker
+from app.models.media import MediaAsset, MediaStatus
+from app.utils.media import absolute_path, analyze, apply_analysis
+
+DATA = os.urandom(150000)
+
+
+def upload(client, headers):
+    response = client.post('/api/media', json={'filename': 'clip.mp4', 'size_bytes': len(DATA)}, headers=headers)
+    assert response.status_code == 201
+    media_id = response.get_json()['media']['id']
+    assert client.put(f'/api/media/{media_id}/chunks?offset=0', data=DATA, headers=headers).status_code == 200
+    assert client.post(f'/api/media/{media_id}/complete', headers=headers).status_code == 202
+    return media_id
+
+
+def test_duplicate_upload_shares_files_once_committed(app, client, make_user):
+    app.config.update(JOBS_EAGER=False, MEDIA_PROCESS_WORKERS=1)
+    _, headers = make_user('teacher', role='instructor')
+    first = upload(client, headers)
+    Worker(app, poll_interval=0).run(once=True)
+    db.session.remove()
+    second = upload(client, headers)
+    asset = db.session.get(MediaAsset, second)
+    directory = os.path.dirname(absolute_path(asset.storage_path))
+
+    analysis = analyze(asset.id, asset.storage_path, asset.mime_type, asset.size_bytes)
+    assert analysis['original_id'] == first
+    apply_analysis(asset, analysis)
+    db.session.rollback()
+    # A failed commit leaves the upload where the asset still points
+    assert os.path.isdir(directory)
+
+    Worker(app, poll_interval=0).run(once=True)
+    db.session.remove()
+    asset = db.session.get(MediaAsset, second)
+    assert (asset.status, asset.duplicate_of_id) == (MediaStatus.READY, first)
+    assert asset.storage_path == db.session.get(MediaAsset, first).storage_path
+    assert not os.path.isdir(directory)
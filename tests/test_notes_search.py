@@ -0,0 +1,53 @@
+from sqlalchemy import inspect, text
+from app import db
+from app.utils import notes_search
+from app.utils.notes_search import SQLITE_TABLE, ensure_notes_index, reindex_notes
+
+
+def has_index():
+    return inspect(db.engine).has_table(SQLITE_TABLE)
+
+
+def drop_index(monkeypatch):
+    monkeypatch.setattr(notes_search, '_ready', set())
+    db.session.execute(text(f'DROP TABLE {SQLITE_TABLE}'))
+    db.session.commit()
+
+
+def test_index_is_created_in_its_own_transaction(app, monkeypatch):
+    drop_index(monkeypatch)
+    db.session.execute(text('SELECT 1'))
+
+    ensure_notes_index()
+    db.session.rollback()
+
+    assert has_index()
+    assert notes_search._ready == {'sqlite'}
+
+
+def test_requests_never_create_the_index(app, client, make_user, monkeypatch):
+    _, teacher = make_user('teacher', role='instructor')
+    _, headers = make_user('student')
+    response = client.post('/api/content', json={
+        'title': 'Course', 'description': 'd', 'content_type': 'course', 'is_free': True
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    assert client.post('/api/enrollments', json={'content_id': content_id}, headers=headers).status_code == 201
+    drop_index(monkeypatch)
+
+    response = client.post('/api/progress', json={
+        'content_id': content_id, 'completion_percentage': 10, 'notes': 'Closures capture variables'
+    }, headers=headers)
+
+    assert response.status_code in (200, 201)
+    assert not has_index()
+    # Without the index the search scans the notes
+    results = client.get('/api/progress/notes/search?q=closures', headers=headers).get_json()['results']
+    assert [result['snippet'] for result in results] == ['Closures capture variables']
+
+    assert reindex_notes() == 1
+    db.session.commit()
+
+    results = client.get('/api/progress/notes/search?q=closures', headers=headers).get_json()['results']
+    assert [result['snippet'] for result in results] == ['<mark>Closures</mark> capture variables']
@@ -0,0 +1,14 @@
+from app.models import partitioning
+from app.models.partitioning import SEQUENCE_BITS, WORKER_BITS, generate_id
+
+
+def test_ids_are_unique_ordered_and_carry_the_worker_id(app, monkeypatch):
+    app.config['ID_WORKER_ID'] = 42
+    monkeypatch.setattr(partitioning, '_last', dict(partitioning._last, pid=None))
+    monkeypatch.setattr(partitioning.time, 'time', lambda: 1800000000.0)  # A frozen clock
+
+    ids = [generate_id() for _ in range(1000)]
+
+    assert ids == sorted(set(ids))
+    assert all(i < 2 ** 53 for i in ids)
+    assert {i >> SEQUENCE_BITS & ((1 << WORKER_BITS) - 1) for i in ids} == {42}
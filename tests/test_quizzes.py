@@ -0,0 +1,129 @@
+import pytest
+from app import db
+from app.models.progress import Progress
+from app.routes.quizzes import answer_keys, attempt_counter, correct_counter
+
+
+@pytest.fixture
+def quiz(client, make_user):
+    """A published quiz with a single-choice question (2 points) and a multiple-choice one (1 point)"""
+    _, teacher = make_user('teacher', role='instructor')
+    response = client.post('/api/content', json={
+        'title': 'Quiz', 'description': 'd', 'content_type': 'quiz', 'is_free': True,
+        'metadata_json': {'passing_percentage': 60}
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    questions = []
+    for question in (
+        {'prompt': 'One', 'choices': ['a', 'b', 'c'], 'correct_choices': [1], 'points': 2},
+        {'prompt': 'Many', 'choices': ['a', 'b', 'c'], 'correct_choices': [0, 2], 'question_type': 'multiple_choice'},
+    ):
+        response = client.post(f'/api/quizzes/{content_id}/questions', json=question, headers=teacher)
+        assert response.status_code == 201
+        questions.append(response.get_json()['question']['id'])
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    yield content_id, questions, teacher
+    attempt_counter.flush()
+    correct_counter.flush()
+
+
+def submit(client, headers, content_id, answers):
+    response = client.post(f'/api/quizzes/{content_id}/attempts', json={'answers': answers}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['attempt']
+
+
+def test_grading_scores_each_question(client, make_user, quiz):
+    content_id, (one, many), _ = quiz
+    _, headers = make_user('student')
+
+    attempt = submit(client, headers, content_id, {str(one): 1, str(many): [0]})
+
+    # Multiple choice needs exactly the correct set
+    assert attempt['results'] == {str(one): True, str(many): False}
+    assert attempt['score'] == 2.0 and attempt['max_score'] == 3.0
+    assert attempt['percentage'] == 66.67
+
+
+def test_passing_completes_progress(client, make_user, quiz):
+    content_id, (one, many), _ = quiz
+    user_id, headers = make_user('student')
+
+    failed = submit(client, headers, content_id, {str(many): [0, 2]})
+
+    assert not failed['passed']
+    assert Progress.for_user(user_id).filter_by(content_id=content_id).first() is None
+
+    passed = submit(client, headers, content_id, {str(one): 1})
+
+    assert passed['passed']
+    progress = Progress.for_user(user_id).filter_by(content_id=content_id).one()
+    assert float(progress.completion_percentage) == 100.0
+
+
+def test_passing_drops_the_quiz_from_continue_watching(client, make_user, quiz):
+    content_id, (one, _), _ = quiz
+    _, headers = make_user('student')
+    assert client.post('/api/enrollments', json={'content_id': content_id}, headers=headers).status_code == 201
+    assert client.post('/api/progress', json={'content_id': content_id, 'completion_percentage': 50}, headers=headers).status_code in (200, 201)
+    watching = client.get('/api/progress/recent', headers=headers).get_json()['continue_watching']
+    assert [item['content']['id'] for item in watching] == [content_id]
+
+    submit(client, headers, content_id, {str(one): 1})
+
+    assert client.get('/api/progress/recent', headers=headers).get_json()['continue_watching'] == []
+
+
+def test_editing_a_question_invalidates_the_answer_key(client, make_user, quiz):
+    content_id, (one, many), teacher = quiz
+    _, headers = make_user('student')
+    assert submit(client, headers, content_id, {str(one): 1})['results'][str(one)]
+    cached = answer_keys.get(content_id)
+
+    response = client.put(f'/api/quizzes/{content_id}/questions/{one}', json={'correct_choices': [2]}, headers=teacher)
+
+    assert response.status_code == 200
+    assert answer_keys.get(content_id) is not cached
+    assert not submit(client, headers, content_id, {str(one): 1})['results'][str(one)]
+    assert submit(client, headers, content_id, {str(one): 2})['results'][str(one)]
+
+
+def test_stats_count_buffered_and_flushed_attempts(client, make_user, quiz):
+    content_id, (one, many), teacher = quiz
+    for name, answers in (('ann', {str(one): 1}), ('bob', {str(one): 0, str(many): [0, 2]})):
+        _, headers = make_user(name)
+        submit(client, headers, content_id, answers)
+
+    pending = client.get(f'/api/quizzes/{content_id}/stats', headers=teacher).get_json()['questions']
+    attempt_counter.flush()
+    correct_counter.flush()
+    db.session.expire_all()
+    flushed = client.get(f'/api/quizzes/{content_id}/stats', headers=teacher).get_json()['questions']
+
+    for stats in (pending, flushed):
+        assert [(row['attempt_count'], row['correct_count']) for row in stats] == [(2, 1), (2, 1)]
+        assert stats[0]['correct_rate'] == 0.5
+
+
+@pytest.mark.parametrize('change', [
+    {'correct_choices': [True]},
+    {'points': True},
+    {'position': 'first'},
+    {'position': 1.5},
+])
+def test_invalid_question_fields_are_rejected(client, quiz, change):
+    content_id, (one, _), teacher = quiz
+
+    response = client.put(f'/api/quizzes/{content_id}/questions/{one}', json=change, headers=teacher)
+
+    assert response.status_code == 400
+
+
+def test_encode_rejects_bool_choices(app, quiz):
+    content_id, (one, _), _ = quiz
+    key = answer_keys.get(content_id)
+
+    with pytest.raises(ValueError):
+        key.encode({one: True})
+    with pytest.raises(ValueError):
+        key.encode({one: [False]})
@@ -0,0 +1,50 @@
+from app import db
+from app.models.content import Content
+from app.models.review import Review, ReviewVote
+from app.routes.reviews import helpful_counter
+
+
+def test_helpful_count_includes_own_vote(client, make_user):
+    instructor_id, _ = make_user('teacher', role='instructor')
+    author_id, _ = make_user('author')
+    _, headers = make_user('reader')
+    content = Content(title='Intro', description='d', content_type='video', instructor_id=instructor_id)
+    db.session.add(content)
+    db.session.flush()
+    review = Review(user_id=author_id, content_id=content.id, rating=5)
+    db.session.add(review)
+    db.session.commit()
+    review_id = review.id
+
+    response = client.post(f'/api/reviews/{review_id}/helpful', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['helpful_count'] == 1
+
+    response = client.delete(f'/api/reviews/{review_id}/helpful', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['helpful_count'] == 0
+
+    helpful_counter.flush()
+    db.session.remove()
+    assert db.session.get(Review, review_id).helpful_count == 0
+
+
+def test_reconcile_rebuilds_helpful_counts(make_user):
+    instructor_id, _ = make_user('teacher', role='instructor')
+    author_id, _ = make_user('author')
+    voter_ids = [make_user(f'reader{i}')[0] for i in range(2)]
+    content = Content(title='Intro', description='d', content_type='video', instructor_id=instructor_id)
+    db.session.add(content)
+    db.session.flush()
+    drifted = Review(user_id=author_id, content_id=content.id, rating=5, helpful_count=7)
+    accurate = Review(user_id=voter_ids[0], content_id=content.id, rating=4, helpful_count=1)
+    db.session.add_all([drifted, accurate])
+    db.session.flush()
+    db.session.add_all([ReviewVote(user_id=voter_id, review_id=drifted.id) for voter_id in voter_ids])
+    db.session.add(ReviewVote(user_id=author_id, review_id=accurate.id))
+    db.session.commit()
+
+    assert Review.reconcile_helpful_counts() == 1
+    db.session.commit()
+    db.session.expire_all()
+    assert (drifted.helpful_count, accurate.helpful_count) == (2, 1)
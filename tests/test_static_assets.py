@@ -0,0 +1,26 @@
+import os
+from app import static_assets
+
+
+def test_debug_pages_rebuild_only_when_a_file_changes(app, client, tmp_path, monkeypatch):
+    frontend = tmp_path / 'frontend'
+    frontend.mkdir()
+    (frontend / 'index.html').write_text('<script src="/app.js"></script>')
+    (frontend / 'app.js').write_text('console.log(1)')
+    app.debug = True
+    monkeypatch.setattr(static_assets, 'directory', str(frontend))
+    monkeypatch.setattr(static_assets, '_assets', None)
+
+    first = client.get('/')
+    assets = static_assets._assets
+    assert first.status_code == 200
+    assert client.get('/').status_code == 200
+    assert static_assets._assets is assets
+
+    (frontend / 'app.js').write_text('console.log(2)')
+    stat = os.stat(frontend / 'app.js')
+    os.utime(frontend / 'app.js', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second = client.get('/')
+
+    assert static_assets._assets is not assets
+    assert second.get_data() != first.get_data()
@@ -0,0 +1,29 @@
+from flask import request
+from app import create_app, login_throttle
+
+
+def test_lockout_outlasts_the_window(app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.utils.throttle.time.time', lambda: now[0])
+    app.config.update(LOGIN_THROTTLE_WINDOW=300, LOGIN_BACKOFF_MAX=900)
+    login_throttle.init_app(app)
+
+    for _ in range(login_throttle.username_limit + 10):
+        login_throttle.record_failure('alice', None)
+    assert login_throttle.check('alice', None) == 900
+
+    now[0] += 600
+    assert login_throttle.check('alice', None) == 300
+
+    now[0] += 300
+    assert login_throttle.check('alice', None) == 0
+
+
+def test_proxy_hop_count_sets_the_client_ip(app):
+    proxied = create_app(type('Config', (), dict(app.config, PROXY_FIX_X_FOR=1)))
+    seen = []
+    for target in (app, proxied):
+        target.add_url_rule('/test/ip', 'ip', lambda: seen.append(request.remote_addr) or '')
+        target.test_client().get('/test/ip', headers={'X-Forwarded-For': '203.0.113.7'})
+
+    assert seen == ['127.0.0.1', '203.0.113.7']
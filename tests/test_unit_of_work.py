@@ -0,0 +1,119 @@
+import pytest
+from flask import jsonify
+from sqlalchemy import text
+from app import db
+from app.models.tag import Tag
+from app.utils.unit_of_work import UnitOfWorkViolation, on_commit
+
+
+@pytest.fixture
+def calls(app):
+    """Test routes staging a tag; returns the on_commit callback log"""
+    log = []
+
+    def committed_tags():
+        # A separate connection only sees what was really committed
+        with db.engine.connect() as connection:
+            return [name for (name,) in connection.execute(text('SELECT name FROM tags ORDER BY id'))]
+
+    def stage(name, status=201):
+        db.session.add(Tag(name=name, slug=name))
+        on_commit(lambda: log.append(('first', committed_tags())))
+        on_commit(lambda: log.append(('second', committed_tags())))
+        return jsonify({'name': name}), status
+
+    def savepoint():
+        db.session.add(Tag(name='kept', slug='kept'))
+        on_commit(lambda: log.append('outer'))
+        try:
+            with db.session.begin_nested():
+                db.session.add(Tag(name='dropped', slug='dropped'))
+                on_commit(lambda: log.append('inner'))
+                raise ValueError
+        except ValueError:
+            pass
+        return jsonify({}), 201
+
+    def commit_twice():
+        db.session.add(Tag(name='early', slug='early'))
+        db.session.commit()
+        db.session.add(Tag(name='late', slug='late'))
+        return jsonify({}), 201
+
+    def write_on_get():
+        db.session.add(Tag(name='sneaky', slug='sneaky'))
+        db.session.flush()
+        return jsonify({}), 200
+
+    def explode():
+        db.session.add(Tag(name='boom', slug='boom'))
+        on_commit(lambda: log.append('boom'))
+        raise RuntimeError('boom')
+
+    app.add_url_rule('/test/stage/<name>', 'stage', stage, methods=['POST'])
+    app.add_url_rule('/test/reject/<name>', 'reject', lambda name: stage(name, 400), methods=['POST'])
+    app.add_url_rule('/test/savepoint', 'savepoint', savepoint, methods=['POST'])
+    app.add_url_rule('/test/commit-twice', 'commit_twice', commit_twice, methods=['POST'])
+    app.add_url_rule('/test/write-on-get', 'write_on_get', write_on_get)
+    app.add_url_rule('/test/explode', 'explode', explode, methods=['POST'])
+    return log
+
+
+def tag_names():
+    db.session.remove()
+    return [tag.name for tag in Tag.query.order_by(Tag.id)]
+
+
+def test_success_commits_once_then_runs_callbacks_in_order(client, calls):
+    response = client.post('/test/stage/python')
+
+    assert response.status_code == 201
+    assert tag_names() == ['python']
+    # Callbacks run in registration order, after the data is durable
+    assert calls == [('first', ['python']), ('second', ['python'])]
+
+
+def test_error_response_rolls_back_and_drops_callbacks(client, calls):
+    response = client.post('/test/reject/python')
+
+    assert response.status_code == 400
+    assert tag_names() == []
+    assert calls == []
+
+
+def test_exception_rolls_back_and_drops_callbacks(client, calls):
+    with pytest.raises(RuntimeError):
+        client.post('/test/explode')
+
+    assert tag_names() == []
+    assert calls == []
+
+
+def test_rolled_back_savepoint_drops_only_its_callbacks(client, calls):
+    response = client.post('/test/savepoint')
+
+    assert response.status_code == 201
+    assert tag_names() == ['kept']
+    assert calls == ['outer']
+
+
+def test_failed_commit_returns_json_error(client, calls):
+    client.post('/test/stage/python')
+    del calls[:]
+
+    response = client.post('/test/stage/python')
+
+    assert response.status_code == 409
+    assert response.get_json() == {'error': 'Conflicting change, please retry'}
+    assert tag_names() == ['python']
+    assert calls == []
+
+
+def test_strict_mode_reports_second_commit(client, calls):
+    with pytest.raises(UnitOfWorkViolation, match='2 commits'):
+        client.post('/test/commit-twice')
+
+
+def test_strict_mode_reports_writes_on_get(client, calls):
+    with pytest.raises(UnitOfWorkViolation, match='writes during GET'):
+        client.get('/test/write-on-get')
@@ -0,0 +1,23 @@
+def test_cursor_is_bound_to_its_sort(client, make_user):
+    _, admin = make_user('admin', role='admin')
+    for i in range(3):
+        make_user(f'student{i}')
+
+    response = client.get('/api/users?per_page=2&sort=newest', headers=admin)
+    assert response.status_code == 200
+    cursor = response.get_json()['pagination']['next_cursor']
+
+    response = client.get(f'/api/users?per_page=2&sort=newest&cursor={cursor}', headers=admin)
+    assert response.status_code == 200
+    assert len(response.get_json()['users']) == 2
+
+    response = client.get(f'/api/users?per_page=2&sort=username&cursor={cursor}', headers=admin)
+    assert response.status_code == 400
+
+
+def test_is_active_accepts_only_booleans(client, make_user):
+    _, admin = make_user('admin', role='admin')
+
+    assert client.get('/api/users?is_active=TRUE', headers=admin).status_code == 200
+    assert client.get('/api/users?is_active=false', headers=admin).status_code == 200
+    assert client.get('/api/users?is_active=yes', headers=admin).status_code == 400
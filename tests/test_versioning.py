@@ -0,0 +1,59 @@
+from app import db
+from app.models.category import Category
+from app.models.content import Content
+from app.models.revision import ContentSnapshot
+from app.models.user import User
+from app.routes.content import view_counter
+
+
+def test_published_detail_overlays_live_counters_and_names(client, make_user):
+    instructor_id, teacher = make_user('teacher', role='instructor')
+    response = client.post('/api/content', json={
+        'title': 'Intro', 'description': 'd', 'content_type': 'video'
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    first = client.get(f'/api/content/{content_id}')
+    assert first.get_json()['view_count'] == 0
+    view_counter.flush()
+
+    # Moves that do not publish a new revision
+    category = Category(name='Science', slug='science')
+    db.session.add(category)
+    db.session.flush()
+    content = db.session.get(Content, content_id)
+    content.view_count, content.rating_average, content.rating_count = 42, 4.5, 2
+    content.category_id = category.id
+    db.session.get(User, instructor_id).full_name = 'Renamed Teacher'
+    db.session.commit()
+
+    response = client.get(f'/api/content/{content_id}', headers={'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert (data['view_count'], data['rating_average'], data['rating_count']) == (42, 4.5, 2)
+    assert data['instructor']['full_name'] == 'Renamed Teacher'
+    assert data['category'] == {'id': category.id, 'name': 'Science'}
+    assert data['title'] == 'Intro'
+    view_counter.flush()
+
+
+def test_new_rating_does_not_republish(client, make_user):
+    _, teacher = make_user('teacher', role='instructor')
+    _, student = make_user('student')
+    response = client.post('/api/content', json={
+        'title': 'Intro', 'description': 'd', 'content_type': 'video', 'is_free': True
+    }, headers=teacher)
+    content_id = response.get_json()['content']['id']
+    assert client.post(f'/api/content/{content_id}/publish', headers=teacher).status_code == 200
+    published_at = db.session.get(ContentSnapshot, content_id).published_at
+    assert client.post('/api/enrollments', json={'content_id': content_id}, headers=student).status_code == 201
+
+    response = client.post('/api/reviews', json={'content_id': content_id, 'rating': 4}, headers=student)
+
+    assert response.status_code == 201
+    db.session.expire_all()
+    assert db.session.get(ContentSnapshot, content_id).published_at == published_at
+    data = client.get(f'/api/content/{content_id}').get_json()
+    assert (data['rating_average'], data['rating_count']) == (4.0, 1)
+    view_counter.flush()